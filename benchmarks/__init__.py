@@ -0,0 +1 @@
+"""Outils de mesure de performance du dashboard, exécutables hors ligne."""
@@ -0,0 +1,190 @@
+"""Mesure du temps de rendu des fonctions d'affichage des pages.
+
+Exemple ::
+
+    python -m benchmarks.bench_render --sizes 10,1000,50000 --repeat 5
+    python -m benchmarks.bench_render --compare benchmarks/results/reference.json
+
+Chaque fonction (conversion des réponses en ``dashboard.models`` comprise)
+est chronométrée séparément sur des données synthétiques (voir
+``benchmarks.payloads``), sans aucun appel réseau : les réponses sont
+déposées directement dans le cache partagé avant les mesures. Chaque
+fonction est mesurée deux fois : à froid (``cache: "cold"``, cache des
+figures vidé avant chaque mesure, construction des figures comprise) et à
+chaud (``"warm"``, figures servies par ``figures.figure_cache``) ; les
+succès et échecs du cache des figures sont rapportés. Les résultats sont
+écrits en JSON ; ``--compare`` signale (et fait échouer la commande sur)
+toute mesure plus lente que la référence au-delà de ``--threshold``.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+from benchmarks import payloads
+from benchmarks.harness import ROOT, load_page
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+CACHE_MODES = ("cold", "warm")
+
+
+def _time(func, repeat, warmup, cold):
+    from dashboard.figures import figure_cache
+
+    for _ in range(warmup):
+        func()
+    samples = []
+    hits, misses = figure_cache.hits, figure_cache.misses
+    for _ in range(repeat):
+        if cold:
+            figure_cache.clear()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        "figure_hits": figure_cache.hits - hits,
+        "figure_misses": figure_cache.misses - misses,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+        "repeat": repeat,
+    }
+
+
+def cases(sales, team, scale, seed):
+    """Renvoie ``{nom de la fonction: appel sans argument}`` pour une échelle."""
+    from dashboard import alerts, jsonstream, models, ranking, search, timeseries
+    from dashboard.cache import kpi_cache
+
+    global_payload = payloads.all_products_kpis(scale, seed)
+    teams_payload = payloads.all_teams_kpis(scale, seed)
+    teams_body = json.dumps(teams_payload).encode()
+    global_kpis = models.ProductsKpis.from_payload(global_payload)
+    teams_kpis = models.TeamKpis.from_payload(teams_payload)
+    months = timeseries.monthly(global_kpis.months)
+    names = payloads.product_names(scale)
+    product = names[0]
+    product_index = search.ProductIndex(names)
+    kpi_cache.put(("getProductKpis", product),
+                  models.ProductKpis.from_payload(payloads.product_kpis(product, scale, seed)))
+    # KPIs des produits déjà en cache pour les alertes (au plus 200)
+    products = [models.ProductKpis.from_payload(payloads.product_kpis(name, scale, seed)) for name in names[:200]]
+    alert_tables = alerts.frames(global_kpis, teams_kpis, products)
+
+    return {
+        "jsonstream.load": lambda: jsonstream.load(io.BytesIO(teams_body), len(teams_body)),
+        "ProductsKpis.from_payload": lambda: models.ProductsKpis.from_payload(global_payload),
+        "TeamKpis.from_payload": lambda: models.TeamKpis.from_payload(teams_payload),
+        "display_global_kpis": lambda: sales.display_global_kpis(global_kpis),
+        "display_global_charts": lambda: sales.display_global_charts(global_kpis),
+        "display_month_charts": lambda: sales.display_month_charts(months),
+        "timeseries.enrich": lambda: timeseries.enrich(months),
+        "display_product_kpis": lambda: sales.display_product_kpis(product),
+        "display_agent_performance": lambda: team.display_agent_performance(teams_kpis),
+        "display_manager_performance": lambda: team.display_manager_performance(teams_kpis),
+        "get_best_agent_and_manager": lambda: team.get_best_agent_and_manager(teams_kpis),
+        "display_leaderboard": lambda: team.display_leaderboard(teams_kpis),
+        "leaderboard_page": lambda: ranking.leaderboard_page(
+            teams_kpis.agents, ranking.matching(teams_kpis.agents), "Agent", "revenue", 2),
+        "alerts.frames": lambda: alerts.frames(global_kpis, teams_kpis, products),
+        "alerts.evaluate": lambda: alerts.evaluate(alert_tables),
+        "ProductIndex": lambda: search.ProductIndex(names),
+        "ProductIndex.search": lambda: product_index.search(product[:-2]),
+    }
+
+
+def run(sizes, repeat, warmup, seed, only=None):
+    sales = load_page("pages/Sales.py")
+    team = load_page("pages/Sales_team.py")
+    results = []
+    for size in sizes:
+        scale = payloads.Scale.from_size(size)
+        for name, func in cases(sales, team, scale, seed).items():
+            if only and name not in only:
+                continue
+            for cache in CACHE_MODES:
+                timing = _time(func, repeat, warmup, cold=cache == "cold")
+                results.append({"function": name, "size": size, "scale": scale.label(), "cache": cache,
+                                **timing})
+                print(f"{name:<30} {scale.label():<28} {cache:<5} médiane {timing['median'] * 1000:10.2f} ms"
+                      f"  figures {timing['figure_hits']} en cache / {timing['figure_misses']} construites",
+                      flush=True)
+    return results
+
+
+def _versions():
+    versions = {"python": platform.python_version()}
+    for package in ("streamlit", "pandas", "plotly"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def compare(results, reference, threshold):
+    """Affiche les écarts avec une campagne de référence ; renvoie les régressions."""
+    # Les références antérieures aux mesures à froid ne contiennent que des mesures à chaud
+    baseline = {(r["function"], r["size"], r.get("cache", "warm")): r for r in reference["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get((result["function"], result["size"], result["cache"]))
+        if before is None:
+            continue
+        ratio = result["median"] / before["median"] if before["median"] else float("inf")
+        flag = "RÉGRESSION" if ratio > threshold else ""
+        print(f"{result['function']:<30} {result['size']:>8} {result['cache']:<5} x{ratio:6.2f} {flag}")
+        if flag:
+            regressions.append({**result, "reference_median": before["median"], "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,50000",
+                        help="nombres d'agents à tester, séparés par des virgules")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="fonctions à mesurer, séparées par des virgules")
+    parser.add_argument("--output", help="fichier JSON de sortie (défaut : benchmarks/results/<date>.json)")
+    parser.add_argument("--compare", help="fichier JSON de référence")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="ratio de médianes au-delà duquel une mesure est une régression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+    results = run(sizes, args.repeat, args.warmup, args.seed, only)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "versions": _versions(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        output = args.output
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats écrits dans {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Serveur local qui remplace l'API FastAPI pendant les tests de charge.
+
+Exemple ::
+
+    python -m benchmarks.fake_backend --size 1000 --port 8000 --latency 0.05 --error-rate 0.01
+    API_URL=http://127.0.0.1:8000/ streamlit run main.py
+
+Les réponses de ``getAllProductsKpis``, ``getAllProducts``,
+``getProductKpis/{name}`` et ``getAllTeamsKpis`` viennent de
+``benchmarks.payloads`` (mêmes formes que l'API). Chaque requête attend
+``latency`` secondes plus un tirage dans ``[0, jitter]``, puis échoue (500)
+avec la probabilité ``error_rate``. Les réponses portent un ``ETag`` et les
+requêtes conditionnelles reçoivent un 304 ; un produit inconnu reçoit un 404.
+Le serveur compte les requêtes reçues par endpoint (``counts``).
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from benchmarks import payloads
+
+
+class FakeBackend:
+    """Serveur HTTP (threads) servant des réponses synthétiques d'une taille ``scale``."""
+
+    def __init__(self, scale, seed=0, latency=0.0, jitter=0.0, error_rate=0.0, host="127.0.0.1", port=0):
+        self.scale = scale
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._names = set(payloads.product_names(scale))
+        self._bodies = {
+            "getAllProductsKpis": _encode(payloads.all_products_kpis(scale, seed)),
+            "getAllProducts": _encode(payloads.all_products(scale)),
+            "getAllTeamsKpis": _encode(payloads.all_teams_kpis(scale, seed)),
+        }
+        self._products = {}
+        self._counts = Counter()
+        self._errors = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def counts(self):
+        """``({endpoint: requêtes}, {endpoint: erreurs injectées})`` depuis le dernier ``reset``."""
+        with self._lock:
+            return dict(self._counts), dict(self._errors)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._errors.clear()
+
+    def _product_body(self, name):
+        body = self._products.get(name)
+        if body is None:
+            body = self._products[name] = _encode(payloads.product_kpis(name, self.scale, self.seed))
+        return body
+
+    def respond(self, path):
+        """``(statut, corps)`` de la requête ``path``, après la latence simulée."""
+        endpoint, _, param = urlsplit(path).path.strip("/").partition("/")
+        with self._lock:
+            self._counts[endpoint] += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self._errors[endpoint] += 1
+        time.sleep(delay)
+
+        if failed:
+            return 500, _encode({"detail": "Erreur injectée"})
+        if endpoint == "getProductKpis":
+            name = unquote(param)
+            if name not in self._names:
+                return 404, _encode({"detail": f"Produit introuvable : {name}"})
+            return 200, self._product_body(name)
+        if endpoint in self._bodies:
+            return 200, self._bodies[endpoint]
+        return 404, _encode({"detail": "Not Found"})
+
+
+def _encode(payload):
+    return json.dumps(payload).encode()
+
+
+def _handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            status, body = backend.respond(self.path)
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            if status == 200 and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 200:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000, help="nombre d'agents (voir payloads.Scale)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="latence de chaque réponse (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latence aléatoire ajoutée, au plus (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part des requêtes en erreur 500")
+    args = parser.parse_args(argv)
+
+    backend = FakeBackend(payloads.Scale.from_size(args.size), args.seed, args.latency, args.jitter,
+                          args.error_rate, args.host, args.port)
+    print(f"API simulée sur {backend.url} (Ctrl+C pour arrêter)")
+    try:
+        backend.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Exécution des pages Streamlit hors serveur ("bare mode").
+
+Les pages sont importées comme des modules ordinaires : leur code de niveau
+module (configuration, titre, barre latérale) s'exécute, mais pas ``main()``.
+Les appels ``st.*`` sont alors sans effet visible, tandis que la préparation
+des données et la sérialisation des figures Plotly ont bien lieu.
+"""
+import importlib.util
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def quiet_streamlit():
+    """Coupe les avertissements propres au mode bare ("missing ScriptRunContext"...)."""
+    from streamlit import config
+    from streamlit.logger import set_log_level
+
+    # La lecture de la configuration réinitialise le niveau : on la force d'abord
+    config.set_option("global.showWarningOnDirectExecution", False)
+    set_log_level(logging.ERROR)
+
+
+def load_page(relative_path):
+    """Importe une page (ex. ``"pages/Sales.py"``) sans exécuter son ``main()``."""
+    quiet_streamlit()
+    path = ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(f"page_{path.stem.lower()}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,82 @@
+"""Profil du temps d'import au démarrage (``python -X importtime``).
+
+Exemple ::
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --top 30 --output benchmarks/results/imports.json
+
+Un interpréteur neuf importe successivement les modules de ``--modules`` :
+par défaut Streamlit, ce qu'importe ``main.py``, puis chaque module de
+``dashboard``. Le rapport donne, pour chacun, le coût de son import en plus
+des précédents (ce qui était déjà importé n'est pas recompté), puis les
+``--top`` modules, toutes dépendances confondues, au coût cumulé le plus élevé.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+from benchmarks.harness import ROOT
+
+DEFAULT_MODULES = ["streamlit", "dashboard.warmup"] + sorted(
+    f"dashboard.{path.stem}" for path in (ROOT / "dashboard").glob("*.py")
+    if path.stem not in ("__init__", "warmup")
+)
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(modules):
+    """Renvoie les lignes de ``-X importtime`` : ``(module, self µs, cumulé µs, profondeur)``."""
+    code = "\n".join(f"import {module}" for module in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            entries.append((name, int(own), int(cumulative), len(indent) // 2))
+    return entries
+
+
+def report(entries, modules, top):
+    requested = {name: cumulative for name, _, cumulative, depth in entries
+                 if depth == 0 and name in modules}
+    print(f"{'module':<32} {'import (ms)':>12}")
+    for module in modules:
+        print(f"{module:<32} {requested.get(module, 0) / 1000:12.1f}")
+    total = sum(requested.values())
+    print(f"{'total':<32} {total / 1000:12.1f}\n")
+
+    heaviest = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    print(f"{'module (cumulé)':<56} {'cumulé (ms)':>12} {'propre (ms)':>12}")
+    for name, own, cumulative, _ in heaviest:
+        print(f"{name:<56} {cumulative / 1000:12.1f} {own / 1000:12.1f}")
+    return {
+        "modules": {module: requested.get(module, 0) / 1000 for module in modules},
+        "total_ms": total / 1000,
+        "heaviest": [{"module": name, "cumulative_ms": cumulative / 1000, "self_ms": own / 1000}
+                     for name, own, cumulative, _ in heaviest],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", help="modules à importer dans l'ordre, séparés par des virgules")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="fichier JSON où écrire le rapport")
+    args = parser.parse_args(argv)
+
+    modules = args.modules.split(",") if args.modules else DEFAULT_MODULES
+    summary = report(profile(modules), modules, args.top)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Rapport écrit dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""Test de charge : N sessions simulées en parallèle contre un serveur Streamlit réel.
+
+Exemple ::
+
+    python -m benchmarks.load_test --sessions 1,5,10,25 --iterations 5
+    python -m benchmarks.load_test --sessions 10 --latency 0.2 --jitter 0.1 --error-rate 0.05
+
+Pour chaque nombre de sessions, l'application (``streamlit run main.py``,
+sans navigateur) est démarrée dans un nouveau processus, branchée sur une API
+simulée (``benchmarks.fake_backend``). Chaque session est un client
+WebSocket qui parle le protocole du navigateur et rejoue un parcours :
+ouverture de ``main.py``, clic sur « Performances de Ventes »
+(``st.switch_page``), ``--iterations`` changements de produit dans le
+sélecteur, navigation vers ``pages/Sales_team.py`` puis ``--iterations``
+changements de page du classement. Une interaction dans un fragment ne
+rejoue que ce fragment, comme dans le navigateur.
+
+Une session non mesurée passe d'abord seule (imports, cache de l'application
+rempli), puis les sessions mesurées démarrent ensemble. Le rapport donne,
+par palier, les percentiles p50 / p95 / p99 de la durée des reruns (de
+l'envoi de l'interaction à la fin du script), les requêtes reçues par l'API
+(et les erreurs injectées), les exceptions affichées, le volume envoyé aux
+sessions et la mémoire résidente du serveur (début et pic). Les copies
+locales et le partage entre processus sont désactivés.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from benchmarks import payloads
+from benchmarks.fake_backend import FakeBackend
+from benchmarks.harness import ROOT
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+class AppServer:
+    """``streamlit run main.py`` dans un sous-processus, sur ``port``."""
+
+    def __init__(self, port, api_url, startup_timeout=60):
+        env = {**os.environ, "API_URL": api_url, "SNAPSHOT_DIR": "", "SHARED_FRAMES_DIR": ""}
+        self.port = port
+        if self._healthy():
+            raise RuntimeError(f"Le port {port} est déjà utilisé par un autre serveur")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", "main.py", "--server.headless", "true",
+             "--server.port", str(port), "--browser.gatherUsageStats", "false",
+             "--server.fileWatcherType", "none"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + startup_timeout
+        while not self._healthy():
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError(f"Le serveur Streamlit n'a pas démarré sur le port {port}")
+            time.sleep(0.2)
+
+    def _healthy(self):
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1):
+                return True
+        except OSError:
+            return False
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def rss(self):
+        """Mémoire résidente du serveur, en octets."""
+        with open(f"/proc/{self.process.pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class Session:
+    """Client WebSocket d'une session, qui mesure chacun de ses reruns."""
+
+    def __init__(self, websocket, stats):
+        self.websocket = websocket
+        self.stats = stats
+        self.page = ""
+        self.pages = {}
+        # {clé du widget: (id, élément, id du fragment qui le contient)}
+        self.widgets = {}
+        self._states = {}
+
+    async def rerun(self, step, page=None, **changes):
+        """Envoie les valeurs ``{clé: (champ de WidgetState, valeur)}`` et attend la fin du script.
+
+        Le rerun est limité au fragment du widget modifié, s'il y en a un.
+        """
+        message = BackMsg()
+        state = message.rerun_script
+        if page is not None:
+            self.page, self._states = self.pages[page], {}
+        state.page_script_hash = self.page
+        for key, (field, value) in changes.items():
+            widget_id, _, fragment_id = self.widgets[key]
+            state.fragment_id = fragment_id
+            self._states[widget_id] = (field, value)
+        for widget_id, (field, value) in self._states.items():
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            setattr(widget, field, value)
+        # Un clic ne vaut que pour un rerun
+        self._states = {k: v for k, v in self._states.items() if v[0] != "trigger_value"}
+
+        start = time.perf_counter()
+        await self.websocket.send(message.SerializeToString())
+        received = 0
+        while True:
+            data = await self.websocket.recv()
+            received += len(data)
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "navigation":
+                self.pages = {page.url_pathname or "main": page.page_script_hash
+                              for page in forward.navigation.app_pages}
+                self.page = forward.navigation.page_script_hash
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._record(forward.delta.new_element, forward.delta.fragment_id, step)
+            elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.stats["durations"][step].append(time.perf_counter() - start)
+        self.stats["bytes"] += received
+
+    def _record(self, element, fragment_id, step):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.stats["exceptions"][step] += 1
+            return
+        widget_id = getattr(getattr(element, kind), "id", "")
+        if widget_id.startswith("$$ID-"):
+            # Les identifiants des widgets nommés se terminent par leur clé
+            self.widgets[widget_id.rsplit("-", 1)[-1]] = (widget_id, element, fragment_id)
+
+    def element(self, key, kind):
+        return getattr(self.widgets[key][1], kind)
+
+
+async def scenario(url, seed, iterations, think, stats):
+    """Parcours scripté d'un utilisateur."""
+    rng = random.Random(seed)
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as websocket:
+        session = Session(websocket, stats)
+        await session.rerun("main.py")
+        await session.rerun("Sales.py", sales_nav=("trigger_value", True))
+        for _ in range(iterations):
+            await asyncio.sleep(think)
+            choice = session.element("product_choice", "selectbox")
+            products = [option for option in choice.options[1:] if option != choice.raw_value]
+            await session.rerun("Sales.py produit", product_choice=("string_value", rng.choice(products)))
+
+        await asyncio.sleep(think)
+        await session.rerun("Sales_team.py", page="Sales_team")
+        for page in range(iterations):
+            await asyncio.sleep(think)
+            pages = int(session.element("agent_board_page", "number_input").max)
+            await session.rerun("Sales_team.py classement",
+                                agent_board_page=("double_value", float(page % pages + 1)))
+
+
+def percentiles(samples):
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+def _stats():
+    return {"durations": defaultdict(list), "exceptions": defaultdict(int), "bytes": 0}
+
+
+async def _sample_rss(server, peak, interval=0.05):
+    while True:
+        peak[0] = max(peak[0], server.rss())
+        await asyncio.sleep(interval)
+
+
+async def run_step(server, backend, sessions, iterations, think, seed):
+    """Lance ``sessions`` sessions simultanées sur ``server`` ; renvoie les mesures du palier."""
+    await scenario(server.url, seed, 1, 0, _stats())
+    backend.reset()
+
+    stats = _stats()
+    rss_start = server.rss()
+    peak = [rss_start]
+    sampler = asyncio.create_task(_sample_rss(server, peak))
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(scenario(server.url, seed + i, iterations, think, stats) for i in range(sessions)),
+        return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    sampler.cancel()
+    peak[0] = max(peak[0], server.rss())
+
+    requests, errors = backend.counts()
+    durations = stats["durations"]
+    samples = [duration for values in durations.values() for duration in values]
+    return {
+        "sessions": sessions,
+        "reruns": len(samples),
+        "elapsed": elapsed,
+        **percentiles(samples),
+        "steps": {step: {"reruns": len(values), **percentiles(values)} for step, values in durations.items()},
+        "exceptions": dict(stats["exceptions"]),
+        "failed_sessions": [repr(outcome) for outcome in outcomes if isinstance(outcome, Exception)],
+        "bytes_sent": stats["bytes"],
+        "upstream": requests,
+        "upstream_total": sum(requests.values()),
+        "injected_errors": sum(errors.values()),
+        "rss_start": rss_start,
+        "rss_peak": peak[0],
+    }
+
+
+def report(result):
+    failures = sum(result["exceptions"].values()) + len(result["failed_sessions"])
+    print(f"{result['sessions']:>8} {result['reruns']:>7} {result['p50'] * 1000:9.0f} "
+          f"{result['p95'] * 1000:9.0f} {result['p99'] * 1000:9.0f} {result['upstream_total']:>7} "
+          f"{result['injected_errors']:>7} {failures:>7} {result['bytes_sent'] / 2**20:8.1f} "
+          f"{result['rss_start'] / 2**20:9.0f} {result['rss_peak'] / 2**20:9.0f}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,5,10",
+                        help="nombres de sessions simultanées à tester, séparés par des virgules")
+    parser.add_argument("--iterations", type=int, default=3,
+                        help="changements de produit, puis de page du classement, par session")
+    parser.add_argument("--think", type=float, default=0.0, help="pause entre deux interactions (s)")
+    parser.add_argument("--size", type=int, default=1000, help="nombre d'agents (voir payloads.Scale)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05, help="latence de chaque réponse de l'API (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latence aléatoire ajoutée, au plus (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part des requêtes en erreur 500")
+    parser.add_argument("--port", type=int, default=8599, help="port du serveur Streamlit")
+    parser.add_argument("--output", help="fichier JSON de sortie (défaut : benchmarks/results/load-<date>.json)")
+    args = parser.parse_args(argv)
+
+    scale = payloads.Scale.from_size(args.size)
+    print(f"{'sessions':>8} {'reruns':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'appels':>7} "
+          f"{'inject.':>7} {'échecs':>7} {'envoi Mo':>8} {'RSS (Mo)':>9} {'pic (Mo)':>9}")
+    results = []
+    with FakeBackend(scale, args.seed, args.latency, args.jitter, args.error_rate) as backend:
+        for sessions in (int(count) for count in args.sessions.split(",")):
+            # Un serveur neuf par palier : caches et mémoire repartent de zéro
+            server = AppServer(args.port, backend.url)
+            try:
+                result = asyncio.run(run_step(server, backend, sessions, args.iterations, args.think, args.seed))
+            finally:
+                server.stop()
+            results.append(result)
+            report(result)
+
+    output = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "scale": scale.label(),
+        "iterations": args.iterations,
+        "think": args.think,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        path = args.output
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"Résultats écrits dans {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
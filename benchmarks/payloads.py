@@ -0,0 +1,119 @@
+"""Générateur de réponses synthétiques de l'API FastAPI.
+
+Les réponses ont la même forme que celles de ``getAllProductsKpis``,
+``getAllProducts``, ``getProductKpis/{name}`` et ``getAllTeamsKpis`` ; leur
+taille est pilotée par un ``Scale``. La génération est déterministe pour une
+graine donnée, afin que deux campagnes de mesure soient comparables.
+"""
+import random
+from dataclasses import dataclass
+
+REGIONS = ["Europe", "USA", "Asie", "Afrique", "Océanie", "Amérique du Sud"]
+
+
+@dataclass(frozen=True)
+class Scale:
+    agents: int
+    managers: int
+    products: int
+    sectors: int
+    months: int
+    regions: int
+
+    @classmethod
+    def from_size(cls, size):
+        """Dérive des volumes cohérents à partir d'un nombre d'agents."""
+        return cls(
+            agents=size,
+            managers=max(1, size // 10),
+            products=max(1, size),
+            sectors=max(3, size // 50),
+            months=min(max(12, size // 100), 240),
+            regions=max(3, size // 500),
+        )
+
+    def label(self):
+        return f"{self.agents}a-{self.products}p-{self.sectors}s-{self.months}m"
+
+
+def _names(prefix, count):
+    return [f"{prefix} {i:05d}" for i in range(count)]
+
+
+def _regions(count):
+    return [REGIONS[i] if i < len(REGIONS) else f"Région {i:04d}" for i in range(count)]
+
+
+def _months(count):
+    return [f"{2015 + i // 12}-{i % 12 + 1:02d}" for i in range(count)]
+
+
+def all_products_kpis(scale, seed=0):
+    """Réponse de ``getAllProductsKpis``."""
+    rng = random.Random(seed)
+    sectors = _names("Secteur", scale.sectors)
+    won, engaging, lost = rng.randint(500, 5000), rng.randint(100, 1000), rng.randint(100, 2000)
+    won_revenue, lost_revenue = rng.uniform(1e6, 1e7), rng.uniform(1e5, 1e6)
+    return {
+        "total_revenue": won_revenue + lost_revenue,
+        "total_sales_won": won,
+        "total_sales_engaging": engaging,
+        "total_sales_lost": lost,
+        "total_sales_prospecting": rng.randint(0, 500),
+        "avg_revenue_per_product": won_revenue / scale.products,
+        "engagement_rate": rng.random(),
+        "total_won_revenue": won_revenue,
+        "total_lost_revenue": lost_revenue,
+        "total_revenue_per_sector": {s: rng.uniform(1e3, 1e6) for s in sectors},
+        "products_per_sector": {s: rng.randint(1, 200) for s in sectors},
+        "revenue_per_month": {m: rng.uniform(1e4, 1e6) for m in _months(scale.months)},
+        "sales_per_month": {m: rng.randint(10, 2000) for m in _months(scale.months)},
+    }
+
+
+def all_products(scale):
+    """Réponse de ``getAllProducts``."""
+    return [{"fields": {"product": name}} for name in product_names(scale)]
+
+
+def product_names(scale):
+    return _names("Produit", scale.products)
+
+
+def product_kpis(name, scale, seed=0):
+    """Réponse de ``getProductKpis/{name}``."""
+    rng = random.Random(f"{seed}-{name}")
+    deals = rng.randint(100, 5000)
+    won = rng.randint(0, deals // 2)
+    lost = rng.randint(0, deals - won)
+    revenue = rng.randint(10_000, 5_000_000)
+    return {
+        "product_name": name,
+        "total_deals": deals,
+        "total_sales": won + lost,
+        "total_sales_won": won,
+        "total_sales_lost": lost,
+        "total_revenue": revenue,
+        "avg_revenue": revenue // max(won, 1),
+        "engagement_rate": rng.uniform(0, 100),
+        "resignation_rate": rng.uniform(0, 60),
+        "sales_by_region": {r: rng.randint(0, 1000) for r in _regions(scale.regions)},
+        "sales_by_sector": {s: rng.randint(0, 1000) for s in _names("Secteur", scale.sectors)},
+    }
+
+
+def all_teams_kpis(scale, seed=0):
+    """Réponse de ``getAllTeamsKpis``."""
+    rng = random.Random(seed)
+    data = {}
+    for role, names in (("agent", _names("Agent", scale.agents)),
+                        ("manager", _names("Manager", scale.managers))):
+        sales = {n: rng.randint(0, 500) for n in names}
+        revenue = {n: rng.uniform(0, 1e6) for n in names}
+        won = {n: rng.uniform(0, 100) for n in names}
+        data[f"total_sales_per_{role}"] = sales
+        data[f"total_revenue_per_{role}"] = revenue
+        data[f"avg_revenue_per_{role}"] = {n: revenue[n] / sales[n] if sales[n] else 0 for n in names}
+        data[f"won_ratio_per_{role}"] = won
+        data[f"lost_ratio_per_{role}"] = {n: 100 - won[n] for n in names}
+    return data
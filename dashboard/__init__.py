@@ -0,0 +1 @@
+"""Briques partagées par les pages du dashboard (accès API, cache, rendu)."""
@@ -0,0 +1,89 @@
+"""Préparation vectorisée des tableaux de performance des agents et managers.
+
+Les graphiques ne reçoivent qu'une partie bornée des lignes : soit les N
+meilleurs suivis d'une ligne « Autres » qui agrège le reste, soit une page
+du classement. La taille envoyée au navigateur dépend donc de N (ou de la
+taille de page), pas de l'effectif total.
+"""
+import math
+
+import pandas as pd
+
+from dashboard import config
+
+TOP_N_DEFAULT = config.env_int("TEAM_CHART_TOP_N", 20)
+PAGE_SIZE_DEFAULT = config.env_int("TEAM_CHART_PAGE_SIZE", 25)
+OTHERS_LABEL = "Autres"
+
+SALES = "Total des Ventes"
+REVENUE = "Revenu Total (€)"
+AVG_REVENUE = "Revenu Moyen (€)"
+WON_RATIO = "Ratio Ventes conclues  (%)"
+LOST_RATIO = "Ratio Perdues (%)"
+
+# Critères de tri proposés dans les pages
+SORT_COLUMNS = {
+    "Revenu": REVENUE,
+    "Ventes": SALES,
+    "Ratio de ventes conclues": WON_RATIO,
+}
+
+
+# Libellés affichés pour les colonnes de ``TeamKpis.agents`` / ``TeamKpis.managers``
+DISPLAY_COLUMNS = {
+    "sales": SALES,
+    "revenue": REVENUE,
+    "avg_revenue": AVG_REVENUE,
+    "won_ratio": WON_RATIO,
+    "lost_ratio": LOST_RATIO,
+}
+
+
+def team_frame(people, label):
+    """Tableau des performances à afficher, à partir de ``TeamKpis.agents`` ou ``.managers``."""
+    frame = people.rename(columns=DISPLAY_COLUMNS).rename_axis(label).reset_index()
+    frame[label] = frame[label].astype(str)
+    return frame
+
+
+def top_n_with_others(frame, label, sort_by, n):
+    """Les ``n`` premières lignes selon ``sort_by``, plus une ligne « Autres ».
+
+    Dans la ligne « Autres », ventes et revenus sont sommés, le revenu moyen
+    est recalculé à partir de ces sommes et les ratios sont pondérés par le
+    nombre de ventes.
+    """
+    if len(frame) <= n:
+        return frame.sort_values(sort_by, ascending=False, ignore_index=True)
+
+    top_index = frame[sort_by].nlargest(n).index
+    top = frame.loc[top_index]
+    rest = frame.drop(index=top_index)
+
+    sales = rest[SALES].sum()
+    revenue = rest[REVENUE].sum()
+    if sales > 0:
+        won_ratio = (rest[WON_RATIO] * rest[SALES]).sum() / sales
+        lost_ratio = (rest[LOST_RATIO] * rest[SALES]).sum() / sales
+    else:
+        won_ratio, lost_ratio = rest[WON_RATIO].mean(), rest[LOST_RATIO].mean()
+    others = pd.DataFrame({
+        label: [f"{OTHERS_LABEL} ({len(rest)})"],
+        SALES: [sales],
+        REVENUE: [revenue],
+        AVG_REVENUE: [revenue / sales if sales > 0 else 0.0],
+        WON_RATIO: [won_ratio],
+        LOST_RATIO: [lost_ratio],
+    })
+    return pd.concat([top, others], ignore_index=True)
+
+
+def page_count(frame, page_size):
+    return max(1, math.ceil(len(frame) / page_size))
+
+
+def paginate(frame, sort_by, page, page_size):
+    """Page ``page`` (à partir de 1) du classement selon ``sort_by``."""
+    ranked = frame.sort_values(sort_by, ascending=False, kind="stable", ignore_index=True)
+    start = (page - 1) * page_size
+    return ranked.iloc[start:start + page_size]
@@ -0,0 +1,297 @@
+"""Règles d'alerte déclaratives, évaluées sur tous les produits, agents et managers.
+
+Une règle (``Rule``) compare une colonne d'un tableau d'indicateurs à un
+seuil. ``evaluate`` applique chaque règle à toutes les lignes de son tableau
+en une seule comparaison vectorisée (une par règle, quel que soit le nombre
+de lignes) et renvoie un tableau des indicateurs hors seuil. Quand plusieurs
+règles visent le même indicateur d'une même ligne (paliers), seule la plus
+grave est gardée.
+
+Les paliers qui ne sont pas des alertes font partie des mêmes règles : le
+palier ``INFO`` (« correct ») est une règle, le palier ``OK`` est le message
+de ``OK_MESSAGES`` quand aucune règle de l'indicateur ne se déclenche.
+``assess`` donne, pour les recommandations des pages, le palier atteint par
+chacun de ces indicateurs ; ``evaluate`` ne renvoie que les alertes.
+
+Les tableaux viennent des données déjà chargées : ``ProductsKpis`` et les
+moyennes d'équipe pour la ligne « Ensemble », ``TeamKpis.agents`` et
+``.managers``, et pour les produits ``product_metrics``. Aucune évaluation
+n'appelle l'API.
+
+``product_metrics`` garde, hors du cache LRU, les quelques indicateurs
+d'alerte de chaque produit (quatre nombres par produit). Il est rempli par
+``product_scanner``, qui parcourt tout le catalogue (``scan_product``, avec
+``ALERT_SCAN_WORKERS`` threads, relancé une fois par TTL des KPIs produits)
+sans remplir ni évincer le cache, et par les KPIs produits déjà en cache
+(``cached_products``).
+"""
+import operator
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from dashboard import config, loaders
+from dashboard.cache import kpi_cache
+from dashboard.prefetch import Prefetcher
+
+SCAN_WORKERS = config.env_int("ALERT_SCAN_WORKERS", 4)
+
+GLOBAL, PRODUCT, AGENT, MANAGER = "Global", "Produit", "Agent", "Manager"
+SCOPES = (GLOBAL, PRODUCT, AGENT, MANAGER)
+ERROR, WARNING, INFO, OK = "error", "warning", "info", "ok"
+# Gravités des alertes ; ``LEVELS`` ajoute les paliers des recommandations
+SEVERITIES = (ERROR, WARNING)
+LEVELS = (ERROR, WARNING, INFO, OK)
+GLOBAL_NAME = "Ensemble"
+
+_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Alerte ``severity`` quand ``metric <op> threshold`` pour une ligne du tableau ``scope``."""
+    scope: str
+    metric: str
+    op: str
+    threshold: float
+    severity: str
+    message: str
+
+
+# Règles des recommandations des pages, dans l'ordre d'affichage
+RULES = (
+    Rule(GLOBAL, "engagement_rate", "<", 0.3, ERROR,
+         "Faible taux d'engagement. Une révision urgente de vos stratégies d'engagement est nécessaire."),
+    Rule(GLOBAL, "engagement_rate", "<", 0.5, WARNING,
+         "Taux d'engagement moyen. Cherchez à améliorer vos techniques d'engagement client."),
+    Rule(GLOBAL, "win_rate", "<", 0.5, WARNING,
+         "Faible taux de réussite des ventes. Formez votre équipe pour améliorer ce taux."),
+    Rule(GLOBAL, "win_rate", "<", 0.7, INFO,
+         "Taux de réussite des ventes correct. Il y a encore de la marge d'amélioration."),
+    Rule(GLOBAL, "avg_agent_revenue", "<", 1000, WARNING,
+         "Les agents peuvent bénéficier de formations supplémentaires pour améliorer leurs performances de vente."),
+    Rule(GLOBAL, "avg_manager_revenue", "<", 2000, WARNING,
+         "Les managers doivent peut-être revoir leur stratégie de gestion d'équipe et de coaching."),
+    Rule(PRODUCT, "engagement_rate", "<", 50, WARNING,
+         "Le taux d'engagement est faible. Envisagez d'améliorer vos stratégies de vente et de marketing "
+         "pour augmenter l'intérêt des clients potentiels."),
+    Rule(PRODUCT, "resignation_rate", ">", 20, WARNING,
+         "Le taux de résiliation est élevé. Concentrez-vous sur l'amélioration de la satisfaction client "
+         "et la rétention."),
+    Rule(PRODUCT, "lost_ratio", ">", 0.3, WARNING,
+         "Le taux de perte de ventes est élevé. Analysez les raisons des échecs de vente et ajustez votre "
+         "approche en conséquence."),
+    Rule(AGENT, "won_ratio", "<", 50, WARNING, "Ratio de ventes conclues inférieur à 50 %."),
+    Rule(AGENT, "lost_ratio", ">", 30, WARNING, "Ratio de ventes perdues supérieur à 30 %."),
+    Rule(MANAGER, "won_ratio", "<", 50, WARNING, "Ratio de ventes conclues inférieur à 50 %."),
+    Rule(MANAGER, "lost_ratio", ">", 30, WARNING, "Ratio de ventes perdues supérieur à 30 %."),
+)
+
+# Palier « ok » des recommandations : aucune règle de l'indicateur ne se déclenche
+OK_MESSAGES = {
+    (GLOBAL, "engagement_rate"): "Excellent taux d'engagement ! Continuez vos stratégies actuelles.",
+    (GLOBAL, "win_rate"): "Excellent taux de réussite des ventes ! Votre équipe performe très bien.",
+    (GLOBAL, "avg_agent_revenue"):
+        "Les agents sont déjà performants. Encouragez-les à partager leurs bonnes pratiques avec leurs collègues.",
+    (GLOBAL, "avg_manager_revenue"):
+        "Les managers ont une bonne gestion. Encouragez-les à optimiser encore plus les performances de leurs équipes.",
+}
+
+# Libellés affichés pour les colonnes du tableau des alertes et pour les indicateurs
+DISPLAY_COLUMNS = {
+    "scope": "Portée",
+    "name": "Nom",
+    "metric": "Indicateur",
+    "value": "Valeur",
+    "threshold": "Seuil",
+    "severity": "Gravité",
+    "message": "Message",
+}
+METRIC_LABELS = {
+    "engagement_rate": "Taux d'engagement",
+    "resignation_rate": "Taux de résiliation",
+    "win_rate": "Taux de réussite des ventes",
+    "won_ratio": "Ratio ventes conclues (%)",
+    "lost_ratio": "Ratio ventes perdues",
+    "avg_agent_revenue": "Revenu moyen des agents (€)",
+    "avg_manager_revenue": "Revenu moyen des managers (€)",
+}
+
+
+def _ratio(numerator, denominator):
+    """``numerator / denominator`` élément par élément, NaN (jamais en alerte) si le dénominateur est nul."""
+    numerator = np.asarray(numerator, dtype="float64")
+    denominator = np.asarray(denominator, dtype="float64")
+    return np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan), where=denominator != 0)
+
+
+def product_frame(products):
+    """Tableau des indicateurs d'une liste de ``ProductKpis``, indexé par produit."""
+    products = list(products)
+    return pd.DataFrame({
+        "engagement_rate": np.fromiter((kpis.engagement_rate for kpis in products), "float64", len(products)),
+        "resignation_rate": np.fromiter((kpis.resignation_rate for kpis in products), "float64", len(products)),
+        "lost_ratio": _ratio([kpis.total_sales_lost for kpis in products],
+                             [kpis.total_deals for kpis in products]),
+    }, index=pd.Index([kpis.product_name for kpis in products], name=PRODUCT))
+
+
+def global_frame(products_kpis=None, team_kpis=None):
+    """Ligne unique « Ensemble » : indicateurs de ``ProductsKpis`` et moyennes des équipes."""
+    row = {}
+    if products_kpis is not None:
+        row["engagement_rate"] = products_kpis.engagement_rate
+        row["win_rate"] = _ratio(products_kpis.total_sales_won,
+                                 products_kpis.total_sales_won + products_kpis.total_sales_lost).item()
+    if team_kpis is not None:
+        row["avg_agent_revenue"] = team_kpis.agents["revenue"].mean() if len(team_kpis.agents) else 0.0
+        row["avg_manager_revenue"] = team_kpis.managers["revenue"].mean() if len(team_kpis.managers) else 0.0
+    return pd.DataFrame(row, index=pd.Index([GLOBAL_NAME], name=GLOBAL), dtype="float64")
+
+
+def cached_products(names):
+    """``ProductKpis`` des produits de ``names`` présents dans le cache (sans appel à l'API)."""
+    values = (kpi_cache.peek(("getProductKpis", name)) for name in names)
+    return [kpis for kpis in values if kpis is not None]
+
+
+# Colonnes de ``ProductKpis`` relevées par ``ProductMetrics``
+_PRODUCT_FIELDS = ("engagement_rate", "resignation_rate", "total_sales_lost", "total_deals")
+
+
+class ProductMetrics:
+    """Indicateurs d'alerte de chaque produit, gardés hors du cache LRU."""
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def update(self, kpis):
+        row = tuple(float(getattr(kpis, field)) for field in _PRODUCT_FIELDS)
+        with self._lock:
+            self._rows[kpis.product_name] = row
+
+    def frame(self, names):
+        """Tableau des produits de ``names`` déjà relevés (colonnes de ``product_frame``)."""
+        with self._lock:
+            found = [(name, self._rows[name]) for name in names if name in self._rows]
+        values = np.array([row for _, row in found], dtype="float64").reshape(-1, len(_PRODUCT_FIELDS))
+        return pd.DataFrame({
+            "engagement_rate": values[:, 0],
+            "resignation_rate": values[:, 1],
+            "lost_ratio": _ratio(values[:, 2], values[:, 3]),
+        }, index=pd.Index([name for name, _ in found], name=PRODUCT))
+
+    def __len__(self):
+        return len(self._rows)
+
+
+# Instances partagées par toutes les sessions
+product_metrics = ProductMetrics()
+product_scanner = Prefetcher(max_workers=SCAN_WORKERS, top_n=0, interval=kpi_cache.ttls.get("getProductKpis"))
+
+
+def scan_product(name):
+    """Relève les indicateurs d'alerte de ``name`` (appel à l'API si besoin, sans remplir le cache)."""
+    product_metrics.update(loaders.fetch_product_kpis(name))
+
+
+def frames(products_kpis=None, team_kpis=None, products=(), product_table=None):
+    """``{portée: tableau}`` à partir des données disponibles.
+
+    Le tableau des produits vient de ``product_table`` s'il est donné
+    (``ProductMetrics.frame``), sinon des ``ProductKpis`` de ``products``.
+    """
+    tables = {GLOBAL: global_frame(products_kpis, team_kpis)}
+    if product_table is not None and len(product_table):
+        tables[PRODUCT] = product_table
+    elif products:
+        tables[PRODUCT] = product_frame(products)
+    if team_kpis is not None:
+        tables[AGENT] = team_kpis.agents
+        tables[MANAGER] = team_kpis.managers
+    return tables
+
+
+def evaluate(tables, rules=RULES, severities=SEVERITIES):
+    """Tableau des alertes (colonnes de ``DISPLAY_COLUMNS``) des ``tables`` ``{portée: tableau}``.
+
+    Seules les règles de gravité ``severities`` sont appliquées. Trié par
+    gravité, puis portée et ordre des règles ; une seule alerte (la plus
+    grave) par indicateur d'une même ligne.
+    """
+    rules = tuple(rule for rule in rules if rule.severity in severities)
+    matched, positions, names, values = [], [], [], []
+    for number, rule in enumerate(rules):
+        table = tables.get(rule.scope)
+        if table is None or rule.metric not in table.columns:
+            continue
+        column = table[rule.metric].to_numpy(dtype="float64")
+        hits = np.flatnonzero(_OPERATORS[rule.op](column, rule.threshold))
+        if len(hits):
+            matched.append(np.full(len(hits), number))
+            positions.append(hits)
+            names.append(np.asarray(table.index[hits].astype(str), dtype=object))
+            values.append(column[hits])
+    if not matched:
+        return pd.DataFrame(columns=list(DISPLAY_COLUMNS))
+
+    matched = np.concatenate(matched)
+    positions = np.concatenate(positions)
+    severity = np.array([LEVELS.index(rule.severity) for rule in rules])[matched]
+    scope = np.array([SCOPES.index(rule.scope) for rule in rules])[matched]
+    order = np.lexsort((matched, scope, severity))
+
+    # Paliers : une seule alerte par (portée, indicateur, ligne), la première dans l'ordre de tri
+    targets = {}
+    target = np.array([targets.setdefault((rule.scope, rule.metric), len(targets)) for rule in rules])[matched]
+    keys = target[order].astype("int64") * (positions.max() + 1) + positions[order]
+    order = order[~pd.Series(keys).duplicated().to_numpy()]
+
+    def field(name):
+        # Catégories indexées par règle : les libellés ne sont pas recopiés pour chaque ligne
+        codes, labels = pd.factorize(pd.Series([getattr(rule, name) for rule in rules], dtype=object))
+        return pd.Categorical.from_codes(codes[matched[order]], categories=labels)
+
+    return pd.DataFrame({
+        "scope": field("scope"),
+        "name": np.concatenate(names)[order],
+        "metric": field("metric"),
+        "value": np.concatenate(values)[order],
+        "threshold": np.array([rule.threshold for rule in rules], dtype="float64")[matched[order]],
+        "severity": field("severity"),
+        "message": field("message"),
+    })
+
+
+def assess(tables, rules=RULES):
+    """Palier atteint par chaque indicateur de ``OK_MESSAGES``, pour chaque ligne de son tableau.
+
+    Mêmes colonnes qu'``evaluate``, dans l'ordre de ``OK_MESSAGES`` : la règle
+    la plus grave qui se déclenche (palier ``INFO`` compris), sinon le palier
+    ``OK``. Une valeur manquante (ratio sans dénominateur) n'a pas de palier.
+    """
+    found = evaluate(tables, rules, severities=LEVELS)
+    hits = {(row.scope, row.metric, row.name): row for row in found.itertuples(index=False)}
+    rows = []
+    for (scope, metric), message in OK_MESSAGES.items():
+        table = tables.get(scope)
+        if table is None or metric not in table.columns:
+            continue
+        for name, value in table[metric].items():
+            if pd.isna(value):
+                continue
+            hit = hits.get((scope, metric, str(name)))
+            rows.append(hit._asdict() if hit is not None else {
+                "scope": scope, "name": str(name), "metric": metric, "value": float(value),
+                "threshold": np.nan, "severity": OK, "message": message})
+    return pd.DataFrame(rows, columns=list(DISPLAY_COLUMNS))
+
+
+def summary(alerts):
+    """Nombre d'alertes par portée et gravité (toutes les combinaisons, à 0 si aucune)."""
+    counts = alerts.groupby(["scope", "severity"], observed=True).size()
+    index = pd.MultiIndex.from_product([SCOPES, SEVERITIES], names=["scope", "severity"])
+    return counts.reindex(index, fill_value=0).unstack()
@@ -0,0 +1,220 @@
+"""Client HTTP partagé vers l'API FastAPI.
+
+Un seul ``httpx.Client`` par processus : les connexions keep-alive sont
+réutilisées d'une session et d'un rerun à l'autre. Les GET sont idempotents
+et sont donc retentés, avec un backoff exponentiel à jitter, sur les erreurs
+réseau et les réponses 502/503/504.
+
+``get_json_conditional`` envoie ``If-None-Match`` / ``If-Modified-Since``
+et reconnaît une ressource inchangée (304, ou même empreinte du corps quand
+l'API ne renvoie pas de validateurs) sans la décoder.
+
+Les corps de réponse sont lus en flux puis décodés par ``dashboard.jsonstream``.
+
+Variables d'environnement :
+``API_URL``, ``API_CONNECT_TIMEOUT``, ``API_READ_TIMEOUT``, ``API_MAX_RETRIES``,
+``API_BACKOFF_BASE``, ``API_BACKOFF_MAX``, ``API_MAX_CONNECTIONS``,
+``API_MAX_KEEPALIVE`` et ``API_HTTP2`` (nécessite ``httpx[http2]``).
+"""
+import hashlib
+import importlib.util
+import logging
+import random
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+import httpx
+
+from dashboard import config, jsonstream, perf, resilience
+
+logger = logging.getLogger(__name__)
+
+# URL de l'API FastAPI
+API_URL = config.env_str("API_URL", "")
+
+CONNECT_TIMEOUT = config.env_float("API_CONNECT_TIMEOUT", 3)
+READ_TIMEOUT = config.env_float("API_READ_TIMEOUT", 15)
+MAX_RETRIES = config.env_int("API_MAX_RETRIES", 2)
+BACKOFF_BASE = config.env_float("API_BACKOFF_BASE", 0.2)
+BACKOFF_MAX = config.env_float("API_BACKOFF_MAX", 2)
+MAX_CONNECTIONS = config.env_int("API_MAX_CONNECTIONS", 20)
+MAX_KEEPALIVE = config.env_int("API_MAX_KEEPALIVE", 10)
+HTTP2 = config.env_bool("API_HTTP2")
+
+# Statuts transitoires pour lesquels un nouvel essai a du sens
+RETRYABLE_STATUSES = {502, 503, 504}
+
+# Renvoyé par get_json_conditional quand la ressource n'a pas changé
+NOT_MODIFIED = object()
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def build_url(path, *params):
+    """Construit l'URL d'un endpoint, quel que soit le ``/`` final de ``API_URL``.
+
+    Les paramètres de chemin (noms de produits...) sont encodés un par un.
+    """
+    url = f"{API_URL.rstrip('/')}/{path.lstrip('/')}"
+    for param in params:
+        url = f"{url.rstrip('/')}/{quote(str(param), safe='')}"
+    return url
+
+
+def get_client():
+    """Renvoie le client partagé, créé au premier appel."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http2 = HTTP2 and importlib.util.find_spec("h2") is not None
+                if HTTP2 and not http2:
+                    logger.warning("API_HTTP2 est activé mais le paquet 'h2' est absent : HTTP/1.1 utilisé")
+                _client = httpx.Client(
+                    timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                    limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                        max_keepalive_connections=MAX_KEEPALIVE),
+                    http2=http2,
+                    follow_redirects=True,
+                )
+    return _client
+
+
+def backoff_delay(attempt):
+    """Délai avant le nouvel essai numéro ``attempt`` (full jitter)."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _read_body(response, deadline):
+    """Recopie le corps dans un fichier temporaire ; renvoie ``(fichier, taille, empreinte)``."""
+    body = tempfile.SpooledTemporaryFile(max_size=jsonstream.SPOOL_MAX_BYTES)
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in response.iter_bytes(jsonstream.CHUNK_SIZE):
+        if deadline is not None and time.monotonic() > deadline:
+            body.close()
+            raise resilience.DeadlineExceeded(f"Réponse trop lente de {response.url.path}")
+        body.write(chunk)
+        digest.update(chunk)
+    size = body.tell()
+    body.seek(0)
+    return body, size, digest.hexdigest()
+
+
+def _timeout(deadline):
+    """Délais d'un essai, bornés par l'échéance de l'appel."""
+    if deadline is None:
+        return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+    left = deadline - time.monotonic()
+    return httpx.Timeout(min(READ_TIMEOUT, left), connect=min(CONNECT_TIMEOUT, left))
+
+
+def _get_with_retries(url, endpoint, headers, deadline):
+    for attempt in range(MAX_RETRIES + 1):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise resilience.DeadlineExceeded(f"Délai dépassé pour {endpoint}")
+        start = time.perf_counter()
+        try:
+            with get_client().stream("GET", url, headers=headers, timeout=_timeout(deadline)) as response:
+                if response.status_code in RETRYABLE_STATUSES and attempt < MAX_RETRIES:
+                    perf.record("upstream", endpoint, time.perf_counter() - start, status=response.status_code)
+                    logger.info("GET %s : statut %s, nouvel essai", url, response.status_code)
+                    _sleep_before_retry(attempt, deadline, endpoint)
+                    continue
+                if response.status_code != 304:
+                    response.raise_for_status()
+                body, size, digest = _read_body(response, deadline)
+            perf.record("upstream", endpoint, time.perf_counter() - start,
+                        status=response.status_code, size=size)
+            return response, body, size, digest
+        except httpx.HTTPStatusError as e:
+            perf.record("upstream", endpoint, time.perf_counter() - start, status=e.response.status_code)
+            raise
+        except resilience.DeadlineExceeded:
+            perf.record("upstream", endpoint, time.perf_counter() - start, status="DeadlineExceeded")
+            raise
+        except httpx.TransportError as e:
+            perf.record("upstream", endpoint, time.perf_counter() - start, status=type(e).__name__)
+            if attempt == MAX_RETRIES:
+                raise
+            logger.info("GET %s : erreur réseau, nouvel essai", url, exc_info=True)
+            _sleep_before_retry(attempt, deadline, endpoint)
+
+
+def _sleep_before_retry(attempt, deadline, endpoint):
+    delay = backoff_delay(attempt)
+    if deadline is not None and time.monotonic() + delay >= deadline:
+        raise resilience.DeadlineExceeded(f"Délai dépassé pour {endpoint}")
+    time.sleep(delay)
+
+
+def _get(path, *params, headers=None):
+    """GET avec nouvels essais ; renvoie ``(réponse, corps, taille, empreinte)``.
+
+    La réponse est un succès ou un 304 ; le corps est un fichier temporaire
+    à fermer par l'appelant. L'appel passe par le disjoncteur de l'endpoint et
+    respecte le budget du rendu en cours (voir ``dashboard.resilience``).
+    """
+    url = build_url(path, *params)
+    endpoint = path.strip("/")
+    breaker = resilience.breaker_for(endpoint)
+    try:
+        breaker.before_call()
+    except resilience.CircuitOpenError:
+        perf.record("upstream", endpoint, 0.0, status="CircuitOpen")
+        raise
+
+    try:
+        result = _get_with_retries(url, endpoint, headers, resilience.call_deadline())
+    except httpx.HTTPStatusError as e:
+        # Une erreur 4xx ne dit rien de la santé du serveur
+        if e.response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+    except resilience.DeadlineExceeded:
+        # Budget de l'appelant épuisé : l'endpoint n'est pas en cause
+        breaker.record_cancel()
+        raise
+    except Exception:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # Abandon côté appelant (arrêt du script ou du processus)
+        breaker.record_cancel()
+        raise
+    breaker.record_success()
+    return result
+
+
+def get_json_conditional(path, *params, validators=None):
+    """GET conditionnel : renvoie ``(json, validateurs)``.
+
+    ``validators`` est le dictionnaire renvoyé par l'appel précédent
+    (``etag``, ``last_modified``, ``digest``). Si la ressource n'a pas changé,
+    le JSON renvoyé est ``NOT_MODIFIED`` et le corps n'est pas décodé.
+    """
+    validators = validators or {}
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    response, body, size, digest = _get(path, *params, headers=headers)
+    with body:
+        if response.status_code == 304:
+            return NOT_MODIFIED, validators
+
+        new_validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            # Empreinte du corps, pour les API sans ETag ni Last-Modified
+            "digest": digest,
+        }
+        if validators.get("digest") == digest:
+            return NOT_MODIFIED, new_validators
+        return jsonstream.load(body, size), new_validators
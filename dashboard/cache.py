@@ -0,0 +1,228 @@
+"""Cache des réponses de l'API partagé par toutes les sessions du processus.
+
+Chaque entrée a une durée de vie propre à son endpoint. Une entrée expirée est
+encore servie pendant qu'un thread d'arrière-plan la rafraîchit
+(stale-while-revalidate), et les entrées les moins utilisées sont évincées
+au-delà de ``KPI_CACHE_MAX_ENTRIES``. Une entrée oubliée par ``invalidate``
+reste marquée (``invalidated``) jusqu'à sa prochaine valeur, pour que son
+rechargement aille chercher l'API plutôt qu'une copie. Les fonctions
+enregistrées par ``on_evict`` sont appelées pour chaque clé évincée ou
+oubliée (libération des ressources associées à la valeur).
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from dashboard import config
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie (en secondes) des réponses, par endpoint
+ENDPOINT_TTLS = {
+    "getAllProductsKpis": config.env_float("CACHE_TTL_ALL_PRODUCTS_KPIS", 60),
+    "getAllProducts": config.env_float("CACHE_TTL_ALL_PRODUCTS", 300),
+    "getProductKpis": config.env_float("CACHE_TTL_PRODUCT_KPIS", 120),
+    "getAllTeamsKpis": config.env_float("CACHE_TTL_ALL_TEAMS_KPIS", 60),
+}
+DEFAULT_TTL = config.env_float("CACHE_TTL_DEFAULT", 60)
+MAX_ENTRIES = config.env_int("KPI_CACHE_MAX_ENTRIES", 512)
+
+# Intervalle de rafraîchissement automatique des sections des pages (désactivé si 0)
+AUTO_REFRESH_SECONDS = config.env_float("AUTO_REFRESH_SECONDS", 0) or None
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "ttl", "refreshing")
+
+    def __init__(self, value, ttl, fetched_at=None):
+        self.value = value
+        self.fetched_at = time.monotonic() if fetched_at is None else fetched_at
+        self.ttl = ttl
+        self.refreshing = False
+
+    def is_fresh(self, now):
+        return now - self.fetched_at < self.ttl
+
+
+class KpiCache:
+    """Cache LRU borné, avec TTL par endpoint et rafraîchissement en arrière-plan.
+
+    Les clés sont des tuples ``(endpoint, *paramètres)`` ; le TTL est choisi
+    d'après le premier élément de la clé.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttls=None, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._loading = set()
+        self._invalidated = set()
+        self._evict_listeners = []
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kpi-cache-refresh")
+
+    def ttl_for(self, key):
+        return self.ttls.get(key[0], self.default_ttl)
+
+    def on_evict(self, listener):
+        """Appelle ``listener(key)`` pour chaque clé qui quitte le cache."""
+        self._evict_listeners.append(listener)
+
+    def _evict_locked(self):
+        """Évince les entrées au-delà de ``max_entries`` ; renvoie leurs clés."""
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            evicted.append(self._entries.popitem(last=False)[0])
+        return evicted
+
+    def _notify(self, keys):
+        for key in keys:
+            for listener in self._evict_listeners:
+                try:
+                    listener(key)
+                except Exception:
+                    logger.warning("Libération impossible pour %s", key, exc_info=True)
+
+    def get(self, key, fetch, fallback=None):
+        """Renvoie la valeur associée à ``key``, en appelant ``fetch()`` si besoin.
+
+        Une entrée expirée est renvoyée telle quelle et rafraîchie en
+        arrière-plan ; seule une absence totale d'entrée bloque l'appelant.
+        Dans ce cas, ``fallback(key)`` (copie locale par exemple) est essayé
+        d'abord : s'il renvoie une valeur, elle est servie immédiatement et
+        rafraîchie en arrière-plan. Sinon les exceptions levées par ``fetch``
+        sont propagées.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if not entry.is_fresh(time.monotonic()) and not entry.refreshing:
+                    entry.refreshing = True
+                    self._refresher.submit(self._refresh, key, fetch)
+                return entry.value
+
+        if fallback is not None:
+            value = fallback(key)
+            if value is not None:
+                self._put_stale(key, value, fetch)
+                return value
+
+        value = fetch()
+        self.put(key, value)
+        return value
+
+    def is_fresh(self, key):
+        """Indique si ``key`` a une entrée en cache encore dans son TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.is_fresh(time.monotonic())
+
+    def peek(self, key):
+        """Renvoie la valeur en cache sans jamais appeler l'API (``None`` si absente)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def invalidated(self, key):
+        """Indique si ``key`` a été oubliée par ``invalidate`` sans avoir été rechargée depuis."""
+        with self._lock:
+            return key in self._invalidated
+
+    def revalidate(self, key):
+        """Retire la marque ``invalidated`` de ``key`` (rechargement forcé abandonné)."""
+        with self._lock:
+            self._invalidated.discard(key)
+
+    def put(self, key, value):
+        with self._lock:
+            self._invalidated.discard(key)
+            self._entries[key] = _Entry(value, self.ttl_for(key))
+            self._entries.move_to_end(key)
+            evicted = self._evict_locked()
+        self._notify(evicted)
+
+    def prefill(self, key, value):
+        """Ajoute ``key`` sans évincer d'entrée d'un autre endpoint (préchargement).
+
+        Cache plein : seule l'entrée la moins récemment utilisée du même
+        endpoint est évincée ; s'il n'y en a aucune, la valeur n'est pas
+        ajoutée. Renvoie ``True`` si la valeur est en cache.
+        """
+        evicted = []
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                victim = next((k for k in self._entries if k[0] == key[0]), None)
+                if victim is None:
+                    return False
+                del self._entries[victim]
+                evicted.append(victim)
+            self._invalidated.discard(key)
+            self._entries[key] = _Entry(value, self.ttl_for(key))
+            self._entries.move_to_end(key)
+        self._notify(evicted)
+        return True
+
+    def _put_stale(self, key, value, fetch):
+        """Ajoute une entrée déjà expirée et lance son rafraîchissement."""
+        with self._lock:
+            entry = self._entries[key] = _Entry(value, self.ttl_for(key), fetched_at=float("-inf"))
+            entry.refreshing = True
+            self._entries.move_to_end(key)
+            evicted = self._evict_locked()
+        self._notify(evicted)
+        self._refresher.submit(self._refresh, key, fetch)
+
+    def load_later(self, key, fetch):
+        """Charge ``key`` en arrière-plan (une seule fois à la fois), sans attendre."""
+        with self._lock:
+            if key in self._entries or key in self._loading:
+                return
+            self._loading.add(key)
+        self._refresher.submit(self._load, key, fetch)
+
+    def _load(self, key, fetch):
+        try:
+            self.put(key, fetch())
+        except Exception as e:
+            logger.warning("Chargement impossible pour %s : %s", key, e)
+        finally:
+            with self._lock:
+                self._loading.discard(key)
+
+    def invalidate(self, endpoint=None):
+        """Oublie toutes les entrées, ou seulement celles d'un endpoint, et les marque ``invalidated``."""
+        with self._lock:
+            if endpoint is None:
+                removed = list(self._entries)
+                self._invalidated = set(removed)
+                self._entries.clear()
+            else:
+                removed = [k for k in self._entries if k[0] == endpoint]
+                for key in removed:
+                    self._invalidated.add(key)
+                    del self._entries[key]
+        self._notify(removed)
+
+    def _refresh(self, key, fetch):
+        try:
+            value = fetch()
+        except Exception as e:
+            # On garde la dernière valeur connue ; le prochain accès retentera
+            logger.warning("Rafraîchissement impossible pour %s : %s", key, e)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+            return
+        self.put(key, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Instance unique, partagée par toutes les sessions et toutes les pages
+kpi_cache = KpiCache()
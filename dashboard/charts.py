@@ -0,0 +1,58 @@
+"""Affichage des figures Plotly, dans un budget d'octets envoyés au navigateur.
+
+La taille du JSON de chaque figure est mesurée (``figures.figure_json``,
+calculé une fois par figure en cache). Au-delà de ``CHART_COMPACT_BYTES``,
+c'est sa version compacte (``figures.compact_figure``) qui est envoyée. Les
+octets des graphiques d'un rerun sont additionnés : au-delà de
+``VIEW_BYTE_BUDGET``, un avertissement est journalisé, une fois par rerun,
+et une mesure ``"budget"`` est enregistrée (voir ``dashboard.perf``).
+"""
+import logging
+import time
+
+import streamlit as st
+
+from dashboard import config, figures, perf
+
+logger = logging.getLogger(__name__)
+
+CHART_COMPACT_BYTES = config.env_int("CHART_COMPACT_BYTES", 50_000)
+VIEW_BYTE_BUDGET = config.env_int("VIEW_BYTE_BUDGET", 1_000_000)
+
+
+def _chart_name(fig, key):
+    if key:
+        return key
+    title = fig.layout.title.text
+    return title or "plotly_chart"
+
+
+def within_budget(fig):
+    """Figure à envoyer (``fig`` ou sa version compacte) et taille de son JSON."""
+    size = len(figures.figure_json(fig))
+    if size > CHART_COMPACT_BYTES:
+        fig = figures.compact_figure(fig)
+        size = len(figures.figure_json(fig))
+    return fig, size
+
+
+def _check_view_budget():
+    records = perf.current_run()
+    total = sum(record["bytes"] or 0 for record in records if record["kind"] == "chart")
+    if total > VIEW_BYTE_BUDGET and not any(record["kind"] == "budget" for record in records):
+        page = perf.current_page()
+        logger.warning("Vue %s : %d octets de graphiques envoyés, au-delà du budget de %d octets",
+                       page, total, VIEW_BYTE_BUDGET)
+        perf.record("budget", page, 0.0, size=total)
+
+
+def plotly_chart(fig, **kwargs):
+    """Équivalent de ``st.plotly_chart`` chronométré (sérialisation comprise), dans le budget d'octets."""
+    name = _chart_name(fig, kwargs.get("key"))
+    start = time.perf_counter()
+    fig, size = within_budget(fig)
+    try:
+        return st.plotly_chart(fig, **kwargs)
+    finally:
+        perf.record("chart", name, time.perf_counter() - start, size=size)
+        _check_view_budget()
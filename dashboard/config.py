@@ -0,0 +1,31 @@
+"""Lecture de la configuration, une seule fois par processus.
+
+Le fichier ``.env`` est chargé au premier import de ce module. Chaque module
+de ``dashboard`` lit ses réglages avec ces fonctions, à son propre import :
+``.env`` est donc pris en compte quel que soit l'ordre des imports, et rien
+n'est relu aux reruns suivants.
+"""
+import os
+
+from dotenv import load_dotenv
+
+# Chargement des variables d'environnement
+load_dotenv()
+
+TRUE_VALUES = ("1", "true", "yes")
+
+
+def env_str(name, default=""):
+    return os.getenv(name, default)
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+def env_bool(name, default=False):
+    return os.getenv(name, "1" if default else "0").lower() in TRUE_VALUES
@@ -0,0 +1,344 @@
+"""Export HTML statique de chaque vue du tableau de bord, sans navigateur.
+
+Exemple ::
+
+    python -m dashboard.export --output exports
+    python -m dashboard.export --output exports --products 100 --force
+
+Les données sont chargées comme dans les pages (``dashboard.loaders``, sans
+copie locale), les KPIs produits par ``EXPORT_FETCH_WORKERS`` threads. Chaque
+vue (vue globale, équipe de ventes, puis un fichier par produit) est rendue
+dans un pool de ``EXPORT_WORKERS`` processus : les figures viennent de
+``dashboard.figures`` et leur sérialisation, le coût principal, se fait en
+parallèle. Chaque fichier HTML est autonome (plotly.js inclus), sauf avec
+``--plotlyjs directory`` qui écrit un seul ``plotly.min.js`` à côté.
+
+``manifest.json`` garde l'empreinte des données de chaque vue exportée : une
+vue dont les données n'ont pas changé depuis le dernier export n'est pas
+rendue à nouveau (``--force`` pour tout refaire). ``index.html`` liste les
+vues exportées.
+"""
+import argparse
+import dataclasses
+import hashlib
+import html
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+import httpx
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from dashboard import aggregations, alerts, config, figures, loaders, models, ranking, resilience, timeseries
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = config.env_str("EXPORT_DIR", "exports")
+EXPORT_WORKERS = config.env_int("EXPORT_WORKERS", os.cpu_count() or 1)
+EXPORT_FETCH_WORKERS = config.env_int("EXPORT_FETCH_WORKERS", 8)
+
+# À incrémenter quand le contenu des pages exportées change : tout est alors refait
+EXPORT_FORMAT = 2
+
+GLOBAL_VIEW, TEAM_VIEW = "global", "equipe"
+PRODUCTS_DIR = "produits"
+MANIFEST = "manifest.json"
+PLOTLYJS = "plotly.min.js"
+
+_STYLE = """
+body { font-family: sans-serif; margin: 2rem; background: #0e1117; color: #fafafa; }
+h1, h2 { color: #00ED9A; }
+.metrics { display: flex; flex-wrap: wrap; gap: 1rem; }
+.metric { background: #262730; padding: .75rem 1rem; border-radius: .5rem; min-width: 12rem; }
+.metric span { display: block; font-size: .85rem; color: #a3a8b8; }
+.metric strong { font-size: 1.4rem; }
+.charts { display: grid; grid-template-columns: repeat(auto-fit, minmax(32rem, 1fr)); gap: 1rem; }
+.warning { background: #3d3a1e; padding: .5rem 1rem; border-radius: .5rem; margin: .5rem 0; }
+.info { background: #1e2a3d; padding: .5rem 1rem; border-radius: .5rem; margin: .5rem 0; }
+a { color: #00ED9A; }
+"""
+
+
+def _slug(name):
+    """Nom de fichier sûr (``[A-Za-z0-9_-]``) et unique pour ``name`` : sa forme lisible
+    tronquée, suivie d'une empreinte courte du nom complet."""
+    readable = re.sub(r"[^A-Za-z0-9_-]+", "-", name).strip("-")[:60]
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return f"{readable}-{digest}" if readable else digest
+
+
+def view_path(view):
+    """Chemin relatif du fichier HTML de ``view`` (``"global"``, ``"equipe"`` ou ``("produit", nom)``)."""
+    if isinstance(view, tuple):
+        return f"{PRODUCTS_DIR}/{_slug(view[1])}.html"
+    return f"{view}.html"
+
+
+def data_hash(view, value):
+    """Empreinte des données d'une vue (sans la date ni la provenance, qui changent à chaque appel)."""
+    parts = [getattr(value, field.name) for field in dataclasses.fields(value)
+             if field.name not in ("as_of", "source")]
+    return figures.payload_hash(EXPORT_FORMAT, repr(view), *parts)
+
+
+# --- Rendu (dans les processus du pool) ----------------------------------------
+
+def _metrics(items):
+    cells = "".join(f"<div class='metric'><span>{html.escape(label)}</span><strong>{html.escape(str(value))}</strong></div>"
+                    for label, value in items)
+    return f"<div class='metrics'>{cells}</div>"
+
+
+def _charts(*figs):
+    parts = [pio.to_html(fig, full_html=False, include_plotlyjs=False, default_width="100%",
+                         config={"displaylogo": False}) for fig in figs]
+    return f"<div class='charts'>{''.join(f'<div>{part}</div>' for part in parts)}</div>"
+
+
+def _notes(kind, messages):
+    return "".join(f"<div class='{kind}'>{html.escape(message)}</div>" for message in messages)
+
+
+def _global_body(data):
+    months = timeseries.monthly(data.months)
+    month_charts = ()
+    if months is not None:
+        enriched = timeseries.enrich(months)
+        month_charts = (figures.revenue_per_month(enriched), figures.sales_per_month(enriched),
+                        figures.month_trend(enriched, "revenue", "Revenu"))
+    elif data.months is not None:
+        month_charts = (figures.revenue_per_month(data.months), figures.sales_per_month(data.months))
+    assessed = alerts.assess({alerts.GLOBAL: alerts.global_frame(data)})
+    return "".join((
+        "<h1>Vue d'ensemble des performances</h1>",
+        _metrics([
+            ("Revenu Total", f"{data.total_revenue:,.2f} €"),
+            ("Ventes conclues", data.total_sales_won),
+            ("Ventes en cours", data.total_sales_engaging),
+            ("Ventes Perdues", data.total_sales_lost),
+            ("Revenu Moyen par Produit", f"{data.avg_revenue_per_product:,.2f} €"),
+            ("Taux d'Engagement", f"{data.engagement_rate * 100:.2f}%"),
+            ("Revenus Gagnés", f"{data.total_won_revenue:,.2f} €"),
+            ("Revenus Perdus", f"{data.total_lost_revenue:,.2f} €"),
+        ]),
+        _charts(figures.sales_breakdown(data.total_sales_won, data.total_sales_engaging,
+                                        data.total_sales_lost, data.total_sales_prospecting),
+                figures.top_sectors_revenue(data.sectors)),
+        "<h2>Recommandations</h2>",
+        *(_notes("warning" if row.severity in alerts.SEVERITIES else "info", [row.message])
+          for row in assessed.itertuples()),
+        _notes("info", [f"Le secteur le plus performant est '{data.sectors['revenue'].idxmax()}'."]),
+        "<h2>Revenus et ventes par mois</h2>",
+        _charts(*month_charts),
+        "<h2>Produits vendus et revenus par secteur</h2>",
+        _charts(figures.products_per_sector(data.sectors), figures.revenue_per_sector(data.sectors)),
+    ))
+
+
+def _team_body(data):
+    items = []
+    for title, people in (("Meilleur Agent", data.agents), ("Meilleur Manager", data.managers)):
+        best = ranking.best(people, "revenue")
+        if len(best):
+            first = best.iloc[0]
+            items += [(title, " / ".join(map(str, best.index))), ("Ventes", int(first["sales"])),
+                      ("Revenu Total (€)", f"{float(first['revenue']):.2f}")]
+    agents = aggregations.top_n_with_others(aggregations.team_frame(data.agents, "Agent"), "Agent",
+                                            aggregations.REVENUE, aggregations.TOP_N_DEFAULT)
+    managers = aggregations.top_n_with_others(aggregations.team_frame(data.managers, "Manager"), "Manager",
+                                              aggregations.REVENUE, aggregations.TOP_N_DEFAULT)
+    counts = alerts.summary(alerts.evaluate(alerts.frames(team_kpis=data))).sum(axis=1)
+    return "".join((
+        "<h1>Évaluation des Performances de l'Équipe de Ventes</h1>",
+        _metrics(items),
+        "<h2>Performances des Agents de Vente</h2>",
+        _charts(figures.agent_volume(agents), figures.agent_ratios(agents)),
+        "<h2>Performances des Managers</h2>",
+        _charts(figures.manager_volume(managers), figures.manager_ratios(managers)),
+        "<h2>Alertes</h2>",
+        _metrics([(scope, int(counts[scope])) for scope in (alerts.GLOBAL, alerts.AGENT, alerts.MANAGER)]),
+    ))
+
+
+def _product_body(kpis):
+    found = alerts.evaluate({alerts.PRODUCT: alerts.product_frame([kpis])})
+    return "".join((
+        f"<h1>Analyse des performances du produit : {html.escape(kpis.product_name)}</h1>",
+        _metrics([
+            ("Total des transactions", kpis.total_deals),
+            ("Ventes conclues", kpis.total_sales_won),
+            ("Ventes perdues", kpis.total_sales_lost),
+            ("Chiffre d'affaires total", f"{kpis.total_revenue:,} €"),
+            ("Chiffre d'affaires moyen par vente", f"{kpis.avg_revenue:,} €"),
+        ]),
+        _charts(figures.engagement_gauges(kpis.engagement_rate, kpis.resignation_rate),
+                figures.sales_funnel(kpis.total_deals, kpis.total_sales, kpis.total_sales_won),
+                figures.product_sales_breakdown(kpis.total_sales_won, kpis.total_sales_lost,
+                                                kpis.total_deals - kpis.total_sales_won - kpis.total_sales_lost),
+                figures.sales_by_region(kpis.regions),
+                figures.sales_by_sector(kpis.sectors)),
+        "<h2>Recommandations</h2>",
+        _notes("warning", found["message"]),
+        _notes("info", [f"La région {kpis.regions['sales'].idxmax()} montre les meilleures performances.",
+                        f"Le secteur {kpis.sectors['sales'].idxmax()} est le plus performant."]),
+    ))
+
+
+_BODIES = {GLOBAL_VIEW: _global_body, TEAM_VIEW: _team_body}
+_plotlyjs = None
+
+
+def _script(plotlyjs, depth):
+    global _plotlyjs
+    if plotlyjs == "directory":
+        return f"<script src='{'../' * depth}{PLOTLYJS}'></script>"
+    if _plotlyjs is None:
+        # Une seule lecture de plotly.js par processus
+        _plotlyjs = get_plotlyjs()
+    return f"<script type='text/javascript'>{_plotlyjs}</script>"
+
+
+def render(view, value, output, plotlyjs="inline"):
+    """Écrit le fichier HTML de ``view`` dans ``output`` ; renvoie ``(vue, octets, secondes)``."""
+    start = time.perf_counter()
+    relative = view_path(view)
+    body = (_product_body if isinstance(view, tuple) else _BODIES[view])(value)
+    title = view[1] if isinstance(view, tuple) else view
+    as_of = value.as_of.astimezone().strftime("%d/%m/%Y %H:%M")
+    page = (f"<!DOCTYPE html><html lang='fr'><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            f"<style>{_STYLE}</style>{_script(plotlyjs, relative.count('/'))}</head><body>"
+            f"<p><a href='{'../' * relative.count('/')}index.html'>Sommaire</a> · Données au {as_of}</p>"
+            f"{body}</body></html>").encode("utf-8")
+    path = Path(output) / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(page)
+    os.replace(tmp, path)
+    return view, len(page), time.perf_counter() - start
+
+
+# --- Orchestration ---------------------------------------------------------------
+
+def _load(parse, path, *params):
+    """Valeur de l'endpoint, ou ``None`` (erreur journalisée) s'il est indisponible."""
+    try:
+        return loaders.load_fresh(parse, path, *params)
+    except (ValueError, httpx.HTTPError, resilience.CircuitOpenError, resilience.DeadlineExceeded) as e:
+        logger.warning("Chargement impossible de %s %s : %s", path, " ".join(map(str, params)), e)
+        return None
+
+
+def _load_product(name):
+    return ("produit", name), _load(models.ProductKpis.from_payload, "getProductKpis", name)
+
+
+def _read_manifest(output):
+    try:
+        return json.loads((Path(output) / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(output, manifest):
+    links = []
+    for key in sorted(manifest, key=lambda key: (key.startswith(f"{PRODUCTS_DIR}/"), key)):
+        label = manifest[key]["title"]
+        # Le lien est une URL : un chemin d'un ancien export (nom encodé) reste valable
+        links.append(f"<li><a href='{html.escape(quote(key))}'>{html.escape(label)}</a></li>")
+    page = (f"<!DOCTYPE html><html lang='fr'><head><meta charset='utf-8'><title>Rapports</title>"
+            f"<style>{_STYLE}</style></head><body><h1>Rapports du {datetime.now():%d/%m/%Y %H:%M}</h1>"
+            f"<ul>{''.join(links)}</ul></body></html>")
+    (Path(output) / "index.html").write_text(page, encoding="utf-8")
+
+
+def export(output=EXPORT_DIR, workers=EXPORT_WORKERS, fetch_workers=EXPORT_FETCH_WORKERS,
+           products=0, force=False, plotlyjs="inline"):
+    """Exporte toutes les vues dans ``output`` ; renvoie un résumé (vues rendues, inchangées, en échec)."""
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    previous = {} if force else _read_manifest(output)
+    manifest = {}
+    stats = {"rendered": 0, "unchanged": 0, "failed": 0, "bytes": 0}
+    if plotlyjs == "directory":
+        (output / PLOTLYJS).write_text(get_plotlyjs(), encoding="utf-8")
+
+    # Processus neufs (pas de fork d'un processus qui a déjà des threads HTTP)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, \
+            ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="export-fetch") as fetcher:
+        pending = {}
+
+        def submit(view, value):
+            """Rend ``view`` dans le pool, sauf si ses données n'ont pas changé."""
+            if value is None:
+                stats["failed"] += 1
+                return
+            relative = view_path(view)
+            digest = data_hash(view, value)
+            title = view[1] if isinstance(view, tuple) else view
+            manifest[relative] = {"hash": digest, "title": title}
+            if previous.get(relative, {}).get("hash") == digest and (output / relative).exists():
+                stats["unchanged"] += 1
+                return
+            pending[pool.submit(render, view, value, str(output), plotlyjs)] = relative
+
+        submit(GLOBAL_VIEW, _load(models.ProductsKpis.from_payload, "getAllProductsKpis"))
+        submit(TEAM_VIEW, _load(models.TeamKpis.from_payload, "getAllTeamsKpis/"))
+        names = _load(models.product_names, "getAllProducts") or []
+        if products:
+            names = names[:products]
+        # Chaque produit est envoyé au pool dès que ses KPIs sont chargés
+        for future in as_completed([fetcher.submit(_load_product, name) for name in names]):
+            submit(*future.result())
+
+        for future in as_completed(pending):
+            relative = pending[future]
+            try:
+                _, size, _ = future.result()
+                stats["rendered"] += 1
+                stats["bytes"] += size
+            except Exception:
+                logger.exception("Export impossible de %s", relative)
+                manifest.pop(relative, None)
+                stats["failed"] += 1
+
+    # Les vues en échec gardent leur empreinte précédente (le fichier existant reste valable)
+    for relative, entry in previous.items():
+        if relative not in manifest and (output / relative).exists():
+            manifest[relative] = entry
+    (output / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    _write_index(output, manifest)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=EXPORT_DIR, help="répertoire des fichiers HTML")
+    parser.add_argument("--workers", type=int, default=EXPORT_WORKERS, help="processus de rendu")
+    parser.add_argument("--fetch-workers", type=int, default=EXPORT_FETCH_WORKERS,
+                        help="chargements simultanés des KPIs produits")
+    parser.add_argument("--products", type=int, default=0, help="nombre de produits exportés (0 : tous)")
+    parser.add_argument("--force", action="store_true", help="rend toutes les vues, même inchangées")
+    parser.add_argument("--plotlyjs", choices=("inline", "directory"), default="inline",
+                        help="plotly.js inclus dans chaque fichier, ou un seul fichier partagé")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    start = time.perf_counter()
+    stats = export(args.output, args.workers, args.fetch_workers, args.products, args.force, args.plotlyjs)
+    print(f"{stats['rendered']} vue(s) rendue(s), {stats['unchanged']} inchangée(s), {stats['failed']} en échec "
+          f"({stats['bytes'] / 2**20:.1f} Mo) en {time.perf_counter() - start:.1f} s -> {args.output}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
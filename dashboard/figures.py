@@ -0,0 +1,437 @@
+"""Construction des figures Plotly des pages, mémoïsée par empreinte des données.
+
+Chaque fonction de ce module est pure : la même entrée produit la même
+figure. Le décorateur ``memoize`` les met en cache (LRU borné à
+``FIGURE_CACHE_SIZE`` entrées) sous une empreinte stable du nom de la figure
+et de ses arguments ; une figure n'est donc reconstruite que lorsque sa
+tranche de données change. Le JSON sérialisé de la figure est conservé avec
+elle (voir ``figure_json``).
+
+Les figures renvoyées sont partagées entre sessions et ne doivent pas être
+modifiées après coup.
+
+``compact`` en dérive une version plus légère à envoyer au navigateur
+(tableaux typés étroits, valeurs arrondies, traces fusionnées) ;
+``compact_figure`` la calcule une seule fois par figure en cache.
+"""
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson est optionnel
+    orjson = None
+
+from dashboard import config
+
+FIGURE_CACHE_SIZE = config.env_int("FIGURE_CACHE_SIZE", 256)
+CHART_DECIMALS = config.env_int("CHART_DECIMALS", 2)
+
+
+def payload_hash(*parts):
+    """Empreinte stable (indépendante de la session et du processus) des données."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            labels = list(part.columns) if isinstance(part, pd.DataFrame) else [part.name]
+            digest.update(repr(labels).encode())
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+        elif orjson is not None:
+            options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            digest.update(orjson.dumps(part, option=options))
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class _CachedFigure:
+    __slots__ = ("figure", "json", "compact")
+
+    def __init__(self, figure):
+        self.figure = figure
+        self.json = None
+        self.compact = None
+
+
+class FigureCache:
+    """Cache LRU de figures, indexé par ``(nom, empreinte des arguments)``."""
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._by_figure = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.figure
+            self.misses += 1
+
+        entry = _CachedFigure(build())
+        with self._lock:
+            self._entries[key] = entry
+            self._by_figure[id(entry.figure)] = entry
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._by_figure.pop(id(evicted.figure), None)
+                if evicted.compact is not None:
+                    self._by_figure.pop(id(evicted.compact), None)
+        return entry.figure
+
+    def json_for(self, fig):
+        """JSON de la figure, calculé une seule fois pour une figure en cache."""
+        with self._lock:
+            entry = self._by_figure.get(id(fig))
+        if entry is None or entry.figure is not fig:
+            return pio.to_json(fig, validate=False)
+        if entry.json is None:
+            entry.json = pio.to_json(fig, validate=False)
+        return entry.json
+
+    def compact_for(self, fig):
+        """Version compacte de la figure (voir ``compact``), calculée une seule fois pour une figure en cache.
+
+        Son JSON est lui aussi conservé (``json_for``).
+        """
+        with self._lock:
+            entry = self._by_figure.get(id(fig))
+        if entry is None or entry.figure is not fig:
+            return compact(fig)
+        if entry.compact is None:
+            compacted = _CachedFigure(compact(fig))
+            with self._lock:
+                if entry.compact is None:
+                    entry.compact = compacted.figure
+                    self._by_figure[id(compacted.figure)] = compacted
+        return entry.compact
+
+    def memoize(self, func):
+        """Décorateur : met en cache la figure renvoyée par ``func(*args, **kwargs)``."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            names = sorted(kwargs)
+            key = (func.__name__, payload_hash(*args, *(kwargs[name] for name in names), names))
+            return self.get(key, lambda: func(*args, **kwargs))
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_figure.clear()
+
+
+# Instance partagée par toutes les sessions
+figure_cache = FigureCache()
+memoize = figure_cache.memoize
+figure_json = figure_cache.json_for
+compact_figure = figure_cache.compact_for
+
+
+def _typed(values, decimals):
+    """``values`` numériques arrondies à ``decimals`` décimales, dans le type le plus étroit qui les
+    conserve (envoyé en tableau binaire typé) ; ``values`` inchangées sinon."""
+    array = np.asarray(values)
+    if array.dtype.kind not in "iuf" or array.size == 0:
+        return values
+    if array.dtype.kind == "f":
+        array = np.round(array, decimals)
+        finite = np.isfinite(array)
+        if not finite.all() or not np.array_equal(array, np.trunc(array)):
+            # float32 restitue les valeurs à ``decimals`` décimales tant qu'elles ont au plus 7 chiffres
+            if np.abs(array[finite]).max(initial=0) * 10 ** decimals < 2 ** 24:
+                return array.astype("float32")
+            return array
+        array = array.astype("int64")
+    low, high = array.min(), array.max()
+    for dtype in ("int8", "uint8", "int16", "uint16", "int32", "uint32"):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return array.astype(dtype)
+    return array
+
+
+def _solid_color(trace):
+    color = trace.get("marker", {}).get("color")
+    return color if isinstance(color, str) else None
+
+
+def _merge_bars(traces):
+    """Une seule trace pour des barres d'une couleur unie chacune (``color=`` catégoriel de px).
+
+    Fusion limitée aux traces qui ne diffèrent que par leurs points et leur
+    couleur : mêmes axes, orientation et modèles de survol et de texte.
+    La légende, une entrée par trace, disparaît.
+    """
+    if len(traces) < 2 or any(trace.get("type") != "bar" or _solid_color(trace) is None
+                              or "x" not in trace or "y" not in trace for trace in traces):
+        return traces
+    shared = ("orientation", "xaxis", "yaxis", "hovertemplate", "texttemplate")
+    if len({tuple(str(trace.get(key)) for key in shared) for trace in traces}) != 1:
+        return traces
+    merged = {key: value for key, value in traces[0].items()
+              if key not in ("legendgroup", "offsetgroup", "alignmentgroup", "name", "customdata")}
+    for axis in ("x", "y"):
+        merged[axis] = np.concatenate([np.asarray(trace[axis]) for trace in traces])
+    counts = [len(trace["x"]) for trace in traces]
+    merged["marker"] = {**traces[0]["marker"],
+                        "color": np.repeat([_solid_color(trace) for trace in traces], counts).tolist()}
+    merged["showlegend"] = False
+    return [merged]
+
+
+def compact(fig, decimals=CHART_DECIMALS):
+    """Copie de ``fig`` allégée pour le navigateur.
+
+    - barres d'une couleur par trace fusionnées en une seule trace (voir ``_merge_bars``) ;
+    - données numériques (et couleurs d'une échelle continue) arrondies et envoyées en tableaux
+      typés étroits (int8 à float32) ;
+    - ``customdata`` supprimé s'il n'est utilisé par aucun modèle de survol ou de texte.
+    """
+    traces = _merge_bars([trace.to_plotly_json() for trace in fig.data])
+    for trace in traces:
+        for key in ("x", "y", "z", "values", "text"):
+            if key in trace:
+                trace[key] = _typed(trace[key], decimals)
+        if "color" in trace.get("marker", {}):
+            # Échelle de couleurs continue : une valeur numérique par point
+            trace["marker"] = {**trace["marker"], "color": _typed(trace["marker"]["color"], decimals)}
+        templates = f"{trace.get('hovertemplate', '')}{trace.get('texttemplate', '')}"
+        if "customdata" in trace and "customdata" not in templates:
+            del trace["customdata"]
+    return go.Figure(data=traces, layout=fig.layout)
+
+
+def warm():
+    """Construit des figures jetables de chaque type utilisé, hors cache.
+
+    Le premier appel à ``px.bar`` / ``px.pie`` charge les modèles et les
+    validateurs de Plotly (environ 150 ms) ; ``dashboard.warmup`` l'appelle
+    une fois par processus, avant la première page.
+    """
+    frame = pd.DataFrame({"x": ["a"], "y": [1]})
+    for fig in (px.bar(frame, x="x", y="y", color="x", text_auto=True),
+                px.pie(frame, names="x", values="y"),
+                go.Figure([go.Pie(labels=["a"], values=[1]), go.Funnel(y=["a"], x=[1])]),
+                go.Figure(go.Indicator(mode="gauge+number", value=1))):
+        pio.to_json(fig, validate=False)
+
+
+def _labelled(frame, columns):
+    """Copie de ``frame`` avec l'index en colonne et les libellés d'affichage."""
+    frame = frame[list(columns)].rename(columns=columns).reset_index()
+    index = frame.columns[0]
+    frame[index] = frame[index].astype(str)
+    return frame
+
+
+# --- Page Ventes : vue globale -------------------------------------------------
+
+@memoize
+def sales_breakdown(won, engaging, lost, prospecting):
+    """Graphique en anneau de la répartition des ventes."""
+    fig = go.Figure(data=[go.Pie(
+        labels=['Gagnées', 'En cours', 'Perdues', 'Prospection'],
+        values=[won, engaging, lost, prospecting],
+        hole=.3,
+        marker_colors=['#00ED9A', '#FFA500', '#FF6347', '#4169E1']
+    )])
+    fig.update_layout(title_text="Répartition des Ventes")
+    return fig
+
+
+@memoize
+def top_sectors_revenue(sectors):
+    """Barres des 5 secteurs au plus fort revenu."""
+    sector_revenue = _labelled(sectors.nlargest(5, 'revenue'), {'revenue': 'Revenu'})
+    return px.bar(sector_revenue, x='Secteur', y='Revenu',
+                  title="Top 5 des Revenus par Secteur",
+                  color='Revenu', color_continuous_scale=px.colors.sequential.Viridis)
+
+
+@memoize
+def revenue_per_month(months):
+    revenue_month_data = _labelled(months, {"revenue": "Revenu Total"})
+    fig = px.bar(revenue_month_data, x="Mois", y="Revenu Total",
+                 title="Revenus par Mois",
+                 color="Revenu Total", color_continuous_scale=px.colors.sequential.Plasma)
+    fig.update_layout(template="plotly_dark", xaxis_title="Mois", yaxis_title="Revenu Total (€)")
+    fig.update_yaxes(tickprefix="€", tickformat=".2f")
+    return fig
+
+
+@memoize
+def sales_per_month(months):
+    sales_month_data = _labelled(months, {"sales": "Ventes Totales"})
+    fig = px.bar(sales_month_data, x="Mois", y="Ventes Totales",
+                 title="Nombre de Ventes par Mois",
+                 color="Ventes Totales", color_continuous_scale=px.colors.sequential.Viridis)
+    fig.update_layout(template="plotly_dark", xaxis_title="Mois", yaxis_title="Nombre de Ventes")
+    return fig
+
+
+@memoize
+def month_trend(months, column, label):
+    """Valeurs mensuelles, moyenne glissante et cumul (axe de droite) d'une colonne
+    de ``dashboard.timeseries.enrich``."""
+    x = months.index.astype(str)
+    fig = go.Figure([
+        go.Bar(x=x, y=months[column], name=label, marker_color="#4169E1"),
+        go.Scatter(x=x, y=months[f"{column}_rolling"], name="Moyenne glissante",
+                   mode="lines", line=dict(color="#00ED9A", width=3)),
+        go.Scatter(x=x, y=months[f"{column}_cumulative"], name="Cumul", yaxis="y2",
+                   mode="lines", line=dict(color="#FFA500", dash="dot")),
+    ])
+    fig.update_layout(template="plotly_dark", title=f"{label} : tendance et cumul", xaxis_title="Mois",
+                      yaxis=dict(title=label), yaxis2=dict(title="Cumul", overlaying="y", side="right"),
+                      legend=dict(orientation="h", y=-0.2))
+    return fig
+
+
+@memoize
+def products_per_sector(sectors):
+    sector_data = _labelled(sectors, {"products": "Nombre de Produits"})
+    fig = px.bar(sector_data, x="Secteur", y="Nombre de Produits", title="Nombre de produits vendus par secteur",
+                 color="Secteur", color_continuous_scale='Viridis')
+    fig.update_layout(xaxis_title="Secteur", yaxis_title="Nombre de Produits",
+                      template="plotly_dark", plot_bgcolor="#2b2b2b")
+    return fig
+
+
+@memoize
+def revenue_per_sector(sectors):
+    revenue_sector_data = _labelled(sectors, {"revenue": "Revenu Total"})
+    fig = px.pie(revenue_sector_data, names="Secteur", values="Revenu Total",
+                 title="Revenus par Secteur(en €)",
+                 color_discrete_sequence=px.colors.sequential.Plasma)
+    fig.update_layout(template="plotly_dark")
+    return fig
+
+
+# --- Page Ventes : vue produit -------------------------------------------------
+
+@memoize
+def engagement_gauges(engagement_rate, resignation_rate):
+    """Jauges des taux d'engagement et de résiliation d'un produit."""
+    fig = go.Figure()
+    fig.add_trace(go.Indicator(
+        mode = "gauge+number",
+        value = engagement_rate,
+        domain = {'x': [0, 0.5], 'y': [0, 1]},
+        title = {'text': "Taux d'engagement"},
+        gauge = {'axis': {'range': [None, 100]},
+                 'bar': {'color': "darkblue"},
+                 'steps' : [
+                     {'range': [0, 30], 'color': "lightgray"},
+                     {'range': [30, 70], 'color': "gray"},
+                     {'range': [70, 100], 'color': "darkgray"}],
+                 'threshold' : {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': 90}}))
+    fig.add_trace(go.Indicator(
+        mode = "gauge+number",
+        value = resignation_rate,
+        domain = {'x': [0.5, 1], 'y': [0, 1]},
+        title = {'text': "Taux de résiliation"},
+        gauge = {'axis': {'range': [None, 100]},
+                 'bar': {'color': "darkred"},
+                 'steps' : [
+                     {'range': [0, 20], 'color': "lightgray"},
+                     {'range': [20, 50], 'color': "gray"},
+                     {'range': [50, 100], 'color': "darkgray"}],
+                 'threshold' : {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': 50}}))
+    return fig
+
+
+@memoize
+def sales_funnel(total_deals, total_sales, total_sales_won):
+    fig_funnel = go.Figure(go.Funnel(
+        y = ['Total des transactions', 'Ventes totales', 'Ventes conclues '],
+        x = [total_deals, total_sales, total_sales_won],
+        textinfo = "value+percent initial"))
+    fig_funnel.update_layout(title_text = "Entonnoir de ventes")
+    return fig_funnel
+
+
+@memoize
+def product_sales_breakdown(won, lost, engaging):
+    labels = ['Ventes conclues ', 'Ventes perdues', 'En cours']
+    fig_pie = go.Figure(data=[go.Pie(labels=labels, values=[won, lost, engaging], hole=.3)])
+    fig_pie.update_layout(title_text="Répartition des ventes")
+    return fig_pie
+
+
+@memoize
+def sales_by_region(regions):
+    sales_by_region_df = _labelled(regions, {"sales": "Ventes"})
+    return px.bar(sales_by_region_df, x='Region', y='Ventes',
+                  title="Ventes par région",
+                  color='Ventes',
+                  color_continuous_scale=px.colors.sequential.Viridis)
+
+
+@memoize
+def sales_by_sector(sectors):
+    sales_by_sector_df = _labelled(sectors, {"sales": "Ventes"})
+    return px.pie(sales_by_sector_df, names='Secteur', values='Ventes',
+                  title="Répartition des ventes par secteur",
+                  color_discrete_sequence=px.colors.qualitative.Set3)
+
+
+# --- Page Équipe de ventes -----------------------------------------------------
+
+@memoize
+def agent_volume(agent_data):
+    return px.bar(
+        agent_data, x='Agent', y=['Total des Ventes', 'Revenu Total (€)'],
+        title="Ventes et Revenu Total par Agent",
+        labels={"value": "Valeur", "variable": "Mesure"},
+        barmode='stack', template='plotly_white',
+        color_discrete_sequence=["#1f77b4", "#ff7f0e"]
+    )
+
+
+@memoize
+def agent_ratios(agent_data):
+    return px.bar(
+        agent_data, x='Agent', y=['Ratio Ventes conclues  (%)', 'Ratio Perdues (%)'],
+        title="Ratios de Ventes conclues  et Perdues par Agent",
+        labels={"value": "Ratio (%)", "variable": "Statut"},
+        barmode='stack', template='plotly_white',
+        color_discrete_sequence=["#2ca02c", "#d62728"]
+    )
+
+
+@memoize
+def manager_volume(manager_data):
+    return px.bar(
+        manager_data, x='Manager', y=['Total des Ventes', 'Revenu Total (€)'],
+        title="Comparaison des Performances des Managers",
+        labels={"value": "Valeur", "variable": "Critère"},
+        barmode='group', template='plotly_white',
+        color_discrete_sequence=["#1f77b4", "#ff7f0e"]
+    )
+
+
+@memoize
+def manager_ratios(manager_data):
+    return px.bar(
+        manager_data, x='Manager', y=['Ratio Ventes conclues  (%)', 'Ratio Perdues (%)'],
+        title="Ratios de Ventes conclues  et Perdues par Manager",
+        labels={"value": "Ratio (%)", "variable": "Statut"},
+        barmode='stack', template='plotly_white',
+        color_discrete_sequence=["#2ca02c", "#d62728"]
+    )
@@ -0,0 +1,68 @@
+"""Décodage des corps de réponse JSON, en flux pour les gros volumes.
+
+``api_client`` recopie le corps de chaque réponse, par blocs, dans un fichier
+temporaire, gardé en mémoire jusqu'à ``JSON_SPOOL_MAX_BYTES`` et écrit sur
+disque au-delà.
+
+Au-delà de ``JSON_STREAM_MIN_BYTES``, ce fichier est lu en flux avec
+``ijson``, une valeur de premier niveau à la fois : chaque dictionnaire
+``{nom: nombre}`` (par agent, par secteur...) est converti en ``pd.Series``
+indexée par nom dès qu'il est lu, si bien que seul le plus gros d'entre eux
+existe à un instant donné sous forme d'objets Python. Les autres réponses
+sont décodées d'un bloc avec ``orjson`` (ou ``json`` s'il est absent).
+"""
+import json
+
+import ijson
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson est optionnel
+    orjson = None
+
+from dashboard import config
+
+STREAM_MIN_BYTES = config.env_int("JSON_STREAM_MIN_BYTES", 1 << 20)
+SPOOL_MAX_BYTES = config.env_int("JSON_SPOOL_MAX_BYTES", 8 << 20)
+CHUNK_SIZE = 64 * 1024
+
+
+def _series(value):
+    """``{nom: nombre}`` en ``pd.Series`` ; toute autre valeur est renvoyée telle quelle."""
+    if isinstance(value, dict) and value:
+        try:
+            return pd.Series(value, dtype="float64")
+        except (TypeError, ValueError):
+            pass
+    return value
+
+
+def _columnar(file):
+    """Décode un objet JSON valeur de premier niveau par valeur de premier niveau."""
+    data = {}
+    indexes = []
+    for key, value in ijson.kvitems(file, "", use_float=True):
+        value = _series(value)
+        if isinstance(value, pd.Series):
+            # Les séries d'un même rôle partagent leurs noms : un seul index est gardé
+            for index in indexes:
+                if index.equals(value.index):
+                    value.index = index
+                    break
+            else:
+                indexes.append(value.index)
+        data[key] = value
+    return data
+
+
+def load(file, size):
+    """Décode le corps JSON contenu dans ``file`` (``size`` octets)."""
+    if size >= STREAM_MIN_BYTES:
+        data = _columnar(file)
+        if data:
+            return data
+        # Pas un objet JSON (liste...) : décodage d'un bloc
+        file.seek(0)
+    raw = file.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
@@ -0,0 +1,112 @@
+"""Mode « temps réel » : interrogation périodique de l'API et rerun sur changement.
+
+Un thread unique par processus interroge, toutes les ``LIVE_REFRESH_SECONDS``
+secondes, les endpoints affichés par au moins une session (requêtes
+conditionnelles, voir ``dashboard.loaders``). Dans chaque page, ``watch``
+ajoute un petit fragment qui compare la version des données affichées à celle
+du cache et, si l'une d'elles a changé, ne rejoue que le fragment qui a
+appelé ``watch`` (toute la page si ``watch`` est appelée hors fragment) :
+tant que rien ne change, rien n'est redessiné ni renvoyé au navigateur.
+
+Streamlit ne permet pas de rejouer un fragment englobant : ``_rerun_fragment``
+utilise donc ses API internes (``RerunData``, ``ThreadState``), d'où la version
+de Streamlit fixée dans ``requirements.txt`` et vérifiée par ``tests/test_live.py``.
+
+``LIVE_REFRESH_SECONDS`` à 0 (défaut) désactive le mode temps réel.
+"""
+import logging
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import RerunData, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_run_context import ThreadState
+
+from dashboard import config, loaders
+
+logger = logging.getLogger(__name__)
+
+LIVE_REFRESH_SECONDS = config.env_float("LIVE_REFRESH_SECONDS", 0) or None
+
+# Un endpoint que plus aucune session n'affiche n'est plus interrogé
+# après ce nombre d'intervalles
+IDLE_INTERVALS = 3
+
+
+class LivePoller:
+    """Interroge en boucle les clés suivies par au moins une session."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def track(self, keys):
+        """Signale que ``keys`` sont affichées ; démarre le thread au premier appel."""
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._seen[key] = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="kpi-live-poller", daemon=True)
+                self._thread.start()
+
+    def tracked(self):
+        with self._lock:
+            return list(self._seen)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                for key in [k for k, seen in self._seen.items()
+                            if now - seen > IDLE_INTERVALS * self.interval]:
+                    del self._seen[key]
+            for key in self.tracked():
+                try:
+                    # Une interrogation faite par un autre processus pendant l'intervalle suffit
+                    loaders.refresh(key, max_age=self.interval)
+                except Exception as e:
+                    logger.warning("Interrogation impossible pour %s : %s", key, e)
+
+
+live_poller = LivePoller(LIVE_REFRESH_SECONDS)
+
+
+def _rerun_fragment(fragment_id):
+    """``st.rerun(scope="fragment")`` pour le fragment ``fragment_id`` plutôt que pour
+    le fragment courant (``_check``, imbriqué dans celui à rejouer)."""
+    ctx = get_script_run_ctx()
+    ctx.script_requests.request_rerun(RerunData(
+        query_string=ctx.query_string,
+        page_script_hash=ctx.page_script_hash,
+        fragment_id_queue=[fragment_id],
+        is_fragment_scoped_rerun=True,
+        cached_message_hashes=ctx.cached_message_hashes,
+        context_info=ctx.context_info,
+    ))
+    # Point d'arrêt : le rerun demandé interrompt ce fragment ici
+    st.empty()
+
+
+def _check(keys, fragment_id):
+    live_poller.track(keys)
+    rendered = st.session_state.get("live_versions", {})
+    if any(loaders.version(key) != rendered.get(key) for key in keys):
+        if fragment_id is None:
+            st.rerun()
+        _rerun_fragment(fragment_id)
+
+
+def watch(*keys):
+    """Rejoue le fragment appelant (ou la page) quand les données d'une des clés ``keys`` changent."""
+    if not LIVE_REFRESH_SECONDS:
+        return
+    live_poller.track(keys)
+    # Versions affichées par ce rerun
+    rendered = st.session_state.setdefault("live_versions", {})
+    for key in keys:
+        rendered[key] = loaders.version(key)
+    st.fragment(_check, run_every=LIVE_REFRESH_SECONDS)(keys, ThreadState.get().fragment_id)
@@ -0,0 +1,212 @@
+"""Chargement des données des pages : cache, requêtes conditionnelles et copie locale.
+
+``load(parse, path, *params)`` est le point d'entrée unique des pages. La clé
+de cache est ``(endpoint, *paramètres)``. Chaque rafraîchissement envoie les
+validateurs de la réponse précédente : si la ressource n'a pas changé, la
+valeur en cache est reprise sans décoder ni reconvertir le JSON, et seule sa
+date (``as_of``) est mise à jour. ``version(key)`` n'augmente que lorsque le
+contenu a réellement changé. Les chargements simultanés d'une même clé (par
+plusieurs sessions, ou par le rafraîchissement d'arrière-plan) ne font qu'un
+seul appel (voir ``dashboard.singleflight``). Les valeurs reçues sont publiées
+en mémoire partagée, et une version publiée ou confirmée depuis moins d'un
+TTL par un autre processus est reprise sans appel (voir
+``dashboard.sharedframes``).
+
+Après ``kpi_cache.invalidate()`` (bouton « Actualiser »), le premier
+chargement de chaque clé oubliée interroge l'API : ni copie locale, ni
+version partagée récente (``max_age=0``). Si l'API est indisponible, la copie
+locale est de nouveau servie.
+
+Si le budget du rendu est épuisé (voir ``dashboard.resilience``), le
+chargement se poursuit en arrière-plan et ``DeadlineExceeded`` est propagée.
+"""
+import dataclasses
+import threading
+from datetime import datetime, timezone
+
+import httpx
+
+from dashboard import api_client, models, resilience, sharedframes, singleflight, snapshots
+from dashboard.cache import kpi_cache
+
+_lock = threading.Lock()
+_sources = {}
+_validators = {}
+_versions = {}
+_shared = {}
+_flights = singleflight.SingleFlight()
+
+
+def _forget(key):
+    # Clé évincée du cache : son mapping partagé est libéré
+    sharedframes.forget(key)
+    with _lock:
+        _shared.pop(key, None)
+
+
+kpi_cache.on_evict(_forget)
+
+
+def _key(path, *params):
+    return (path.strip("/"), *params)
+
+
+def _confirmed(previous):
+    """La valeur précédente, datée de la réponse qui vient de la confirmer."""
+    if dataclasses.is_dataclass(previous):
+        return dataclasses.replace(previous, as_of=datetime.now(timezone.utc), source="api")
+    return previous
+
+
+def _fetch(key, max_age=None):
+    # Les demandes simultanées d'une même clé partagent un seul appel, forcé
+    # (``max_age=0``) ou non : un appel forcé qui trouve un appel en cours le
+    # rejoint (celui-ci est alors auprès de l'API, la lecture d'une version
+    # partagée ne dure pas) plutôt que de doubler la requête
+    return _flights.do(key, lambda: _fetch_once(key, max_age), name=key[0])
+
+
+def _fetch_once(key, max_age=None):
+    parse, path, params = _sources[key]
+    previous = kpi_cache.peek(key)
+
+    # Version publiée ou confirmée par un autre processus depuis moins de
+    # ``max_age`` secondes (par défaut le TTL de l'endpoint) : pas d'appel
+    shared = sharedframes.fresh(key, kpi_cache.ttl_for(key) if max_age is None else max_age)
+    if shared is not None:
+        shared_version, value, updated_at = shared
+        with _lock:
+            changed = previous is None or _shared.get(key) != shared_version
+            _shared[key] = shared_version
+            if changed:
+                _versions[key] = _versions.get(key, 0) + 1
+                # Nos validateurs portent sur une autre version
+                _validators.pop(key, None)
+        if changed:
+            return value
+        return dataclasses.replace(previous, as_of=datetime.fromtimestamp(updated_at, timezone.utc),
+                                   source="api")
+
+    # Les validateurs ne valent que pour une valeur issue de l'API
+    usable = previous is not None and getattr(previous, "source", "api") == "api"
+    with _lock:
+        validators = _validators.get(key) if usable else None
+
+    payload, validators = api_client.get_json_conditional(path, *params, validators=validators)
+    with _lock:
+        _validators[key] = validators
+    if payload is api_client.NOT_MODIFIED:
+        sharedframes.confirm(key)
+        return _confirmed(previous)
+
+    # Tableaux publiés en mémoire partagée : la valeur mise en cache est une vue sans copie
+    value = sharedframes.publish(key, parse(payload))
+    with _lock:
+        _versions[key] = _versions.get(key, 0) + 1
+        _shared[key] = sharedframes.version(key)
+    return snapshots.save_later(key, value)
+
+
+def load(parse, path, *params):
+    """Renvoie ``parse(json)`` de l'endpoint, via le cache et la copie locale."""
+    key = _key(path, *params)
+    with _lock:
+        _sources.setdefault(key, (parse, path, params))
+    # Rechargement demandé : l'API, sans copie locale ni version partagée
+    forced = kpi_cache.invalidated(key)
+    max_age = 0 if forced else None
+    try:
+        return kpi_cache.get(key, lambda: _fetch(key, max_age), fallback=None if forced else snapshots.load)
+    except resilience.DeadlineExceeded:
+        # Le rendu n'attend plus ; le chargement continue pour le prochain rerun
+        kpi_cache.load_later(key, lambda: _fetch(key, max_age))
+        raise
+    except (httpx.HTTPError, resilience.CircuitOpenError):
+        if not forced:
+            raise
+        # API indisponible : retour au chargement habituel (copie locale comprise)
+        kpi_cache.revalidate(key)
+        return kpi_cache.get(key, lambda: _fetch(key), fallback=snapshots.load)
+
+
+def prefetch(parse, path, *params):
+    """Précharge l'endpoint dans le cache, depuis le thread appelant.
+
+    Rien n'est fait si l'entrée est encore fraîche. Sinon l'appel est fait
+    ici, pas dans les threads de rafraîchissement du cache, et la valeur ne
+    remplace que des entrées du même endpoint (``KpiCache.prefill``).
+    """
+    key = _key(path, *params)
+    with _lock:
+        _sources.setdefault(key, (parse, path, params))
+    if not kpi_cache.is_fresh(key):
+        kpi_cache.prefill(key, _fetch(key, 0 if kpi_cache.invalidated(key) else None))
+
+
+def fetch(parse, path, *params):
+    """Renvoie ``parse(json)`` de l'endpoint sans l'ajouter au cache (parcours de tout le catalogue).
+
+    Une entrée encore fraîche du cache est reprise ; sinon l'API est
+    interrogée (appel partagé avec les chargements simultanés de la clé).
+    """
+    key = _key(path, *params)
+    with _lock:
+        _sources.setdefault(key, (parse, path, params))
+    if kpi_cache.is_fresh(key):
+        value = kpi_cache.peek(key)
+        if value is not None:
+            return value
+    return _fetch(key, 0 if kpi_cache.invalidated(key) else None)
+
+
+def product_names():
+    """Liste des produits (``getAllProducts``), via ``load``."""
+    return load(models.product_names, "getAllProducts")
+
+
+def product_kpis(product_name):
+    """KPIs d'un produit (``getProductKpis``), via ``load``."""
+    return load(models.ProductKpis.from_payload, "getProductKpis", product_name)
+
+
+def fetch_product_kpis(product_name):
+    """KPIs d'un produit (``getProductKpis``), via ``fetch`` : le cache n'est pas rempli."""
+    return fetch(models.ProductKpis.from_payload, "getProductKpis", product_name)
+
+
+def prefetch_product_kpis(product_name):
+    """Précharge les KPIs d'un produit (voir ``prefetch`` et ``dashboard.prefetch``)."""
+    prefetch(models.ProductKpis.from_payload, "getProductKpis", product_name)
+
+
+def refresh(key, max_age=0):
+    """Interroge l'API pour ``key`` (déjà chargée par ``load``) et met le cache à jour.
+
+    Une version partagée par un autre processus depuis moins de ``max_age``
+    secondes est reprise à la place.
+    """
+    kpi_cache.put(key, _fetch(key, max_age))
+
+
+def version(key):
+    """Numéro de version du contenu de ``key`` (0 tant qu'aucune réponse n'a été reçue)."""
+    with _lock:
+        return _versions.get(key, 0)
+
+
+def load_fresh(parse, path, *params):
+    """Comme ``load``, mais sans copie locale : faute d'entrée issue de l'API
+    en cache, l'API est interrogée directement (export des rapports).
+
+    Aucun rafraîchissement d'arrière-plan n'est lancé pour une copie locale :
+    un seul appel par clé.
+    """
+    key = _key(path, *params)
+    value = kpi_cache.peek(key)
+    if value is not None and getattr(value, "source", "api") != "snapshot":
+        return load(parse, path, *params)
+    with _lock:
+        _sources.setdefault(key, (parse, path, params))
+    value = _fetch(key, 0 if kpi_cache.invalidated(key) else None)
+    kpi_cache.put(key, value)
+    return value
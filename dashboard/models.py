@@ -0,0 +1,189 @@
+"""Modèle typé et colonnaire des réponses de l'API.
+
+Chaque réponse JSON est convertie une seule fois (au chargement, avant mise
+en cache) en un objet immuable : indicateurs scalaires en attributs, séries
+par agent / manager / secteur / mois / région en DataFrames indexés par un
+nom catégoriel, avec des types numériques de largeur adaptée. Les fonctions
+d'affichage des deux pages lisent uniquement ces tableaux.
+
+``as_of`` est la date de la dernière réponse de l'API portant (ou confirmant,
+voir ``dashboard.loaders``) ces données et ``source`` indique si
+l'objet vient de l'API ou d'une copie locale (voir ``dashboard.snapshots``).
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pandas as pd
+
+
+def _names(keys, name):
+    """Index catégoriel qui conserve l'ordre de la réponse."""
+    keys = list(keys)
+    return pd.CategoricalIndex(keys, categories=keys, ordered=False, name=name)
+
+
+def _integers(values):
+    return pd.to_numeric(values, downcast="integer")
+
+
+def _table(name, columns, integer_columns=(), float32_columns=()):
+    """Aligne des ``{nom: valeur}`` (dictionnaires ou ``pd.Series``) en un seul DataFrame typé.
+
+    L'index est l'union des clés, dans leur ordre d'apparition ; une valeur
+    absente d'un dictionnaire vaut 0.
+    """
+    series = {column: pd.Series(values, dtype="float64") for column, values in columns.items()}
+    indexes = [values.index for values in series.values()]
+    if indexes and all(index is indexes[0] for index in indexes):
+        # Séries décodées en flux avec un index commun : rien à aligner
+        index = list(indexes[0])
+        frame = pd.DataFrame(series)
+    else:
+        keys = {}
+        for values in columns.values():
+            keys.update(dict.fromkeys(values.keys()))
+        index = list(keys)
+        frame = pd.DataFrame(
+            {column: values.reindex(index, fill_value=0.0) for column, values in series.items()},
+            index=index,
+        )
+    for column in integer_columns:
+        frame[column] = _integers(frame[column].round())
+    for column in float32_columns:
+        frame[column] = frame[column].astype("float32")
+    frame.index = _names(index, name)
+    return frame
+
+
+@dataclass(frozen=True)
+class ProductsKpis:
+    """Réponse de ``getAllProductsKpis``.
+
+    ``sectors`` : colonnes ``revenue`` et ``products``, indexées par secteur.
+    ``months`` : colonnes ``revenue`` et ``sales``, indexées par mois
+    (``None`` si l'API ne fournit pas les séries mensuelles).
+    """
+    total_revenue: float
+    total_sales_won: int
+    total_sales_engaging: int
+    total_sales_lost: int
+    total_sales_prospecting: int
+    avg_revenue_per_product: float
+    engagement_rate: float
+    total_won_revenue: float
+    total_lost_revenue: float
+    sectors: pd.DataFrame
+    months: pd.DataFrame | None
+    as_of: datetime
+    source: str = "api"  # "api", ou "snapshot" pour une copie locale
+
+    @classmethod
+    def from_payload(cls, data):
+        months = None
+        if "revenue_per_month" in data and "sales_per_month" in data:
+            months = _table("Mois", {"revenue": data["revenue_per_month"], "sales": data["sales_per_month"]},
+                            integer_columns=("sales",))
+        return cls(
+            total_revenue=data["total_revenue"],
+            total_sales_won=data["total_sales_won"],
+            total_sales_engaging=data["total_sales_engaging"],
+            total_sales_lost=data["total_sales_lost"],
+            total_sales_prospecting=data["total_sales_prospecting"],
+            avg_revenue_per_product=data["avg_revenue_per_product"],
+            engagement_rate=data["engagement_rate"],
+            total_won_revenue=data["total_won_revenue"],
+            total_lost_revenue=data["total_lost_revenue"],
+            sectors=_table("Secteur", {"revenue": data["total_revenue_per_sector"],
+                                       "products": data["products_per_sector"]},
+                           integer_columns=("products",)),
+            months=months,
+            as_of=datetime.now(timezone.utc),
+        )
+
+
+@dataclass(frozen=True)
+class ProductKpis:
+    """Réponse de ``getProductKpis/{name}``.
+
+    ``regions`` et ``sectors`` : colonne ``sales``, indexée par région / secteur.
+    """
+    product_name: str
+    total_deals: int
+    total_sales: int
+    total_sales_won: int
+    total_sales_lost: int
+    total_revenue: float
+    avg_revenue: float
+    engagement_rate: float
+    resignation_rate: float
+    regions: pd.DataFrame
+    sectors: pd.DataFrame
+    as_of: datetime
+    source: str = "api"  # "api", ou "snapshot" pour une copie locale
+
+    @classmethod
+    def from_payload(cls, data):
+        """Lève ``ValueError`` si l'API renvoie un message à la place des KPIs."""
+        if "message" in data:
+            raise ValueError(data["message"])
+        return cls(
+            product_name=data["product_name"],
+            total_deals=data["total_deals"],
+            total_sales=data["total_sales"],
+            total_sales_won=data["total_sales_won"],
+            total_sales_lost=data["total_sales_lost"],
+            total_revenue=data["total_revenue"],
+            avg_revenue=data["avg_revenue"],
+            engagement_rate=data["engagement_rate"],
+            resignation_rate=data["resignation_rate"],
+            regions=_table("Region", {"sales": data["sales_by_region"]}, integer_columns=("sales",)),
+            sectors=_table("Secteur", {"sales": data["sales_by_sector"]}, integer_columns=("sales",)),
+            as_of=datetime.now(timezone.utc),
+        )
+
+
+# Colonnes des tableaux par agent et par manager, et clé correspondante de l'API
+TEAM_COLUMNS = {
+    "sales": "total_sales_per_{}",
+    "revenue": "total_revenue_per_{}",
+    "avg_revenue": "avg_revenue_per_{}",
+    "won_ratio": "won_ratio_per_{}",
+    "lost_ratio": "lost_ratio_per_{}",
+}
+
+
+def _people(data, role):
+    """Tableau par agent ou par manager, limité aux personnes ayant un nombre de ventes."""
+    sales = data[TEAM_COLUMNS["sales"].format(role)]
+    frame = _table(role, {column: data[key.format(role)] for column, key in TEAM_COLUMNS.items()},
+                   integer_columns=("sales",), float32_columns=("won_ratio", "lost_ratio"))
+    if len(frame) != len(sales):
+        frame = frame[frame.index.isin(list(sales.keys()))]
+        frame.index = frame.index.remove_unused_categories()
+    return frame
+
+
+@dataclass(frozen=True)
+class TeamKpis:
+    """Réponse de ``getAllTeamsKpis``.
+
+    ``agents`` et ``managers`` : colonnes ``sales``, ``revenue``,
+    ``avg_revenue``, ``won_ratio`` et ``lost_ratio``, indexées par nom.
+    """
+    agents: pd.DataFrame
+    managers: pd.DataFrame
+    as_of: datetime
+    source: str = "api"  # "api", ou "snapshot" pour une copie locale
+
+    @classmethod
+    def from_payload(cls, data):
+        return cls(
+            agents=_people(data, "agent"),
+            managers=_people(data, "manager"),
+            as_of=datetime.now(timezone.utc),
+        )
+
+
+def product_names(data):
+    """Noms des produits de la réponse de ``getAllProducts``, dans son ordre."""
+    return [product['fields']['product'] for product in data]
@@ -0,0 +1,234 @@
+"""Mesures de temps des appels à l'API et des sections de rendu.
+
+Chaque mesure est rattachée au rerun en cours (un rerun Streamlit s'exécute
+dans un thread propre) et agrégée pour tout le processus. Un rerun complet
+commence par ``begin_run`` en haut de la page ; un rerun du seul fragment ne
+passe pas par là : les fragments sont donc déclarés avec ``perf.fragment``,
+qui ouvre la collecte de ce rerun partiel. Avec ``PERF_PANEL=1``,
+``render_panel()`` affiche le détail du rerun courant (dans la barre latérale,
+ou dans le fragment rejoué) ; les mesures sont exportables en JSON lines ou
+au format texte Prometheus.
+"""
+import functools
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from dashboard import config, resilience
+
+PERF_PANEL = config.env_bool("PERF_PANEL")
+HISTORY_SIZE = config.env_int("PERF_HISTORY_SIZE", 5000)
+
+_local = threading.local()
+_lock = threading.Lock()
+_history = deque(maxlen=HISTORY_SIZE)
+# (type, nom) -> [nombre, durée totale, octets]
+_totals = defaultdict(lambda: [0, 0.0, 0])
+# (endpoint, statut) -> nombre d'appels
+_upstream_statuses = defaultdict(int)
+
+
+def begin_run(page):
+    """Démarre la collecte des mesures d'un nouveau rerun de ``page``."""
+    _local.page = page
+    _local.records = []
+
+
+def current_page():
+    """Page du rerun en cours dans ce thread."""
+    return getattr(_local, "page", None)
+
+
+def current_run():
+    """Mesures du rerun en cours dans ce thread."""
+    return list(getattr(_local, "records", None) or [])
+
+
+def context():
+    """Rerun en cours dans ce thread, à rattacher à un autre thread avec ``attached``."""
+    return getattr(_local, "page", None), getattr(_local, "records", None)
+
+
+@contextmanager
+def attached(run_context):
+    """Rattache au rerun ``run_context`` les mesures prises dans le bloc, depuis ce thread."""
+    previous = context()
+    _local.page, _local.records = run_context
+    try:
+        yield
+    finally:
+        _local.page, _local.records = previous
+
+
+def record(kind, name, duration, status=None, size=None):
+    """Enregistre une mesure.
+
+    ``kind`` : ``"upstream"``, ``"coalesced"``, ``"section"``, ``"fragment"``, ``"chart"``, ``"budget"``
+    ou ``"import"``.
+    """
+    entry = {
+        "ts": time.time(),
+        "page": getattr(_local, "page", None),
+        "kind": kind,
+        "name": name,
+        "duration_ms": round(duration * 1000, 3),
+        "status": status,
+        "bytes": size,
+    }
+    records = getattr(_local, "records", None)
+    if records is not None:
+        records.append(entry)
+    with _lock:
+        _history.append(entry)
+        totals = _totals[(kind, name)]
+        totals[0] += 1
+        totals[1] += duration
+        totals[2] += size or 0
+        if kind == "upstream":
+            _upstream_statuses[(name, status)] += 1
+
+
+@contextmanager
+def section(name, kind="section"):
+    """Chronomètre le bloc ``with``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(kind, name, time.perf_counter() - start)
+
+
+def timed(func):
+    """Décorateur : chronomètre chaque appel de la fonction décorée."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with section(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _fragment_rerun():
+    """Indique si le rerun en cours ne rejoue que des fragments."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def fragment(func=None, *, run_every=None):
+    """``st.fragment`` dont les reruns partiels ont leurs propres mesures.
+
+    Dans un rerun complet, les mesures du fragment s'ajoutent à celles de la
+    page. Quand seul le fragment est rejoué, une nouvelle collecte est ouverte
+    pour la page où il a été déclaré, le fragment est chronométré
+    (``"fragment"``) et le panneau est affiché dans le fragment.
+    """
+    if func is None:
+        return functools.partial(fragment, run_every=run_every)
+    import streamlit as st
+
+    page = current_page()
+
+    @functools.wraps(func)
+    def measured(*args, **kwargs):
+        if getattr(_local, "in_fragment", False) or not _fragment_rerun():
+            return func(*args, **kwargs)
+        begin_run(page or current_page())
+        _local.in_fragment = True
+        try:
+            with section(func.__name__, "fragment"):
+                return func(*args, **kwargs)
+        finally:
+            _local.in_fragment = False
+            render_panel(in_fragment=True)
+
+    return st.fragment(measured, run_every=run_every)
+
+
+def to_jsonl(records=None):
+    """Mesures (par défaut tout l'historique du processus) en JSON lines."""
+    if records is None:
+        with _lock:
+            records = list(_history)
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus():
+    """Agrégats du processus au format d'exposition texte de Prometheus."""
+    with _lock:
+        totals = {key: list(values) for key, values in _totals.items()}
+        statuses = dict(_upstream_statuses)
+
+    lines = [
+        "# HELP dashboard_duration_seconds Temps passé par type de mesure et par nom.",
+        "# TYPE dashboard_duration_seconds summary",
+    ]
+    for (kind, name), (count, duration, _) in sorted(totals.items()):
+        labels = f'kind="{_label(kind)}",name="{_label(name)}"'
+        lines.append(f"dashboard_duration_seconds_count{{{labels}}} {count}")
+        lines.append(f"dashboard_duration_seconds_sum{{{labels}}} {duration:.6f}")
+
+    lines += [
+        "# HELP dashboard_upstream_requests_total Appels à l'API par endpoint et statut.",
+        "# TYPE dashboard_upstream_requests_total counter",
+    ]
+    for (endpoint, status), count in sorted(statuses.items(), key=str):
+        lines.append(f'dashboard_upstream_requests_total{{endpoint="{_label(endpoint)}",'
+                     f'status="{_label(status)}"}} {count}')
+
+    lines += [
+        "# HELP dashboard_upstream_bytes_total Octets reçus de l'API par endpoint.",
+        "# TYPE dashboard_upstream_bytes_total counter",
+    ]
+    for (kind, name), (_, _, size) in sorted(totals.items()):
+        if kind == "upstream":
+            lines.append(f'dashboard_upstream_bytes_total{{endpoint="{_label(name)}"}} {size}')
+
+    lines += [
+        "# HELP dashboard_upstream_coalesced_total Appels évités par regroupement avec un appel identique en cours.",
+        "# TYPE dashboard_upstream_coalesced_total counter",
+    ]
+    for (kind, name), (count, _, _) in sorted(totals.items()):
+        if kind == "coalesced":
+            lines.append(f'dashboard_upstream_coalesced_total{{endpoint="{_label(name)}"}} {count}')
+
+    lines += [
+        "# HELP dashboard_upstream_circuit_open Disjoncteur ouvert (1) ou demi-ouvert / fermé (0) par endpoint.",
+        "# TYPE dashboard_upstream_circuit_open gauge",
+    ]
+    for endpoint, state in sorted(resilience.breaker_states().items()):
+        lines.append(f'dashboard_upstream_circuit_open{{endpoint="{_label(endpoint)}"}} '
+                     f'{int(state == resilience.OPEN)}')
+    return "\n".join(lines) + "\n"
+
+
+def render_panel(in_fragment=False):
+    """Affiche le détail des mesures du rerun courant, dans la barre latérale
+    (ou dans le fragment rejoué, qui ne peut pas écrire ailleurs)."""
+    if not PERF_PANEL:
+        return
+    import pandas as pd
+    import streamlit as st
+
+    records = current_run()
+    parent = st if in_fragment else st.sidebar
+    with parent.expander("⏱️ Performance (fragment)" if in_fragment else "⏱️ Performance", expanded=False):
+        if not records:
+            st.caption("Aucune mesure pour ce rerun.")
+        else:
+            df = pd.DataFrame(records)
+            by_kind = df.groupby("kind")["duration_ms"].sum().round(1)
+            for kind, total in by_kind.items():
+                st.metric(f"Total {kind}", f"{total:,.1f} ms")
+            st.dataframe(df[["kind", "name", "duration_ms", "status", "bytes"]],
+                         hide_index=True, use_container_width=True)
+        st.download_button("Exporter (JSON lines)", to_jsonl(records), file_name="perf.jsonl",
+                           mime="application/x-ndjson")
+        st.download_button("Exporter (Prometheus)", to_prometheus(), file_name="perf.prom",
+                           mime="text/plain")
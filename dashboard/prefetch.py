@@ -0,0 +1,111 @@
+"""Préchargement en arrière-plan des KPIs des produits les plus consultés.
+
+Une fois la liste des produits connue, les KPIs des ``PREFETCH_TOP_N``
+produits les plus consultés (à égalité, dans l'ordre de la liste) sont
+chargés dans le cache partagé par un pool de ``PREFETCH_WORKERS`` threads qui
+lui est propre. Changer de produit dans la page se sert alors directement
+depuis la mémoire. Activé avec ``PREFETCH_PRODUCTS=1``.
+
+Le lot ne dépasse jamais ``PREFETCH_CACHE_SHARE`` des entrées du cache, et un
+produit préchargé n'évince que les KPIs d'autres produits (voir
+``loaders.prefetch``) : les réponses globales et le produit affiché restent en
+cache.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from dashboard import config
+from dashboard.cache import kpi_cache
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_ENABLED = config.env_bool("PREFETCH_PRODUCTS")
+PREFETCH_TOP_N = config.env_int("PREFETCH_TOP_N", 50)  # 0 : autant que la part du cache le permet
+PREFETCH_CACHE_SHARE = config.env_float("PREFETCH_CACHE_SHARE", 0.5)
+PREFETCH_WORKERS = config.env_int("PREFETCH_WORKERS", 4)
+
+
+class Prefetcher:
+    """Exécute ``load(name)`` pour les noms les plus consultés, avec une concurrence bornée.
+
+    Au plus ``top_n`` noms (et jamais plus de ``limit``) par lot. Un seul lot
+    est actif à la fois : lancer un nouveau lot (autres noms, ou lot précédent
+    plus vieux que ``interval``) annule ce qui reste du précédent.
+    """
+
+    def __init__(self, max_workers=PREFETCH_WORKERS, top_n=PREFETCH_TOP_N, limit=None, interval=None):
+        self.top_n = top_n
+        self.limit = limit
+        self.interval = interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kpi-prefetch")
+        self._lock = threading.Lock()
+        self._views = Counter()
+        self._names = None
+        self._started_at = 0.0
+        self._cancelled = threading.Event()
+        self._futures = []
+
+    def size(self):
+        """Nombre maximal de noms d'un lot."""
+        sizes = [size for size in (self.top_n or None, self.limit) if size is not None]
+        return max(min(sizes), 0) if sizes else None
+
+    def record_view(self, name):
+        """Compte une consultation de ``name`` (ordre de préchargement)."""
+        with self._lock:
+            self._views[name] += 1
+
+    def select(self, names):
+        """Les noms du lot : les plus consultés d'abord, dans la limite de ``size()``."""
+        with self._lock:
+            views = dict(self._views)
+        ordered = sorted(names, key=lambda name: -views.get(name, 0))
+        size = self.size()
+        return tuple(ordered if size is None else ordered[:size])
+
+    def warm(self, names, load):
+        """Lance le préchargement, sauf si le même lot est déjà en cours ou récent."""
+        names = self.select(names)
+        with self._lock:
+            expired = self.interval is not None and time.monotonic() - self._started_at > self.interval
+            same = self._names is not None and set(names) == set(self._names)
+            if same and not self._cancelled.is_set() and not expired:
+                return
+            self._cancel_locked()
+            cancelled = self._cancelled = threading.Event()
+            self._names = names
+            self._started_at = time.monotonic()
+            self._futures = [self._executor.submit(self._load, cancelled, load, name) for name in names]
+
+    def cancel(self):
+        """Abandonne les préchargements qui n'ont pas encore démarré."""
+        with self._lock:
+            self._cancel_locked()
+
+    def progress(self):
+        """Renvoie ``(terminés, total)`` pour le lot courant."""
+        with self._lock:
+            return sum(future.done() for future in self._futures), len(self._futures)
+
+    def _cancel_locked(self):
+        self._cancelled.set()
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    @staticmethod
+    def _load(cancelled, load, name):
+        if cancelled.is_set():
+            return
+        try:
+            load(name)
+        except Exception:
+            logger.info("Préchargement impossible pour %r", name, exc_info=True)
+
+
+# Instance partagée : le lot est relancé dès que les KPIs produits expirent du cache
+product_prefetcher = Prefetcher(limit=int(kpi_cache.max_entries * PREFETCH_CACHE_SHARE),
+                                interval=kpi_cache.ttls.get("getProductKpis"))
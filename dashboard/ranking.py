@@ -0,0 +1,89 @@
+"""Classement des agents et managers sur plusieurs indicateurs, sans tri complet.
+
+``top_k`` sélectionne les k meilleurs avec ``np.argpartition`` (temps linéaire)
+puis ne trie que ces k lignes ; les ex aequo avec la k-ième sont tous inclus.
+Les rangs sont des rangs « de compétition » (1, 2, 2, 4...) : le rang d'une
+personne vaut 1 + le nombre de personnes strictement meilleures qu'elle sur
+l'indicateur, ce qui se calcule sans trier l'effectif.
+
+``matching`` et ``leaderboard_page`` filtrent, trient et découpent côté
+serveur : seules les lignes de la page demandée sont renvoyées, avec leurs
+rangs sur chaque indicateur (calculés sur l'effectif complet, filtre ou non).
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.aggregations import DISPLAY_COLUMNS
+
+# Indicateurs classés, et sens du classement (True : plus grand est meilleur)
+METRICS = {
+    "revenue": True,
+    "sales": True,
+    "avg_revenue": True,
+    "won_ratio": True,
+    "lost_ratio": False,
+}
+RANK_PREFIX = "Rang "
+
+
+def _keys(values, descending):
+    """Clés croissantes (la meilleure d'abord) ; les valeurs manquantes passent en dernier."""
+    keys = np.asarray(values, dtype="float64")
+    keys = -keys if descending else keys
+    return np.where(np.isnan(keys), np.inf, keys)
+
+
+def top_k(values, k, descending=True):
+    """Positions des ``k`` meilleures valeurs, ex aequo de la k-ième compris, la meilleure d'abord.
+
+    À valeur égale, l'ordre d'origine est conservé.
+    """
+    keys = _keys(values, descending)
+    if k <= 0 or len(keys) == 0:
+        return np.array([], dtype=np.intp)
+    if k < len(keys):
+        threshold = keys[np.argpartition(keys, k - 1)[k - 1]]
+        selected = np.flatnonzero(keys <= threshold)
+    else:
+        selected = np.arange(len(keys))
+    return selected[np.lexsort((selected, keys[selected]))]
+
+
+def competition_ranks(values, positions, descending=True):
+    """Rangs (1, 2, 2, 4...) des lignes ``positions`` parmi toutes les ``values``."""
+    keys = _keys(values, descending)
+    return 1 + (keys[None, :] < keys[np.asarray(positions)][:, None]).sum(axis=1)
+
+
+def best(people, metric="revenue"):
+    """Lignes de ``people`` en tête sur ``metric`` (plusieurs en cas d'égalité)."""
+    if people.empty:
+        return people
+    positions = top_k(people[metric].to_numpy(), 1, METRICS[metric])
+    return people.iloc[positions]
+
+
+def matching(people, name_filter=""):
+    """Positions des lignes de ``people`` dont le nom contient ``name_filter`` (sans casse)."""
+    if not name_filter:
+        return np.arange(len(people))
+    return np.flatnonzero(people.index.astype(str).str.contains(name_filter, case=False, regex=False))
+
+
+def leaderboard_page(people, positions, label, sort_by="revenue", page=1, page_size=25):
+    """Page ``page`` du classement des lignes ``positions`` de ``people`` (voir ``matching``).
+
+    ``people`` est ``TeamKpis.agents`` ou ``.managers``. La page a une colonne
+    de rang par indicateur, puis le nom (colonne ``label``) et les indicateurs
+    avec leurs libellés d'affichage.
+    """
+    start, end = (page - 1) * page_size, page * page_size
+    order = top_k(people[sort_by].to_numpy()[positions], end, METRICS[sort_by])[start:end]
+    rows = positions[order]
+
+    ranks = pd.DataFrame({f"{RANK_PREFIX}{DISPLAY_COLUMNS[metric]}":
+                          competition_ranks(people[metric].to_numpy(), rows, descending)
+                          for metric, descending in METRICS.items()})
+    frame = people.iloc[rows].rename(columns=DISPLAY_COLUMNS)
+    frame.index = pd.Index(people.index[rows].astype(str), name=label)
+    return pd.concat([ranks, frame.reset_index()], axis=1)
@@ -0,0 +1,134 @@
+"""Budget de temps par rendu et disjoncteur par endpoint.
+
+Chaque rendu de page (ou rerun de fragment) dispose de
+``RENDER_BUDGET_SECONDS`` secondes (``render_budget``). Un appel à l'API fait
+depuis ce rendu n'en reçoit qu'une part (``UPSTREAM_BUDGET_SHARE`` du temps
+restant), nouveaux essais compris : au-delà, ``DeadlineExceeded`` est levée et
+la page affiche ce qu'elle a (cache expiré, copie locale, autres sections)
+au lieu de rester bloquée. Pour un appel partagé (``dashboard.singleflight``),
+seul l'appelant cesse d'attendre : l'appel continue pour les autres. Les threads d'arrière-plan (rafraîchissement,
+préchargement) n'ont pas de budget et gardent les délais de ``api_client``.
+
+Le disjoncteur d'un endpoint s'ouvre après ``BREAKER_FAILURE_THRESHOLD``
+échecs consécutifs : les appels échouent alors aussitôt (``CircuitOpenError``)
+pendant ``BREAKER_RESET_SECONDS``, puis un seul appel de test est autorisé
+(demi-ouvert) ; sa réussite referme le disjoncteur, son échec le rouvre.
+Un appel abandonné côté client (``DeadlineExceeded``, arrêt du script) ne
+compte pas comme un échec de l'endpoint.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+
+from dashboard import config
+
+RENDER_BUDGET_SECONDS = config.env_float("RENDER_BUDGET_SECONDS", 8)
+UPSTREAM_BUDGET_SHARE = config.env_float("UPSTREAM_BUDGET_SHARE", 0.5)
+BREAKER_FAILURE_THRESHOLD = config.env_int("BREAKER_FAILURE_THRESHOLD", 5)
+BREAKER_RESET_SECONDS = config.env_float("BREAKER_RESET_SECONDS", 30)
+
+CLOSED, OPEN, HALF_OPEN = "fermé", "ouvert", "demi-ouvert"
+
+_local = threading.local()
+
+
+class DeadlineExceeded(httpx.HTTPError):
+    """Le budget de temps du rendu en cours est épuisé."""
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Le disjoncteur de l'endpoint est ouvert : l'appel n'a pas été tenté."""
+
+
+@contextmanager
+def render_budget(seconds=RENDER_BUDGET_SECONDS):
+    """Limite la durée des appels à l'API faits dans le bloc (ou la fonction décorée).
+
+    Un budget imbriqué ne peut pas prolonger celui qui l'englobe.
+    """
+    previous = getattr(_local, "deadline", None)
+    if seconds:
+        deadline = time.monotonic() + seconds
+        _local.deadline = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def call_deadline():
+    """Échéance (``time.monotonic``) d'un appel lancé maintenant, ``None`` hors budget."""
+    deadline = getattr(_local, "deadline", None)
+    if deadline is None:
+        return None
+    now = time.monotonic()
+    return now + max(0.0, deadline - now) * UPSTREAM_BUDGET_SHARE
+
+
+class CircuitBreaker:
+    """Disjoncteur fermé / ouvert / demi-ouvert d'un endpoint."""
+
+    def __init__(self, name, threshold=BREAKER_FAILURE_THRESHOLD, reset_after=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Lève ``CircuitOpenError`` si l'appel ne doit pas être tenté."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            wait = self._opened_at + self.reset_after - time.monotonic()
+            if self.state == OPEN and wait <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                # Un seul appel de test à la fois
+                self._probing = True
+                return
+        raise CircuitOpenError(
+            f"Service {self.name} indisponible, nouvel essai dans {max(0, round(wait))} s")
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_cancel(self):
+        """L'appel a été abandonné par l'appelant (budget du rendu, arrêt) : ni succès ni échec."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(endpoint):
+    """Disjoncteur partagé (par toutes les sessions) de ``endpoint``."""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def breaker_states():
+    """``{endpoint: état}`` de tous les disjoncteurs."""
+    with _breakers_lock:
+        return {name: breaker.state for name, breaker in _breakers.items()}
@@ -0,0 +1,120 @@
+"""Recherche de produits par préfixe et par trigrammes.
+
+L'index est construit une fois par version du catalogue (``getAllProducts``)
+et partagé par toutes les sessions. ``search`` classe les produits :
+
+1. nom commençant par la saisie ;
+2. un mot du nom commençant par la saisie ;
+3. saisie (d'au moins 3 caractères) contenue dans le nom ;
+4. à défaut, noms proches (part des trigrammes de la saisie présents dans
+   le nom au moins égale à ``PRODUCT_SEARCH_MIN_SIMILARITY``), pour les
+   fautes de frappe.
+
+Les noms sont comparés sans casse ni accents. Seuls les ``PRODUCT_SEARCH_LIMIT``
+meilleurs résultats sont renvoyés (et donc envoyés au navigateur), quelle
+que soit la taille du catalogue.
+"""
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+
+from dashboard import config
+
+SEARCH_LIMIT = config.env_int("PRODUCT_SEARCH_LIMIT", 20)
+MIN_SIMILARITY = config.env_float("PRODUCT_SEARCH_MIN_SIMILARITY", 0.6)
+
+# Scores des différents types de correspondance (la similarité vaut au plus 1)
+_PREFIX, _WORD_PREFIX, _SUBSTRING = 4.0, 3.0, 2.0
+
+
+def normalize(text):
+    """Minuscules, sans accents ni espaces superflus."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.casefold().split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProductIndex:
+    """Index en mémoire d'une liste de noms de produits."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._normalized = [normalize(name) for name in self.names]
+        self._lengths = np.fromiter((len(name) for name in self._normalized), dtype=np.int32,
+                                    count=len(self.names))
+
+        # Noms et mots triés, pour les recherches par préfixe (bisect)
+        self._sorted = sorted((name, i) for i, name in enumerate(self._normalized))
+        self._words = sorted((word, i) for i, name in enumerate(self._normalized)
+                             for word in set(name.split()))
+
+        postings = defaultdict(list)
+        for i, name in enumerate(self._normalized):
+            for gram in trigrams(name):
+                postings[gram].append(i)
+        self._grams = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _prefixed(entries, prefix):
+        lo = bisect_left(entries, (prefix,))
+        hi = bisect_left(entries, (prefix + "\uffff",))
+        return np.fromiter((i for _, i in entries[lo:hi]), dtype=np.int32, count=hi - lo)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Renvoie au plus ``limit`` noms, les meilleures correspondances d'abord."""
+        query = normalize(query)
+        if not query:
+            return self.names[:limit]
+
+        scores = np.zeros(len(self.names), dtype=np.float32)
+        scores[self._prefixed(self._words, query)] = _WORD_PREFIX
+        scores[self._prefixed(self._sorted, query)] = _PREFIX
+
+        # Saisie contenue dans le nom : tous ses trigrammes (hors bords) y figurent
+        inner = {query[i:i + 3] for i in range(len(query) - 2)}
+        if inner and all(gram in self._grams for gram in inner):
+            counts = np.bincount(np.concatenate([self._grams[gram] for gram in inner]),
+                                 minlength=len(self.names))
+            candidates = np.flatnonzero((counts == len(inner)) & (scores == 0))
+            scores[[i for i in candidates if query in self._normalized[i]]] = _SUBSTRING
+
+        # À défaut de correspondance exacte, noms proches
+        grams = trigrams(query)
+        lists = [self._grams[gram] for gram in grams if gram in self._grams]
+        if lists and not scores.any():
+            similarity = np.bincount(np.concatenate(lists), minlength=len(self.names)) / len(grams)
+            candidates = np.flatnonzero(similarity >= MIN_SIMILARITY)
+            scores[candidates] = similarity[candidates]
+
+        found = np.flatnonzero(scores)
+        # Meilleur score, puis nom le plus court, puis ordre du catalogue
+        order = np.lexsort((found, self._lengths[found], -scores[found]))
+        return [self.names[i] for i in found[order[:limit]]]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def index_for(names, version):
+    """Index de ``names``, construit une seule fois pour une version du catalogue."""
+    with _lock:
+        index = _indexes.get(version)
+    if index is None or len(index) != len(names):
+        index = ProductIndex(names)
+        with _lock:
+            # Seul le catalogue courant est gardé
+            _indexes.clear()
+            _indexes[version] = index
+    return index
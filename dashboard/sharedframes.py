@@ -0,0 +1,213 @@
+"""Tableaux des modèles partagés en mémoire, en lecture seule, entre processus.
+
+Chaque nouvelle valeur reçue de l'API (modèle de ``dashboard.models``) est
+publiée dans ``SHARED_FRAMES_DIR`` (par défaut sous ``/dev/shm``) : un
+fichier Arrow IPC par tableau et un ``meta.json`` pour les indicateurs
+scalaires, dans un répertoire par version. Le fichier ``current`` désigne
+la version en service ; il est remplacé atomiquement (``os.replace``) une
+fois la nouvelle version complète, et les versions remplacées sont
+supprimées (un processus qui les lit encore garde son mapping).
+
+La valeur renvoyée par ``publish`` (et ``fresh``) n'est pas une copie : ses
+DataFrames sont des vues en lecture seule sur les fichiers mappés en
+mémoire. Toutes les sessions d'un processus partagent déjà la même valeur
+(``dashboard.cache``) ; avec ces fichiers, les processus d'un même hôte
+partagent aussi les mêmes pages mémoire, et un processus reprend une version
+publiée récemment par un autre au lieu d'interroger l'API à son tour.
+
+Seules les réponses des endpoints de ``SHARED_ENDPOINTS`` (les tableaux
+agrégés, volumineux et communs à toutes les pages) sont partagées : les KPIs
+par produit restent propres à chaque processus, et ``/dev/shm`` ne grossit
+pas avec le catalogue. Une clé évincée du cache est oubliée (``forget``) :
+son mapping est libéré.
+
+``SHARED_FRAMES_DIR`` vide (défaut sans ``/dev/shm``), ou pyarrow ou
+``fcntl`` absents (Windows), désactive le partage : les valeurs restent
+alors propres à chaque processus.
+"""
+import dataclasses
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow est optionnel
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - absent sous Windows
+    fcntl = None
+
+from dashboard import config, models
+
+logger = logging.getLogger(__name__)
+
+SHARED_FRAMES_DIR = config.env_str("SHARED_FRAMES_DIR",
+                                   "/dev/shm/crm-dashboard" if os.path.isdir("/dev/shm") else "")
+SHARED_ENDPOINTS = frozenset(name.strip() for name in config.env_str(
+    "SHARED_ENDPOINTS", "getAllProductsKpis,getAllTeamsKpis").split(",") if name.strip())
+
+_lock = threading.Lock()
+# Versions déjà mappées par ce processus : {clé: (version, valeur)}
+_mapped = {}
+
+
+def enabled(key=None):
+    """Partage actif (pour ``key`` si elle est donnée)."""
+    return (bool(SHARED_FRAMES_DIR) and pa is not None and fcntl is not None
+            and (key is None or key[0] in SHARED_ENDPOINTS))
+
+
+def _path(key):
+    return Path(SHARED_FRAMES_DIR) / "__".join(quote(str(part), safe="") for part in key)
+
+
+def _write(path, frame):
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read(path):
+    """Tableau du fichier ``path`` : colonnes numériques et codes de l'index sans copie
+    (vues en lecture seule sur le fichier mappé)."""
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    index_name = table.schema.pandas_metadata["index_columns"][0]
+    try:
+        labels = table.column(index_name).combine_chunks()
+        index = pd.CategoricalIndex(
+            pd.Categorical.from_codes(labels.indices.to_numpy(zero_copy_only=True),
+                                      categories=labels.dictionary.to_pandas()),
+            name=index_name)
+        columns = {name: table.column(name).combine_chunks().to_numpy(zero_copy_only=True)
+                   for name in table.column_names if name != index_name}
+    except (AttributeError, pa.ArrowInvalid):
+        # Index non catégoriel, valeurs manquantes, texte... : conversion générique
+        return table.to_pandas(split_blocks=True)
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def _map(key, version):
+    """Valeur de la version ``version`` de ``key``, mappée une seule fois par processus."""
+    with _lock:
+        mapped = _mapped.get(key)
+    if mapped is not None and mapped[0] == version:
+        return mapped[1]
+    path = _path(key) / str(version)
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    fields = dict(meta["scalars"])
+    fields["as_of"] = datetime.fromisoformat(fields["as_of"])
+    for name in meta["tables"]:
+        fields[name] = _read(path / f"{name}.arrow")
+    value = getattr(models, meta["type"])(**fields)
+    with _lock:
+        _mapped[key] = (version, value)
+    return value
+
+
+def _current(path):
+    """Version en service et date de sa dernière publication ou confirmation."""
+    pointer = path / "current"
+    return int(pointer.read_text()), pointer.stat().st_mtime
+
+
+def publish(key, value):
+    """Publie ``value`` comme nouvelle version de ``key`` et renvoie sa vue partagée.
+
+    Une valeur sans tableau (liste de noms...) est renvoyée telle quelle.
+    """
+    if not enabled(key) or not dataclasses.is_dataclass(value):
+        return value
+    path = _path(key)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+        with open(path / ".lock", "w") as lock:
+            # Une seule publication à la fois pour une clé, tous processus confondus
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                version = _current(path)[0] + 1
+            except FileNotFoundError:
+                version = 1
+            directory = path / str(version)
+            shutil.rmtree(directory, ignore_errors=True)
+            directory.mkdir()
+
+            meta = {"type": type(value).__name__, "scalars": {}, "tables": []}
+            for field in dataclasses.fields(value):
+                item = getattr(value, field.name)
+                if isinstance(item, pd.DataFrame):
+                    meta["tables"].append(field.name)
+                    _write(directory / f"{field.name}.arrow", item)
+                elif isinstance(item, datetime):
+                    meta["scalars"][field.name] = item.isoformat()
+                else:
+                    meta["scalars"][field.name] = item
+            (directory / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+            # Bascule atomique vers la nouvelle version, puis suppression des anciennes
+            (path / "current.tmp").write_text(str(version))
+            os.replace(path / "current.tmp", path / "current")
+            for old in path.iterdir():
+                if old.is_dir() and old.name != str(version):
+                    shutil.rmtree(old, ignore_errors=True)
+        return _map(key, version)
+    except Exception:
+        logger.warning("Publication partagée impossible pour %s", key, exc_info=True)
+        return value
+
+
+def confirm(key):
+    """Signale aux autres processus que la version en service de ``key`` est à jour."""
+    if enabled(key):
+        try:
+            os.utime(_path(key) / "current")
+        except OSError:
+            pass
+
+
+def fresh(key, max_age):
+    """``(version, valeur, date)`` de la version en service de ``key`` si elle a
+    été publiée ou confirmée il y a moins de ``max_age`` secondes, sinon ``None``."""
+    if not enabled(key):
+        return None
+    try:
+        version, updated_at = _current(_path(key))
+        if time.time() - updated_at >= max_age:
+            return None
+        return version, _map(key, version), updated_at
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Version partagée illisible pour %s", key, exc_info=True)
+        return None
+
+
+def version(key):
+    """Version de ``key`` mappée par ce processus (0 si aucune)."""
+    with _lock:
+        mapped = _mapped.get(key)
+    return 0 if mapped is None else mapped[0]
+
+
+def forget(key):
+    """Libère le mapping de ``key`` dans ce processus (clé évincée du cache)."""
+    with _lock:
+        _mapped.pop(key, None)
+
+
+def clear():
+    """Supprime toutes les versions publiées (tous processus)."""
+    if SHARED_FRAMES_DIR:
+        shutil.rmtree(SHARED_FRAMES_DIR, ignore_errors=True)
+    with _lock:
+        _mapped.clear()
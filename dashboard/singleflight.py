@@ -0,0 +1,67 @@
+"""Regroupement des appels identiques simultanés (« single-flight »).
+
+Tant qu'un appel est en cours pour une clé, les autres demandes de la même
+clé attendent son résultat (ou son exception) au lieu d'interroger l'API à
+leur tour. Chaque attente est enregistrée dans ``dashboard.perf``
+(``kind == "coalesced"``, nom de l'endpoint).
+
+L'appel partagé s'exécute dans un thread de ``SingleFlight``, sans budget de
+rendu : il ne dépend pas de l'appelant qui l'a lancé. Chaque appelant, le
+premier compris, n'attend que dans la limite de son propre budget (voir
+``dashboard.resilience``) ; s'il abandonne, l'appel continue pour les autres
+(rafraîchissement d'arrière-plan, autres sessions) et son résultat sert au
+prochain rerun.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dashboard import config, perf, resilience
+
+MAX_WORKERS = config.env_int("SINGLEFLIGHT_MAX_WORKERS", 32)
+
+
+class SingleFlight:
+    """Un seul appel en cours par clé ; tous les appelants partagent son issue."""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="singleflight")
+
+    def do(self, key, func, name=None):
+        """Renvoie ``func()``, partagé avec les appels simultanés de ``key``.
+
+        ``name`` nomme les mesures des attentes (par défaut ``key[0]``) :
+        l'endpoint, jamais la clé complète, pour un nombre borné de séries.
+        """
+        name = key[0] if name is None else name
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                # Les mesures de l'appel vont au rerun qui l'a lancé
+                future = self._calls[key] = self._executor.submit(self._run, key, func, perf.context())
+        return self._wait(name, future, coalesced=not leader)
+
+    def _run(self, key, func, run_context):
+        # Thread de l'exécuteur : aucun budget de rendu n'y est ouvert
+        try:
+            with perf.attached(run_context):
+                return func()
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    @staticmethod
+    def _wait(name, future, coalesced):
+        start = time.perf_counter()
+        deadline = resilience.call_deadline()
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            raise resilience.DeadlineExceeded(f"Délai dépassé pour {name} (appel partagé en cours)") from None
+        finally:
+            if coalesced:
+                perf.record("coalesced", name, time.perf_counter() - start)
@@ -0,0 +1,105 @@
+"""Copie locale sur disque de la dernière réponse valide de chaque endpoint.
+
+Chaque nouvelle valeur chargée depuis l'API est enregistrée en arrière-plan
+dans ``SNAPSHOT_DIR`` : un fichier Parquet par tableau du modèle et un
+``meta.json`` pour les indicateurs scalaires et la date des données. Au
+démarrage, ou quand l'API ne répond pas, les pages affichent aussitôt cette
+copie (``source == "snapshot"``) pendant que le cache la rafraîchit.
+
+``SNAPSHOT_DIR`` vide désactive les copies locales.
+"""
+import dataclasses
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+from dashboard import config, models
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = config.env_str("SNAPSHOT_DIR", ".snapshots")
+
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kpi-snapshot")
+
+
+def _path(key):
+    return Path(SNAPSHOT_DIR) / "__".join(quote(str(part), safe="") for part in key)
+
+
+def _write_atomic(path, write):
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def save(key, value):
+    """Enregistre ``value`` (modèle de ``dashboard.models`` ou liste) pour ``key``."""
+    path = _path(key)
+    path.mkdir(parents=True, exist_ok=True)
+    if isinstance(value, list):
+        meta = {"type": "list"}
+        _write_atomic(path / "values.parquet",
+                      lambda tmp: pd.DataFrame({"value": value}).to_parquet(tmp))
+    else:
+        meta = {"type": type(value).__name__, "scalars": {}, "tables": []}
+        for field in dataclasses.fields(value):
+            if field.name == "source":
+                continue
+            item = getattr(value, field.name)
+            if isinstance(item, pd.DataFrame):
+                meta["tables"].append(field.name)
+                _write_atomic(path / f"{field.name}.parquet", item.to_parquet)
+            elif isinstance(item, datetime):
+                meta["scalars"][field.name] = item.isoformat()
+            else:
+                meta["scalars"][field.name] = item
+    # meta.json en dernier : une copie n'est lisible qu'une fois complète
+    _write_atomic(path / "meta.json",
+                  lambda tmp: tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8"))
+
+
+def load(key):
+    """Relit la copie locale de ``key`` ; ``None`` si elle est absente ou illisible."""
+    if not SNAPSHOT_DIR:
+        return None
+    path = _path(key)
+    try:
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta["type"] == "list":
+            return pd.read_parquet(path / "values.parquet")["value"].tolist()
+        fields = dict(meta["scalars"])
+        fields["as_of"] = datetime.fromisoformat(fields["as_of"])
+        for name in meta["tables"]:
+            fields[name] = pd.read_parquet(path / f"{name}.parquet")
+        return getattr(models, meta["type"])(**fields, source="snapshot")
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Copie locale illisible pour %s", key, exc_info=True)
+        return None
+
+
+def save_later(key, value):
+    """Planifie l'enregistrement de ``value`` et la renvoie telle quelle."""
+    if SNAPSHOT_DIR:
+        future = _writer.submit(save, key, value)
+        future.add_done_callback(_log_failure)
+    return value
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.warning("Enregistrement de la copie locale impossible", exc_info=future.exception())
+
+
+def clear():
+    """Supprime toutes les copies locales."""
+    if SNAPSHOT_DIR:
+        shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
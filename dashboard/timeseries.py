@@ -0,0 +1,95 @@
+"""Séries mensuelles (revenu, ventes) et indicateurs dérivés, calculés localement.
+
+``monthly`` convertit ``ProductsKpis.months`` en un tableau indexé par mois
+calendaire (``PeriodIndex``), trié, sans trou (un mois absent de la réponse
+vaut 0). ``enrich`` y ajoute, pour chaque colonne, la variation sur un mois
+et sur un an (en %), la moyenne glissante et le cumul. Tout est vectorisé et
+ne dépend que des données déjà en cache : choisir une période ou une fenêtre
+ne fait aucun appel à l'API.
+
+Les variations et moyennes glissantes sont calculées sur toute la série puis
+découpées (le premier mois d'une période garde sa variation) ; le cumul
+repart de zéro au début de la période choisie.
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard import config
+
+ROLLING_WINDOW_DEFAULT = config.env_int("ROLLING_WINDOW_MONTHS", 3)
+
+MOM, YOY, ROLLING, CUMULATIVE = "mom", "yoy", "rolling", "cumulative"
+
+# Formats acceptés pour les libellés des mois (tous les libellés d'une réponse dans le même)
+MONTH_FORMATS = ("%Y-%m", "%Y-%m-%d")
+
+
+def _parse_months(labels):
+    """Dates des libellés, ou ``None`` si un seul d'entre eux n'est pas dans l'un des ``MONTH_FORMATS``."""
+    for month_format in MONTH_FORMATS:
+        dates = pd.to_datetime(labels, format=month_format, errors="coerce")
+        if not dates.isna().any():
+            return dates
+    return None
+
+
+def monthly(months):
+    """Tableau mensuel continu, ou ``None`` si les libellés ne sont pas tous des mois
+    (les pages affichent alors les valeurs par libellé, telles quelles)."""
+    if months is None or months.empty:
+        return None
+    dates = _parse_months(pd.Index(months.index.astype(str)))
+    if dates is None:
+        return None
+    frame = months.astype("float64")
+    frame.index = pd.PeriodIndex(dates, freq="M", name="Mois")
+    # Plusieurs libellés pour un même mois : additionnés
+    frame = frame.groupby(level=0, sort=True).sum()
+    full = pd.period_range(frame.index[0], frame.index[-1], freq="M", name="Mois")
+    return frame.reindex(full, fill_value=0.0)
+
+
+def _change(values, periods):
+    """Variation en % sur ``periods`` mois (NaN sans point de comparaison ou depuis 0)."""
+    previous = np.full(len(values), np.nan)
+    if periods < len(values):
+        previous[periods:] = values[:-periods]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (values - previous) / np.abs(previous) * 100
+    return np.where(previous == 0, np.nan, change)
+
+
+def enrich(frame, window=ROLLING_WINDOW_DEFAULT):
+    """Ajoute ``<colonne>_mom``, ``_yoy``, ``_rolling`` et ``_cumulative`` à chaque colonne."""
+    columns = {}
+    for column in frame.columns:
+        values = frame[column].to_numpy(dtype="float64")
+        columns[column] = values
+        columns[f"{column}_{MOM}"] = _change(values, 1)
+        columns[f"{column}_{YOY}"] = _change(values, 12)
+        columns[f"{column}_{ROLLING}"] = frame[column].rolling(window, min_periods=1).mean().to_numpy()
+        columns[f"{column}_{CUMULATIVE}"] = np.cumsum(values)
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def between(enriched, start, end):
+    """Mois de ``start`` à ``end`` inclus ; les cumuls repartent de ``start``."""
+    sliced = enriched.loc[start:end].copy()
+    for column in sliced.columns:
+        if column.endswith(f"_{CUMULATIVE}"):
+            base = column[:-len(CUMULATIVE) - 1]
+            sliced[column] = sliced[base].cumsum()
+    return sliced
+
+
+def period_total(enriched, column, start, end):
+    """Total de ``column`` sur la période, et sa variation en % par rapport aux
+    mois qui la précèdent immédiatement (même durée ; ``None`` s'ils manquent)."""
+    start, end = pd.Period(start, freq="M"), pd.Period(end, freq="M")
+    values = enriched[column]
+    total = float(values.loc[start:end].sum())
+    length = (end - start).n + 1
+    if start - length < enriched.index[0]:
+        return total, None
+    previous = float(values.loc[start - length:start - 1].sum())
+    return total, (total - previous) / abs(previous) * 100 if previous else None
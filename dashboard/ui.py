@@ -0,0 +1,31 @@
+"""Éléments d'interface communs aux pages."""
+import streamlit as st
+
+
+def data_freshness(kpis):
+    """Indique la date des données affichées, et si elles viennent de la copie locale."""
+    as_of = kpis.as_of.astimezone().strftime("%d/%m/%Y %H:%M")
+    if kpis.source == "snapshot":
+        st.caption(f"🕒 Données au {as_of} (copie locale, actualisation en cours)")
+    else:
+        st.caption(f"🕒 Données au {as_of}")
+
+
+def backend_unavailable(error):
+    """Avertissement affiché à la place d'une section quand l'API est trop lente ou coupée."""
+    st.warning(f"⏳ {error}. Les données s'afficheront au prochain rafraîchissement.")
+
+
+# Affichage et icône de chaque palier des recommandations (voir ``dashboard.alerts``)
+_LEVEL_STYLES = {
+    "error": (st.error, "🚨"),
+    "warning": (st.warning, "⚠️"),
+    "info": (st.info, "ℹ️"),
+    "ok": (st.success, "🎉"),
+}
+
+
+def recommendation(severity, message):
+    """Affiche ``message`` dans le style de son palier (``alerts.LEVELS``)."""
+    show, icon = _LEVEL_STYLES[severity]
+    show(f"{icon} {message}")
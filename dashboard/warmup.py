@@ -0,0 +1,64 @@
+"""Préchargement des modules lourds, une fois par processus.
+
+La page d'accueil (``main.py``) n'importe que Streamlit pour s'afficher vite,
+puis appelle ``start()`` : un thread d'arrière-plan importe pandas, Plotly et
+les modules de ``dashboard`` utilisés par les pages, et construit quelques
+figures jetables (voir ``figures.warm``). Le premier ``st.switch_page`` ne paie
+plus ces imports. La durée de chaque import est enregistrée dans
+``dashboard.perf`` (``kind == "import"``).
+
+``WARMUP=0`` désactive le préchargement.
+"""
+import importlib
+import logging
+import threading
+import time
+
+from dashboard import config, perf
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = config.env_bool("WARMUP", default=True)
+
+# Dans l'ordre où les pages les importent
+WARM_MODULES = (
+    "pandas",
+    "plotly.express",
+    "st_aggrid",
+    "dashboard.models",
+    "dashboard.loaders",
+    "dashboard.figures",
+    "dashboard.aggregations",
+    "dashboard.ranking",
+    "dashboard.alerts",
+    "dashboard.live",
+    "dashboard.prefetch",
+)
+
+_lock = threading.Lock()
+_thread = None
+
+
+def _run():
+    try:
+        for name in WARM_MODULES:
+            start = time.perf_counter()
+            importlib.import_module(name)
+            perf.record("import", name, time.perf_counter() - start)
+        start = time.perf_counter()
+        importlib.import_module("dashboard.figures").warm()
+        perf.record("import", "figures.warm", time.perf_counter() - start)
+    except Exception:
+        logger.warning("Préchargement interrompu", exc_info=True)
+
+
+def start():
+    """Lance le préchargement s'il n'a pas déjà eu lieu dans ce processus."""
+    global _thread
+    if not WARMUP_ENABLED:
+        return
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="dashboard-warmup", daemon=True)
+            _thread.start()
+
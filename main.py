@@ -1,5 +1,7 @@
 import streamlit as st
 
+from dashboard import warmup
+
 # Page configuration
 st.set_page_config(
     page_title="Performances commerciales HeticEtronics",
@@ -7,6 +9,9 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
     )
+
+# Préchargement en arrière-plan des modules des pages (une fois par processus)
+warmup.start()
 st.empty()  # Ajoute un espace vide
 col1, col2 = st.columns([2, 1]) 
 
@@ -47,4 +52,8 @@ with st.container():
             st.image("public/nav_sales.png", width=200, use_container_width=False)
             
             if st.button("Performances de Ventes", key="sales_nav", type="primary", use_container_width=True):
-                st.switch_page("pages/Sales.py")
\ No newline at end of file
+                st.switch_page("pages/Sales.py")
+
+        # Alerts Navigation
+        if st.button("🚨 Alertes : indicateurs hors seuil", key="alerts_nav", use_container_width=True):
+            st.switch_page("pages/Alerts.py")
\ No newline at end of file
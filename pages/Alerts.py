@@ -0,0 +1,100 @@
+import streamlit as st
+import httpx
+
+from dashboard import aggregations, alerts, loaders, models, perf, resilience, ui
+from dashboard.cache import AUTO_REFRESH_SECONDS, kpi_cache
+from dashboard.prefetch import product_prefetcher
+
+# Configuration de la page
+st.set_page_config(page_title="Alertes", page_icon="🚨", layout="wide")
+st.title("🚨 Alertes : indicateurs hors seuil")
+
+# Début de la collecte des mesures de performance de ce rerun
+perf.begin_run("Alerts")
+
+# Bouton pour forcer le rechargement des données depuis l'API
+if st.sidebar.button("🔄 Actualiser les données"):
+    kpi_cache.invalidate()
+    product_prefetcher.cancel()
+    alerts.product_scanner.cancel()
+
+# Fonction pour charger une réponse de l'API (None, avec un message, si elle est indisponible)
+def load_or_warn(parse, path, label):
+    try:
+        return loaders.load(parse, path)
+    except (resilience.DeadlineExceeded, resilience.CircuitOpenError) as e:
+        ui.backend_unavailable(e)
+        return None
+    except httpx.HTTPError as e:
+        st.error(f"Erreur lors du chargement {label} : {e}")
+        return None
+
+# Fonction pour afficher le nombre d'alertes par portée et par gravité
+@perf.timed
+def display_summary(found):
+    counts = alerts.summary(found)
+    col1, col2, col3, col4 = st.columns(4)
+    for col, scope in zip((col1, col2, col3, col4), alerts.SCOPES):
+        errors, warnings = counts.loc[scope, alerts.ERROR], counts.loc[scope, alerts.WARNING]
+        col.metric(f"{scope}", int(errors + warnings), f"dont {errors} critique(s)" if errors else None,
+                   delta_color="inverse")
+
+# Fonction pour afficher une page du tableau des alertes, filtré par portée et gravité
+@perf.timed
+def display_alerts(found):
+    col1, col2, col3 = st.columns(3)
+    scopes = col1.multiselect("Portée", alerts.SCOPES, default=list(alerts.SCOPES), key="alert_scopes")
+    severities = col2.multiselect("Gravité", alerts.SEVERITIES, default=list(alerts.SEVERITIES),
+                                  format_func={alerts.ERROR: "Critique", alerts.WARNING: "Avertissement"}.get,
+                                  key="alert_severities")
+    shown = found[found["scope"].isin(scopes) & found["severity"].isin(severities)]
+
+    pages = aggregations.page_count(shown, aggregations.PAGE_SIZE_DEFAULT)
+    page = col3.number_input(f"Page (sur {pages})", min_value=1, max_value=pages, value=1, key="alert_page")
+    start = (int(page) - 1) * aggregations.PAGE_SIZE_DEFAULT
+    rows = shown.iloc[start:start + aggregations.PAGE_SIZE_DEFAULT].copy()
+    st.caption(f"{len(shown)} alerte(s) sur {len(found)}")
+
+    # Seule la page affichée est envoyée au navigateur
+    rows["metric"] = rows["metric"].map(lambda metric: alerts.METRIC_LABELS.get(metric, metric))
+    st.dataframe(rows.rename(columns=alerts.DISPLAY_COLUMNS), hide_index=True, use_container_width=True)
+
+# Section des alertes, rejouée seule toutes les AUTO_REFRESH_SECONDS secondes si configuré
+# (chaque rendu dispose d'un budget de temps limité)
+@perf.fragment(run_every=AUTO_REFRESH_SECONDS)
+@resilience.render_budget()
+def main():
+    products_kpis = load_or_warn(models.ProductsKpis.from_payload, "getAllProductsKpis", "des données des produits")
+    team_kpis = load_or_warn(models.TeamKpis.from_payload, "getAllTeamsKpis/", "des données des équipes")
+    products = load_or_warn(models.product_names, "getAllProducts", "des produits") or []
+
+    # Tout le catalogue est analysé : KPIs déjà en cache, puis relevé en arrière-plan des autres produits
+    for kpis in alerts.cached_products(products):
+        alerts.product_metrics.update(kpis)
+    if products:
+        alerts.product_scanner.warm(products, alerts.scan_product)
+    product_table = alerts.product_metrics.frame(products)
+    if len(product_table) < len(products):
+        done, total = alerts.product_scanner.progress()
+        st.caption(f"Indicateurs relevés pour {len(product_table)} produit(s) sur {len(products)} : "
+                   f"analyse des produits {done}/{total}.")
+
+    if products_kpis is None and team_kpis is None and not len(product_table):
+        return
+    for data in (products_kpis, team_kpis):
+        if data is not None:
+            ui.data_freshness(data)
+            break
+
+    found = alerts.evaluate(alerts.frames(products_kpis, team_kpis, product_table=product_table))
+    display_summary(found)
+    if found.empty:
+        st.success("🎉 Aucun indicateur hors seuil.")
+    else:
+        # Changer de filtre ou de page ne rejoue que le tableau
+        perf.fragment(display_alerts)(found)
+
+# Exécution de la fonction principale
+if __name__ == "__main__":
+    main()
+    perf.render_panel()
@@ -1,24 +1,29 @@
-import os
 import streamlit as st
-import requests
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from dotenv import load_dotenv
+import httpx
 
-# Chargement des variables d'environnement
-load_dotenv()
-# URL de l'API
-API_URL = os.getenv("API_URL")
+from st_aggrid import AgGrid, GridOptionsBuilder
+
+from dashboard import aggregations, alerts, figures, live, loaders, models, perf, ranking, resilience, ui
+from dashboard.cache import AUTO_REFRESH_SECONDS, kpi_cache
+from dashboard.charts import plotly_chart
+
+# Début de la collecte des mesures de performance de ce rerun
+perf.begin_run("Sales_team")
+
+# Bouton pour forcer le rechargement des données depuis l'API
+if st.sidebar.button("🔄 Actualiser les données"):
+    kpi_cache.invalidate()
 
 # Fonction pour récupérer les KPIs des équipes de vente
 def fetch_kpis():
     with st.spinner("Chargement des données en cours..."):
         try:
-            response = requests.get(f"{API_URL}getAllTeamsKpis/")  # API pour récupérer les KPIs des équipes
-            response.raise_for_status()  # Si une erreur HTTP se produit, cela générera une exception
-            return response.json()
-        except requests.exceptions.HTTPError as e:
+            # API pour récupérer les KPIs des équipes
+            return loaders.load(models.TeamKpis.from_payload, "getAllTeamsKpis/")
+        except (resilience.DeadlineExceeded, resilience.CircuitOpenError) as e:
+            ui.backend_unavailable(e)
+            return None
+        except httpx.HTTPStatusError as e:
             st.error(f"Erreur HTTP : {e}")
             return None
         except Exception as e:
@@ -29,30 +34,38 @@ def fetch_kpis():
 def load_global_data():
     with st.spinner("Chargement des données des produits en cours..."):
         try:
-            response = requests.get(f"{API_URL}getAllProductsKpis")  # API pour récupérer les KPIs des produits
-            response.raise_for_status()
+            # API pour récupérer les KPIs des produits
+            data = loaders.load(models.ProductsKpis.from_payload, "getAllProductsKpis")
             st.success("Données des produits chargées avec succès.")
-            return response.json()
-        except requests.RequestException as e:
+            return data
+        except (resilience.DeadlineExceeded, resilience.CircuitOpenError) as e:
+            ui.backend_unavailable(e)
+            return None
+        except httpx.HTTPError as e:
             st.error(f"Erreur lors du chargement des données des produits : {e}")
             return None
 
+# Fonction pour trouver la ou les personnes au plus fort revenu d'un tableau (noms, ventes, revenu)
+def best_by_revenue(people):
+    if people.empty:
+        return None, 0, 0
+    best = ranking.best(people, 'revenue')
+    # En cas d'égalité, toutes les personnes en tête sont citées
+    first = best.iloc[0]
+    return " / ".join(map(str, best.index)), int(first['sales']), float(first['revenue'])
+
 # Fonction pour trouver le meilleur agent et le meilleur manager
+@perf.timed
 def get_best_agent_and_manager(data):
-    best_agent = max(data['total_revenue_per_agent'], key=data['total_revenue_per_agent'].get, default=None)
-    best_manager = max(data['total_revenue_per_manager'], key=data['total_revenue_per_manager'].get, default=None)
-
-    best_agent_sales = data['total_sales_per_agent'].get(best_agent, 0)
-    best_agent_revenue = data['total_revenue_per_agent'].get(best_agent, 0)
-    
-    best_manager_sales = data['total_sales_per_manager'].get(best_manager, 0)
-    best_manager_revenue = data['total_revenue_per_manager'].get(best_manager, 0)
+    best_agent, best_agent_sales, best_agent_revenue = best_by_revenue(data.agents)
+    best_manager, best_manager_sales, best_manager_revenue = best_by_revenue(data.managers)
 
     return best_agent, best_agent_sales, best_agent_revenue, best_manager, best_manager_sales, best_manager_revenue
 
 
 
 
+@perf.timed
 def display_kpis(data):
     """Affiche les KPIs pour les meilleurs agents et managers"""
     st.title("🎯 **Évaluation des Performances de l'Équipe de Ventes**")
@@ -88,129 +101,112 @@ def display_kpis(data):
 
     st.markdown("---")
 
+# Fonction pour choisir la vue des graphiques : top N + « Autres », ou une page du classement
+def team_chart_view(frame, label, key):
+    col1, col2, col3 = st.columns(3)
+    mode = col1.radio("Affichage", ["Top N", "Pages"], horizontal=True, key=f"{key}_mode")
+    sort_label = col2.selectbox("Trier par", list(aggregations.SORT_COLUMNS), key=f"{key}_sort")
+    sort_by = aggregations.SORT_COLUMNS[sort_label]
+
+    if mode == "Top N":
+        n = col3.number_input("N", min_value=1, max_value=max(1, len(frame)),
+                              value=min(aggregations.TOP_N_DEFAULT, max(1, len(frame))), key=f"{key}_top_n")
+        return aggregations.top_n_with_others(frame, label, sort_by, int(n))
+
+    pages = aggregations.page_count(frame, aggregations.PAGE_SIZE_DEFAULT)
+    page = col3.number_input(f"Page (sur {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    return aggregations.paginate(frame, sort_by, int(page), aggregations.PAGE_SIZE_DEFAULT)
+
+@perf.timed
 def display_agent_performance(data):
     """Affiche les performances des agents sous forme de graphiques"""
     st.header("📊 Performances des Agents de Vente")
 
-    # Préparation des données
-    agents = list(data['total_sales_per_agent'].keys())
-    agent_data = pd.DataFrame({
-        "Agent": agents,
-        "Total des Ventes": [data['total_sales_per_agent'][agent] for agent in agents],
-        "Revenu Total (€)": [data['total_revenue_per_agent'][agent] for agent in agents],
-        "Revenu Moyen (€)": [data['avg_revenue_per_agent'].get(agent, 0) for agent in agents],
-        "Ratio Ventes conclues  (%)": [data['won_ratio_per_agent'].get(agent, 0) for agent in agents],
-        "Ratio Perdues (%)": [data['lost_ratio_per_agent'].get(agent, 0) for agent in agents],
-    })
+    # Préparation des données (seule la vue choisie est envoyée au graphique)
+    agent_data = team_chart_view(aggregations.team_frame(data.agents, "Agent"), "Agent", key="agent")
 
     # Graphiques
-    st.plotly_chart(
-        px.bar(
-            agent_data, x='Agent', y=['Total des Ventes', 'Revenu Total (€)'],
-            title="Ventes et Revenu Total par Agent",
-            labels={"value": "Valeur", "variable": "Mesure"},
-            barmode='stack', template='plotly_white',
-            color_discrete_sequence=["#1f77b4", "#ff7f0e"]
-        ),
-        use_container_width=True
-    )
-
-    st.plotly_chart(
-        px.bar(
-            agent_data, x='Agent', y=['Ratio Ventes conclues  (%)', 'Ratio Perdues (%)'],
-            title="Ratios de Ventes conclues  et Perdues par Agent",
-            labels={"value": "Ratio (%)", "variable": "Statut"},
-            barmode='stack', template='plotly_white',
-            color_discrete_sequence=["#2ca02c", "#d62728"]
-        ),
-        use_container_width=True
-    )
+    plotly_chart(figures.agent_volume(agent_data), use_container_width=True)
+    plotly_chart(figures.agent_ratios(agent_data), use_container_width=True)
 
+@perf.timed
 def display_manager_performance(data):
     """Affiche les performances des managers sous forme de graphiques"""
     st.header("📊 Performances des Managers")
 
-    # Préparation des données
-    managers = list(data['total_sales_per_manager'].keys())
-    manager_data = pd.DataFrame({
-        "Manager": managers,
-        "Total des Ventes": [data['total_sales_per_manager'][manager] for manager in managers],
-        "Revenu Total (€)": [data['total_revenue_per_manager'][manager] for manager in managers],
-        "Revenu Moyen (€)": [data['avg_revenue_per_manager'].get(manager, 0) for manager in managers],
-        "Ratio Ventes conclues  (%)": [data['won_ratio_per_manager'].get(manager, 0) for manager in managers],
-        "Ratio Perdues (%)": [data['lost_ratio_per_manager'].get(manager, 0) for manager in managers],
-    })
+    # Préparation des données (seule la vue choisie est envoyée au graphique)
+    manager_data = team_chart_view(aggregations.team_frame(data.managers, "Manager"), "Manager", key="manager")
 
     # Graphiques
-    st.plotly_chart(
-        px.bar(
-            manager_data, x='Manager', y=['Total des Ventes', 'Revenu Total (€)'],
-            title="Comparaison des Performances des Managers",
-            labels={"value": "Valeur", "variable": "Critère"},
-            barmode='group', template='plotly_white',
-            color_discrete_sequence=["#1f77b4", "#ff7f0e"]
-        ),
-        use_container_width=True
-    )
+    plotly_chart(figures.manager_volume(manager_data), use_container_width=True)
+    plotly_chart(figures.manager_ratios(manager_data), use_container_width=True)
 
-    st.plotly_chart(
-        px.bar(
-            manager_data, x='Manager', y=['Ratio Ventes conclues  (%)', 'Ratio Perdues (%)'],
-            title="Ratios de Ventes conclues  et Perdues par Manager",
-            labels={"value": "Ratio (%)", "variable": "Statut"},
-            barmode='stack', template='plotly_white',
-            color_discrete_sequence=["#2ca02c", "#d62728"]
-        ),
-        use_container_width=True
-    )
+# Classement paginé côté serveur : seules les lignes de la page sont envoyées à AgGrid
+def leaderboard_table(people, label, key):
+    col1, col2, col3 = st.columns(3)
+    name_filter = col1.text_input(f"Filtrer les {label.lower()}s", key=f"{key}_filter")
+    sort_by = col2.selectbox("Classer par", list(ranking.METRICS), format_func=aggregations.DISPLAY_COLUMNS.get,
+                             key=f"{key}_rank_by")
+
+    positions = ranking.matching(people, name_filter)
+    pages = aggregations.page_count(positions, aggregations.PAGE_SIZE_DEFAULT)
+    page = col3.number_input(f"Page (sur {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    rows = ranking.leaderboard_page(people, positions, label, sort_by, int(page), aggregations.PAGE_SIZE_DEFAULT)
+    st.caption(f"{len(positions)} {label.lower()}(s) sur {len(people)}")
+
+    # Tri et filtre désactivés dans la grille : ils sont faits côté serveur sur tout l'effectif
+    builder = GridOptionsBuilder.from_dataframe(rows)
+    builder.configure_default_column(sortable=False, filter=False, resizable=True)
+    builder.configure_column(label, pinned="left")
+    builder.configure_grid_options(rowBuffer=10, suppressColumnVirtualisation=False)
+    AgGrid(rows, gridOptions=builder.build(), height=min(600, 60 + 35 * len(rows)),
+           fit_columns_on_grid_load=False, key=f"{key}_grid")
+
+@perf.timed
+def display_leaderboard(data):
+    """Affiche le classement des agents et des managers sur tous les indicateurs"""
+    st.header("🏅 Classement des Agents et Managers")
+    agents, managers = st.tabs(["Agents", "Managers"])
+    with agents:
+        leaderboard_table(data.agents, "Agent", key="agent_board")
+    with managers:
+        leaderboard_table(data.managers, "Manager", key="manager_board")
 
 
 
 
 # Fonction pour générer des recommandations basées sur les performances globales
+@perf.timed
 def display_global_recommendations(data):
     st.title("🔍 **Recommandations Globales pour Améliorer les Performances**")
     st.markdown("---")  # Ligne de séparation
 
-    # Calculer les métriques globales
-    avg_agent_revenue = data['total_revenue_per_agent']
-    avg_manager_revenue = data['total_revenue_per_manager']
-    
-    avg_agent_revenue = sum(avg_agent_revenue.values()) / len(avg_agent_revenue) if avg_agent_revenue else 0
-    avg_manager_revenue = sum(avg_manager_revenue.values()) / len(avg_manager_revenue) if avg_manager_revenue else 0
-
-    # Liste des recommandations
-    recommendations = []
-
-    if avg_agent_revenue < 1000:
-        recommendations.append(("🚀", "Les agents peuvent bénéficier de **formations supplémentaires** pour améliorer leurs performances de vente."))
-    else:
-        recommendations.append(("🌟", "Les agents sont déjà performants. Encouragez-les à **partager leurs bonnes pratiques** avec leurs collègues."))
-
-    if avg_manager_revenue < 2000:
-        recommendations.append(("📈", "Les managers doivent peut-être **revoir leur stratégie** de gestion d'équipe et de coaching."))
-    else:
-        recommendations.append(("🏆", "Les managers ont une bonne gestion. Encouragez-les à **optimiser encore plus** les performances de leurs équipes."))
-
-    # Affichage des recommandations avec mise en forme
-    for icon, rec in recommendations:
-        st.markdown(f"### {icon} {rec}")
-        st.markdown("---")  # Ligne de séparation entre les recommandations
+    # Paliers des revenus moyens des agents et des managers : règles de dashboard.alerts
+    for row in alerts.assess({alerts.GLOBAL: alerts.global_frame(team_kpis=data)}).itertuples():
+        ui.recommendation(row.severity, f"{row.message} ({alerts.METRIC_LABELS[row.metric]} : {row.value:,.2f})")
 
-# Fonction principale
+# Fonction principale, rejouée seule toutes les AUTO_REFRESH_SECONDS secondes si configuré
+# (chaque rendu dispose d'un budget de temps limité)
+@perf.fragment(run_every=AUTO_REFRESH_SECONDS)
+@resilience.render_budget()
 def main():
     # Charger les données
     data = fetch_kpis()
 
     if data:
+        ui.data_freshness(data)
+        live.watch(("getAllTeamsKpis",))
         # Afficher les KPIs
         display_kpis(data)
         # Afficher les performances des agents et des managers
-        display_agent_performance(data)
-        display_manager_performance(data)
+        # (changer de vue ne rejoue que la section concernée)
+        perf.fragment(display_agent_performance)(data)
+        perf.fragment(display_manager_performance)(data)
+        perf.fragment(display_leaderboard)(data)
         # Afficher les recommandations
         display_global_recommendations(data)
 
 # Exécution de la fonction principale
 if __name__ == "__main__":
     main()
+    perf.render_panel()
@@ -0,0 +1,123 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import alerts
+from dashboard.alerts import AGENT, ERROR, GLOBAL, INFO, MANAGER, OK, PRODUCT, WARNING, Rule
+
+
+def products_kpis(engagement_rate, won, lost):
+    return types.SimpleNamespace(engagement_rate=engagement_rate, total_sales_won=won, total_sales_lost=lost)
+
+
+def team(agent_revenue, manager_revenue):
+    agents = pd.DataFrame({"revenue": agent_revenue, "won_ratio": [40.0, 80.0][:len(agent_revenue)],
+                           "lost_ratio": [35.0, 10.0][:len(agent_revenue)]},
+                          index=pd.Index(["Alice", "Bob"][:len(agent_revenue)], name="agent"))
+    managers = pd.DataFrame({"revenue": manager_revenue, "won_ratio": [90.0], "lost_ratio": [5.0]},
+                            index=pd.Index(["Marc"], name="manager"))
+    return types.SimpleNamespace(agents=agents, managers=managers)
+
+
+@pytest.fixture
+def tables():
+    products = pd.DataFrame({
+        "engagement_rate": [40.0, 80.0],
+        "resignation_rate": [25.0, 5.0],
+        "lost_ratio": [0.5, np.nan],
+    }, index=pd.Index(["TV", "Casque"], name=PRODUCT))
+    return alerts.frames(products_kpis(0.2, 6, 4), team([500.0, 700.0], [3000.0])) | {PRODUCT: products}
+
+
+def test_evaluate_keeps_most_severe_tier(tables):
+    found = alerts.evaluate(tables)
+    engagement = found[(found["scope"] == GLOBAL) & (found["metric"] == "engagement_rate")]
+    assert engagement["severity"].tolist() == [ERROR]
+    assert engagement["value"].tolist() == [0.2]
+
+
+def test_evaluate_every_row_and_order(tables):
+    found = alerts.evaluate(tables)
+    rows = list(zip(found["scope"], found["name"], found["metric"]))
+    assert rows == [
+        (GLOBAL, alerts.GLOBAL_NAME, "engagement_rate"),
+        (GLOBAL, alerts.GLOBAL_NAME, "avg_agent_revenue"),
+        (PRODUCT, "TV", "engagement_rate"),
+        (PRODUCT, "TV", "resignation_rate"),
+        (PRODUCT, "TV", "lost_ratio"),
+        (AGENT, "Alice", "won_ratio"),
+        (AGENT, "Alice", "lost_ratio"),
+    ]
+    assert set(found["severity"]) <= set(alerts.SEVERITIES)
+
+
+def test_evaluate_without_hits():
+    found = alerts.evaluate({GLOBAL: alerts.global_frame(products_kpis(0.9, 9, 1))})
+    assert found.empty
+    assert list(found.columns) == list(alerts.DISPLAY_COLUMNS)
+
+
+def test_evaluate_custom_rules():
+    table = pd.DataFrame({"won_ratio": [10.0, 60.0, 30.0]}, index=pd.Index(["A", "B", "C"]))
+    rules = (Rule(MANAGER, "won_ratio", "<=", 30, WARNING, "bas"),)
+    found = alerts.evaluate({MANAGER: table}, rules)
+    assert found["name"].tolist() == ["A", "C"]
+    assert found["threshold"].tolist() == [30.0, 30.0]
+
+
+def test_assess_gives_one_tier_per_metric(tables):
+    tiers = alerts.assess(tables).set_index("metric")
+    assert list(tiers.index) == [metric for _, metric in alerts.OK_MESSAGES]
+    assert tiers.loc["engagement_rate", "severity"] == ERROR
+    assert tiers.loc["win_rate", "severity"] == INFO
+    assert tiers.loc["avg_agent_revenue", "severity"] == WARNING
+    assert tiers.loc["avg_manager_revenue", "severity"] == OK
+    assert tiers.loc["avg_manager_revenue", "message"] == alerts.OK_MESSAGES[(GLOBAL, "avg_manager_revenue")]
+
+
+def test_assess_skips_missing_values():
+    tables = {GLOBAL: alerts.global_frame(products_kpis(0.9, 0, 0))}
+    tiers = alerts.assess(tables)
+    assert tiers["metric"].tolist() == ["engagement_rate"]
+    assert tiers["severity"].tolist() == [OK]
+
+
+def test_summary_counts_every_combination(tables):
+    counts = alerts.summary(alerts.evaluate(tables))
+    assert counts.loc[PRODUCT, WARNING] == 3
+    assert counts.loc[GLOBAL, ERROR] == 1
+    assert counts.loc[MANAGER, WARNING] == 0
+
+
+def product(name, engagement_rate, resignation_rate=5.0, lost=0, deals=10):
+    return types.SimpleNamespace(product_name=name, engagement_rate=engagement_rate,
+                                 resignation_rate=resignation_rate, total_sales_lost=lost, total_deals=deals)
+
+
+def test_product_metrics_frame_matches_product_frame():
+    kpis = [product("TV", 40.0, 25.0, 5, 10), product("Casque", 80.0, 5.0, 0, 0)]
+    metrics = alerts.ProductMetrics()
+    for item in kpis:
+        metrics.update(item)
+
+    table = metrics.frame(["Casque", "TV", "Inconnu"])
+    pd.testing.assert_frame_equal(table, alerts.product_frame(kpis[::-1]))
+    assert len(alerts.ProductMetrics().frame(["TV"])) == 0
+
+
+def test_scan_covers_whole_catalog(monkeypatch):
+    names = [f"Produit {i:05d}" for i in range(1000)]
+    monkeypatch.setattr(alerts, "product_metrics", alerts.ProductMetrics())
+    monkeypatch.setattr(alerts.loaders, "fetch_product_kpis",
+                        lambda name: product(name, 10.0 if name.endswith("7") else 90.0))
+    scanner = alerts.Prefetcher(max_workers=4, top_n=0)
+    scanner.warm(names, alerts.scan_product)
+    scanner._executor.shutdown(wait=True)
+
+    found = alerts.evaluate(alerts.frames(product_table=alerts.product_metrics.frame(names)))
+    assert len(alerts.product_metrics) == len(names)
+    # Le parcours des alertes n'a pas la limite du préchargement
+    assert alerts.product_scanner.size() is None
+    assert found["name"].tolist() == [name for name in names if name.endswith("7")]
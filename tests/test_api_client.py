@@ -0,0 +1,136 @@
+import types
+
+import httpx
+import pytest
+
+from dashboard import api_client, resilience
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Client partagé branché sur un faux serveur : ``backend.replies`` est
+    consommée dans l'ordre (statut ou exception), ``backend.requests`` enregistre les appels."""
+    state = types.SimpleNamespace(replies=[], requests=[])
+
+    def handler(request):
+        state.requests.append(request)
+        reply = state.replies.pop(0) if state.replies else 200
+        if isinstance(reply, Exception):
+            raise reply
+        if isinstance(reply, httpx.Response):
+            return reply
+        return httpx.Response(reply, json={"total": 1})
+
+    monkeypatch.setattr(api_client, "API_URL", "http://api.test/")
+    monkeypatch.setattr(api_client, "BACKOFF_BASE", 0)
+    monkeypatch.setattr(api_client, "_client", httpx.Client(transport=httpx.MockTransport(handler)))
+    return state
+
+
+def get(path):
+    response, body, size, digest = api_client._get(path)
+    with body:
+        return response.status_code, body.read()
+
+
+@pytest.mark.parametrize("status", sorted(api_client.RETRYABLE_STATUSES))
+def test_transient_statuses_are_retried(backend, status):
+    backend.replies = [status, status]
+    assert get("retryStatus") == (200, b'{"total":1}')
+    assert len(backend.requests) == 3
+
+
+def test_transport_errors_are_retried(backend):
+    backend.replies = [httpx.ConnectError("refusé"), httpx.ReadTimeout("lent")]
+    assert get("retryTransport")[0] == 200
+    assert len(backend.requests) == 3
+
+
+def test_retries_are_bounded(backend):
+    backend.replies = [503] * (api_client.MAX_RETRIES + 2)
+    with pytest.raises(httpx.HTTPStatusError):
+        get("retryBounded")
+    assert len(backend.requests) == api_client.MAX_RETRIES + 1
+
+
+def test_client_errors_are_not_retried(backend):
+    backend.replies = [404]
+    with pytest.raises(httpx.HTTPStatusError):
+        get("retryNotFound")
+    assert len(backend.requests) == 1
+    assert resilience.breaker_for("retryNotFound").failures == 0
+
+
+def test_path_params_are_encoded(backend):
+    api_client._get("getProductKpis", "Écran 4K/HDR")[1].close()
+    assert backend.requests[0].url.raw_path == b"/getProductKpis/%C3%89cran%204K%2FHDR"
+
+
+def failing(error):
+    def get_with_retries(url, endpoint, headers, deadline):
+        raise error
+    return get_with_retries
+
+
+def test_render_deadline_is_not_an_endpoint_failure(monkeypatch):
+    monkeypatch.setattr(api_client, "_get_with_retries", failing(resilience.DeadlineExceeded("budget")))
+    breaker = resilience.breaker_for("testDeadline")
+    for _ in range(breaker.threshold + 1):
+        with pytest.raises(resilience.DeadlineExceeded):
+            api_client._get("testDeadline")
+    assert breaker.state == resilience.CLOSED
+    assert breaker.failures == 0
+
+
+def test_cancelled_probe_lets_another_probe_through(monkeypatch):
+    breaker = resilience.breaker_for("testProbe")
+    breaker.reset_after = 0
+    for _ in range(breaker.threshold):
+        breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+
+    monkeypatch.setattr(api_client, "_get_with_retries", failing(resilience.DeadlineExceeded("budget")))
+    with pytest.raises(resilience.DeadlineExceeded):
+        api_client._get("testProbe")
+    assert breaker.state == resilience.HALF_OPEN
+    # L'appel de test abandonné n'a pas bloqué le suivant
+    monkeypatch.setattr(api_client, "_get_with_retries", failing(httpx.ConnectError("refusé")))
+    with pytest.raises(httpx.ConnectError):
+        api_client._get("testProbe")
+    assert breaker.state == resilience.OPEN
+
+
+def test_network_errors_open_the_breaker(monkeypatch):
+    monkeypatch.setattr(api_client, "_get_with_retries", failing(httpx.ConnectError("refusé")))
+    breaker = resilience.breaker_for("testNetwork")
+    for _ in range(breaker.threshold):
+        with pytest.raises(httpx.ConnectError):
+            api_client._get("testNetwork")
+    assert breaker.state == resilience.OPEN
+    with pytest.raises(resilience.CircuitOpenError):
+        api_client._get("testNetwork")
+
+
+def test_conditional_get_sends_validators_and_reads_304(backend):
+    backend.replies = [httpx.Response(200, json={"total": 1}, headers={"ETag": '"v1"', "Last-Modified": "lundi"}),
+                       304]
+    data, validators = api_client.get_json_conditional("conditional304")
+    assert data == {"total": 1}
+    assert validators["etag"] == '"v1"'
+
+    data, unchanged = api_client.get_json_conditional("conditional304", validators=validators)
+    assert data is api_client.NOT_MODIFIED
+    assert unchanged == validators
+    assert backend.requests[1].headers["If-None-Match"] == '"v1"'
+    assert backend.requests[1].headers["If-Modified-Since"] == "lundi"
+
+
+def test_conditional_get_compares_digests_without_validators(backend):
+    backend.replies = [200, 200, httpx.Response(200, json={"total": 2})]
+    data, validators = api_client.get_json_conditional("conditionalDigest")
+    assert "If-None-Match" not in backend.requests[0].headers
+
+    same, validators = api_client.get_json_conditional("conditionalDigest", validators=validators)
+    changed, _ = api_client.get_json_conditional("conditionalDigest", validators=validators)
+    assert same is api_client.NOT_MODIFIED
+    assert changed == {"total": 2}
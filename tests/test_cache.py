@@ -0,0 +1,158 @@
+import types
+
+import pytest
+
+from dashboard import cache as cache_module
+from dashboard.cache import KpiCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge du cache avancée à la main (``clock.now``)."""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def cache():
+    cache = KpiCache(max_entries=3, ttls={"a": 10, "b": 10}, default_ttl=10)
+    yield cache
+    cache._refresher.shutdown(wait=True)
+
+
+def settle(cache):
+    """Attend la fin des rafraîchissements d'arrière-plan."""
+    cache._refresher.shutdown(wait=True)
+
+
+def never():
+    raise AssertionError("appel inattendu à l'API")
+
+
+def test_evicts_least_recently_used(cache):
+    evicted = []
+    cache.on_evict(evicted.append)
+    for key in [("a", 1), ("a", 2), ("a", 3)]:
+        cache.put(key, key[1])
+    cache.get(("a", 1), never)
+
+    cache.put(("a", 4), 4)
+    cache.put(("a", 5), 5)
+
+    assert evicted == [("a", 2), ("a", 3)]
+    assert list(cache._entries) == [("a", 1), ("a", 4), ("a", 5)]
+
+
+def test_ttl_per_endpoint():
+    cache = KpiCache(ttls={"a": 5}, default_ttl=60)
+    assert cache.ttl_for(("a", "x")) == 5
+    assert cache.ttl_for(("z",)) == 60
+
+
+def test_missing_entry_blocks_on_fetch(cache):
+    assert cache.get(("a", 1), lambda: "v1") == "v1"
+    assert cache.get(("a", 1), never) == "v1"
+
+
+def test_expired_entry_is_served_then_refreshed(cache, clock):
+    calls = []
+
+    def fetch():
+        calls.append(clock.now)
+        return "v2"
+
+    cache.put(("a", 1), "v1")
+    assert cache.is_fresh(("a", 1))
+    clock.now += 11
+    assert not cache.is_fresh(("a", 1))
+
+    # Valeur expirée servie aussitôt ; un seul rafraîchissement lancé
+    assert cache.get(("a", 1), fetch) == "v1"
+    cache.get(("a", 1), fetch)
+    settle(cache)
+
+    assert calls == [clock.now]
+    assert cache.peek(("a", 1)) == "v2"
+    assert cache.is_fresh(("a", 1))
+
+
+def test_failed_refresh_keeps_stale_value(cache, clock):
+    def broken():
+        raise OSError("API indisponible")
+
+    cache.put(("a", 1), "v1")
+    clock.now += 11
+    assert cache.get(("a", 1), broken) == "v1"
+    settle(cache)
+
+    assert cache.peek(("a", 1)) == "v1"
+    assert not cache._entries[("a", 1)].refreshing
+
+
+def test_fallback_is_served_stale_and_refreshed(cache):
+    assert cache.get(("a", 1), lambda: "api", fallback=lambda key: "copie") == "copie"
+    settle(cache)
+    assert cache.peek(("a", 1)) == "api"
+
+
+def test_empty_fallback_falls_through_to_fetch(cache):
+    assert cache.get(("a", 1), lambda: "api", fallback=lambda key: None) == "api"
+
+
+def test_invalidate_marks_until_next_value(cache):
+    forgotten = []
+    cache.on_evict(forgotten.append)
+    cache.put(("a", 1), 1)
+    cache.put(("b", 1), 1)
+
+    cache.invalidate("a")
+    assert forgotten == [("a", 1)]
+    assert cache.peek(("a", 1)) is None
+    assert cache.invalidated(("a", 1))
+    assert not cache.invalidated(("b", 1))
+
+    cache.put(("a", 1), 2)
+    assert not cache.invalidated(("a", 1))
+
+    cache.invalidate()
+    assert len(cache) == 0
+    assert cache.invalidated(("a", 1)) and cache.invalidated(("b", 1))
+    cache.revalidate(("b", 1))
+    assert not cache.invalidated(("b", 1))
+
+
+def test_prefill_only_replaces_same_endpoint(cache):
+    evicted = []
+    cache.on_evict(evicted.append)
+    cache.put(("b", 1), 1)
+    cache.put(("b", 2), 2)
+    cache.put(("a", 1), 1)
+
+    assert cache.prefill(("a", 2), 2)
+    assert evicted == [("a", 1)]
+    assert cache.peek(("b", 1)) == 1 and cache.peek(("b", 2)) == 2
+
+    cache.invalidate("a")
+    cache.put(("b", 3), 3)
+    assert not cache.prefill(("a", 3), 3)
+    assert cache.peek(("a", 3)) is None
+
+
+def test_failing_evict_listener_does_not_break_put(cache):
+    def broken(key):
+        raise RuntimeError("boom")
+
+    cache.on_evict(broken)
+    for i in range(5):
+        cache.put(("a", i), i)
+    assert len(cache) == 3
+
+
+def test_load_later_runs_once(cache):
+    calls = []
+    cache.load_later(("a", 1), lambda: calls.append(1) or "v")
+    cache.load_later(("a", 1), lambda: calls.append(2) or "v")
+    settle(cache)
+    assert cache.peek(("a", 1)) == "v"
+    assert calls == [1]
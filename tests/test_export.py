@@ -0,0 +1,79 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks import payloads
+from benchmarks.fake_backend import FakeBackend
+from dashboard import export
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRODUCTS = 5
+
+
+@pytest.fixture
+def backend():
+    with FakeBackend(payloads.Scale.from_size(20)) as backend:
+        yield backend
+
+
+def run_export(backend, tmp_path, *args, returncode=0):
+    """Lance ``python -m dashboard.export`` dans un processus neuf, comme une tâche planifiée."""
+    env = {**os.environ, "API_URL": backend.url, "SNAPSHOT_DIR": str(tmp_path / "snapshots"),
+           "SHARED_FRAMES_DIR": "", "EXPORT_WORKERS": "1"}
+    result = subprocess.run([sys.executable, "-m", "dashboard.export", "--output", str(tmp_path / "exports"),
+                             "--products", str(PRODUCTS), *args],
+                            cwd=ROOT, env=env, capture_output=True, text=True, timeout=300)
+    assert result.returncode == returncode, result.stderr
+    return result
+
+
+def summary(result):
+    """``(rendues, inchangées, en échec)`` d'après la dernière ligne de sortie."""
+    return tuple(int(number) for number in re.findall(r"(\d+) (?:vue|inchang|en échec)", result.stdout))
+
+
+def manifest(tmp_path):
+    return json.loads((tmp_path / "exports" / export.MANIFEST).read_text(encoding="utf-8"))
+
+
+def test_each_run_fetches_each_view_once(backend, tmp_path):
+    expected = {"getAllProductsKpis": 1, "getAllTeamsKpis": 1, "getAllProducts": 1, "getProductKpis": PRODUCTS}
+    for _ in range(2):
+        backend.reset()
+        result = run_export(backend, tmp_path)
+        assert backend.counts()[0] == expected
+        assert "after shutdown" not in result.stderr
+
+
+def test_unchanged_views_are_skipped_unless_forced(backend, tmp_path):
+    views = 2 + PRODUCTS
+    assert summary(run_export(backend, tmp_path)) == (views, 0, 0)
+    first = manifest(tmp_path)
+    assert len(first) == views
+
+    assert summary(run_export(backend, tmp_path)) == (0, views, 0)
+    assert summary(run_export(backend, tmp_path, "--force")) == (views, 0, 0)
+    assert manifest(tmp_path) == first
+
+
+def test_failed_views_keep_their_previous_export(backend, tmp_path):
+    run_export(backend, tmp_path)
+    first = manifest(tmp_path)
+
+    backend.error_rate = 1.0
+    # Vues globale et équipe en échec ; sans catalogue, aucun produit n'est tenté
+    assert summary(run_export(backend, tmp_path, returncode=1)) == (0, 0, 2)
+    assert manifest(tmp_path) == first
+    assert all((tmp_path / "exports" / relative).exists() for relative in first)
+
+
+def test_product_file_names_are_safe_and_unique():
+    names = ["Écran 4K/HDR", "Écran 4K HDR", "../../etc", "★"]
+    paths = [export.view_path(("produit", name)) for name in names]
+    assert len(set(paths)) == len(names)
+    assert all(re.fullmatch(rf"{export.PRODUCTS_DIR}/[A-Za-z0-9_-]+\.html", path) for path in paths)
+    assert export.view_path(export.GLOBAL_VIEW) == "global.html"
@@ -0,0 +1,150 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+
+from benchmarks import payloads
+from dashboard import aggregations, charts, figures, models, timeseries
+
+
+def decoded(value):
+    """Valeurs telles que le navigateur les lit (tableaux typés ``bdata`` compris)."""
+    if isinstance(value, dict) and "bdata" in value:
+        return np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+    return np.asarray(value)
+
+
+def sent(fig):
+    """Traces du JSON envoyé au navigateur pour ``fig``."""
+    return json.loads(pio.to_json(fig, validate=False))["data"]
+
+
+def assert_same_values(received, expected, decimals=figures.CHART_DECIMALS):
+    received, expected = decoded(received), decoded(expected)
+    if expected.dtype.kind in "iuf":
+        # Arrondi à ``decimals`` décimales, puis précision de float32
+        tolerance = 0.5 * 10 ** -decimals + np.abs(expected) * 1e-7
+        assert np.all(np.abs(received.astype("float64") - expected) <= tolerance)
+    else:
+        assert received.tolist() == expected.tolist()
+
+
+@pytest.fixture(scope="module")
+def data():
+    scale = payloads.Scale.from_size(300)
+    return (models.ProductsKpis.from_payload(payloads.all_products_kpis(scale)),
+            models.TeamKpis.from_payload(payloads.all_teams_kpis(scale)))
+
+
+def page_figures(data):
+    products, team = data
+    agents = aggregations.team_frame(team.agents, "Agent")
+    return [
+        figures.revenue_per_month(products.months),
+        figures.month_trend(timeseries.enrich(products.months), "revenue", "Revenu"),
+        figures.revenue_per_sector(products.sectors),
+        figures.sales_breakdown(10, 20, 30, 40),
+        figures.agent_volume(agents),
+        figures.agent_ratios(agents),
+    ]
+
+
+def test_compact_round_trips_to_the_same_data(data):
+    for fig in page_figures(data):
+        original, compacted = sent(fig), sent(figures.compact(fig))
+        assert len(compacted) == len(original)
+        for before, after in zip(original, compacted):
+            assert after["type"] == before["type"]
+            for key in ("x", "y", "values", "labels"):
+                if key in before:
+                    assert_same_values(after[key], before[key])
+
+
+def test_compact_keeps_layout(data):
+    fig = page_figures(data)[1]
+    assert figures.compact(fig).layout == fig.layout
+
+
+def test_compact_shrinks_large_figures():
+    # Seules les figures de plus de CHART_COMPACT_BYTES sont compactées (voir ``dashboard.charts``)
+    team = models.TeamKpis.from_payload(payloads.all_teams_kpis(payloads.Scale.from_size(3000)))
+    fig = figures.agent_volume(aggregations.team_frame(team.agents, "Agent"))
+    size = len(pio.to_json(fig, validate=False))
+    assert size > charts.CHART_COMPACT_BYTES
+    assert len(pio.to_json(figures.compact(fig), validate=False)) < size
+
+
+def test_merged_bars_keep_every_point_and_color():
+    frame = pd.DataFrame({"Secteur": ["A", "B", "C"], "Revenu": [1.0, 2.5, 3.25]})
+    fig = px.bar(frame, x="Secteur", y="Revenu", color="Secteur")
+    original = sent(fig)
+    (merged,) = sent(figures.compact(fig))
+
+    assert decoded(merged["x"]).tolist() == [x for trace in original for x in decoded(trace["x"]).tolist()]
+    assert_same_values(merged["y"], np.concatenate([decoded(trace["y"]) for trace in original]))
+    assert merged["marker"]["color"] == [trace["marker"]["color"] for trace in original]
+
+
+def test_unused_customdata_is_dropped():
+    frame = pd.DataFrame({"x": ["a", "b"], "y": [1, 2], "extra": [3, 4]})
+    unused = px.bar(frame, x="x", y="y", custom_data=["extra"])
+    unused.update_traces(hovertemplate="%{y}")
+    used = px.bar(frame, x="x", y="y", custom_data=["extra"])
+    used.update_traces(hovertemplate="%{customdata[0]}")
+
+    assert "customdata" not in sent(figures.compact(unused))[0]
+    assert "customdata" in sent(figures.compact(used))[0]
+
+
+def test_payload_hash_follows_the_data():
+    frame = pd.DataFrame({"revenue": [1.0, 2.0]}, index=pd.Index(["A", "B"], name="Secteur"))
+    assert figures.payload_hash(frame, 3) == figures.payload_hash(frame.copy(), 3)
+    assert figures.payload_hash(frame, 3) != figures.payload_hash(frame, 4)
+    assert figures.payload_hash(frame) != figures.payload_hash(frame.rename(index={"B": "C"}))
+    assert figures.payload_hash(frame) != figures.payload_hash(frame.rename(columns={"revenue": "sales"}))
+
+
+def test_memoize_rebuilds_only_when_data_changes():
+    cache = figures.FigureCache()
+    built = []
+
+    @cache.memoize
+    def chart(frame, title=""):
+        built.append(title)
+        return px.bar(frame, x="x", y="y", title=title)
+
+    frame = pd.DataFrame({"x": ["a", "b"], "y": [1, 2]})
+    first = chart(frame, title="A")
+    assert chart(frame.copy(), title="A") is first
+    assert chart(frame, title="B") is not first
+    assert chart(frame.assign(y=[1, 3]), title="A") is not first
+    assert built == ["A", "B", "A"]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_cache_is_bounded_and_forgets_evicted_figures():
+    cache = figures.FigureCache(max_entries=2)
+    first = cache.get(("a", "1"), go.Figure)
+    assert cache.json_for(first) is cache.json_for(first)
+    cache.get(("b", "1"), go.Figure)
+    cache.get(("c", "1"), go.Figure)
+
+    assert len(cache._entries) == 2
+    assert cache.get(("a", "1"), go.Figure) is not first
+    # JSON d'une figure évincée : recalculé, sans être conservé
+    assert cache.json_for(first) is not cache.json_for(first)
+
+
+def test_compact_and_json_computed_once_for_cached_figures(data):
+    products, _ = data
+    fig = figures.revenue_per_sector(products.sectors)
+    assert figures.revenue_per_sector(products.sectors) is fig
+    compacted = figures.compact_figure(fig)
+    assert figures.compact_figure(fig) is compacted
+    assert figures.figure_json(compacted) is figures.figure_json(compacted)
+    assert figures.figure_json(fig) == pio.to_json(fig, validate=False)
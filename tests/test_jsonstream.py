@@ -0,0 +1,62 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks import payloads
+from dashboard import jsonstream, models
+
+
+def body(payload):
+    raw = json.dumps(payload).encode("utf-8")
+    return io.BytesIO(raw), len(raw)
+
+
+@pytest.fixture
+def stream_all(monkeypatch):
+    """Toute réponse est lue en flux, quelle que soit sa taille."""
+    monkeypatch.setattr(jsonstream, "STREAM_MIN_BYTES", 0)
+
+
+def test_small_body_is_decoded_in_one_go():
+    data = jsonstream.load(*body({"revenue_by_agent": {"Alice": 3, "Bob": 5}, "total": 8}))
+    assert data == {"revenue_by_agent": {"Alice": 3, "Bob": 5}, "total": 8}
+
+
+def test_stream_converts_name_number_dicts(stream_all):
+    data = jsonstream.load(*body({
+        "revenue_by_agent": {"Alice": 3, "Bob": 5},
+        "sales_by_agent": {"Alice": 1, "Bob": 2},
+        "regions": {"Europe": "EU"},
+        "total": 8,
+        "months": ["2024-01", "2024-02"],
+    }))
+    assert data["revenue_by_agent"].tolist() == [3.0, 5.0]
+    assert data["revenue_by_agent"].dtype == "float64"
+    # Les séries d'un même rôle partagent un seul index
+    assert data["sales_by_agent"].index is data["revenue_by_agent"].index
+    assert data["regions"] == {"Europe": "EU"}
+    assert data["total"] == 8
+    assert data["months"] == ["2024-01", "2024-02"]
+
+
+def test_stream_falls_back_for_non_objects(stream_all):
+    assert jsonstream.load(*body(["Produit 1", "Produit 2"])) == ["Produit 1", "Produit 2"]
+
+
+def test_json_fallback_without_orjson(monkeypatch):
+    monkeypatch.setattr(jsonstream, "orjson", None)
+    assert jsonstream.load(*body({"total": 1.5})) == {"total": 1.5}
+
+
+def test_stream_and_one_go_parse_to_the_same_model(monkeypatch):
+    payload = payloads.all_products_kpis(payloads.Scale.from_size(50))
+    whole = models.ProductsKpis.from_payload(jsonstream.load(*body(payload)))
+    monkeypatch.setattr(jsonstream, "STREAM_MIN_BYTES", 0)
+    streamed = models.ProductsKpis.from_payload(jsonstream.load(*body(payload)))
+
+    for field in ("total_revenue", "engagement_rate", "total_sales_won", "total_sales_lost"):
+        assert getattr(streamed, field) == pytest.approx(getattr(whole, field))
+    for field in ("sectors", "months"):
+        pd.testing.assert_frame_equal(getattr(streamed, field), getattr(whole, field), check_dtype=False)
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from dashboard import live, loaders
+
+KEY = ("getAllTeamsKpis",)
+
+
+def watched_section():
+    import streamlit as st
+
+    from dashboard import live
+
+    st.session_state["page_runs"] = st.session_state.get("page_runs", 0) + 1
+
+    @st.fragment
+    def section():
+        st.session_state["section_runs"] = st.session_state.get("section_runs", 0) + 1
+        live.watch(("getAllTeamsKpis",))
+        st.write("Équipes")
+
+    section()
+
+
+@pytest.fixture
+def live_mode(monkeypatch):
+    monkeypatch.setattr(live, "LIVE_REFRESH_SECONDS", 60)
+    monkeypatch.setattr(live, "live_poller", live.LivePoller(3600))
+
+
+def test_changed_data_reruns_only_the_watching_fragment(live_mode, monkeypatch):
+    # Nouvelle version reçue entre l'affichage de la section et la vérification
+    versions = iter([1])
+    monkeypatch.setattr(loaders, "version", lambda key: next(versions, 2))
+    at = AppTest.from_function(watched_section).run()
+
+    assert not at.exception
+    assert at.session_state["page_runs"] == 1
+    assert at.session_state["section_runs"] == 2
+    assert at.markdown[0].value == "Équipes"
+
+
+def test_unchanged_data_reruns_nothing(live_mode, monkeypatch):
+    monkeypatch.setattr(loaders, "version", lambda key: 7)
+    at = AppTest.from_function(watched_section).run()
+
+    assert not at.exception
+    assert at.session_state["section_runs"] == 1
+    assert live.live_poller.tracked() == [KEY]
+
+
+def test_poller_refreshes_tracked_keys_and_forgets_idle_ones(monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(loaders, "refresh", lambda key, max_age: refreshed.append((key, max_age)))
+    poller = live.LivePoller(0.01)
+    poller.track([KEY])
+
+    deadline = time.monotonic() + 5
+    while poller.tracked() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert poller.tracked() == []
+    assert refreshed and set(refreshed) == {(KEY, 0.01)}
@@ -0,0 +1,70 @@
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dashboard import loaders, perf
+from dashboard.singleflight import SingleFlight
+
+
+@pytest.fixture
+def joined(monkeypatch):
+    """Événement levé quand un appelant rejoint un appel déjà en cours."""
+    event = threading.Event()
+    wait = SingleFlight._wait
+
+    def joining(name, future, coalesced):
+        if coalesced:
+            event.set()
+        return wait(name, future, coalesced)
+
+    monkeypatch.setattr(SingleFlight, "_wait", staticmethod(joining))
+    return event
+
+
+@pytest.fixture
+def blocked(monkeypatch):
+    """``_fetch_once`` bloqué jusqu'à ``release`` ; ``calls`` reçoit le ``max_age`` de chaque appel."""
+    state = types.SimpleNamespace(started=threading.Event(), release=threading.Event(), calls=[])
+
+    def fetch_once(key, max_age=None):
+        state.calls.append(max_age)
+        state.started.set()
+        assert state.release.wait(5)
+        return "kpis"
+
+    monkeypatch.setattr(loaders, "_fetch_once", fetch_once)
+    return state
+
+
+def shared_fetch(blocked, joined, key, *second):
+    """Lance ``_fetch(key)``, puis ``_fetch(key, *second)`` pendant le premier appel."""
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(loaders._fetch, key)
+        assert blocked.started.wait(5)
+        other = pool.submit(loaders._fetch, key, *second)
+        assert joined.wait(5)
+        blocked.release.set()
+        return first.result(5), other.result(5)
+
+
+def test_coalesced_metric_is_labelled_by_endpoint(blocked, joined):
+    assert shared_fetch(blocked, joined, ("getProductKpis", "Produit 00017")) == ("kpis", "kpis")
+
+    metrics = perf.to_prometheus()
+    assert 'dashboard_upstream_coalesced_total{endpoint="getProductKpis"}' in metrics
+    assert "Produit 00017" not in metrics
+
+
+def test_forced_fetch_joins_background_fetch(blocked, joined):
+    assert shared_fetch(blocked, joined, ("getProductKpis", "Produit 00001"), 0) == ("kpis", "kpis")
+    assert blocked.calls == [None]
+
+
+def test_fetch_leaves_the_cache_untouched(monkeypatch):
+    monkeypatch.setattr(loaders, "_fetch_once", lambda key, max_age=None: f"kpis {key[1]}")
+    before = len(loaders.kpi_cache)
+    assert loaders.fetch_product_kpis("Produit 00042") == "kpis Produit 00042"
+    assert loaders.kpi_cache.peek(("getProductKpis", "Produit 00042")) is None
+    assert len(loaders.kpi_cache) == before
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from dashboard import models
+
+
+def products_payload(**extra):
+    return {
+        "total_revenue": 100.0, "total_sales_won": 6, "total_sales_engaging": 2, "total_sales_lost": 4,
+        "total_sales_prospecting": 1, "avg_revenue_per_product": 50.0, "engagement_rate": 0.4,
+        "total_won_revenue": 80.0, "total_lost_revenue": 20.0,
+        "total_revenue_per_sector": {"Retail": 70.0, "Tech": 30.0},
+        "products_per_sector": {"Tech": 1, "Retail": 3, "Santé": 2},
+    } | extra
+
+
+def team_payload():
+    payload = {}
+    for role, names in (("agent", ["Alice", "Bob"]), ("manager", ["Marc"])):
+        payload[f"total_sales_per_{role}"] = {name: 10 for name in names}
+        for key in ("total_revenue_per_{}", "avg_revenue_per_{}", "won_ratio_per_{}", "lost_ratio_per_{}"):
+            payload[key.format(role)] = {name: 12.5 for name in names}
+    # Un agent sans nombre de ventes n'est pas affiché
+    payload["total_revenue_per_agent"]["Zoé"] = 99.0
+    return payload
+
+
+def test_products_tables_are_aligned_and_typed():
+    kpis = models.ProductsKpis.from_payload(products_payload())
+    sectors = kpis.sectors
+
+    assert list(sectors.index) == ["Retail", "Tech", "Santé"]
+    assert isinstance(sectors.index, pd.CategoricalIndex)
+    assert sectors.index.name == "Secteur"
+    # Une valeur absente d'un des dictionnaires vaut 0
+    assert sectors.loc["Santé", "revenue"] == 0.0
+    assert sectors["products"].dtype.kind == "i"
+    assert sectors["products"].dtype.itemsize == 1
+    assert kpis.months is None
+    assert kpis.source == "api"
+
+
+def test_products_months_when_provided():
+    kpis = models.ProductsKpis.from_payload(products_payload(
+        revenue_per_month={"2024-01": 10.0, "2024-02": 12.0}, sales_per_month={"2024-01": 1.0, "2024-02": 3.0}))
+    assert list(kpis.months.index) == ["2024-01", "2024-02"]
+    assert kpis.months["sales"].tolist() == [1, 3]
+    assert kpis.months["sales"].dtype.kind == "i"
+
+
+def test_product_message_raises():
+    with pytest.raises(ValueError, match="inconnu"):
+        models.ProductKpis.from_payload({"message": "Produit inconnu"})
+
+
+def test_team_tables_keep_people_with_sales():
+    kpis = models.TeamKpis.from_payload(team_payload())
+
+    assert list(kpis.agents.index) == ["Alice", "Bob"]
+    assert list(kpis.agents.index.categories) == ["Alice", "Bob"]
+    assert list(kpis.agents.columns) == list(models.TEAM_COLUMNS)
+    assert kpis.agents["won_ratio"].dtype == "float32"
+    assert list(kpis.managers.index) == ["Marc"]
+    assert kpis.managers.index.name == "manager"
+
+
+def test_models_are_immutable():
+    kpis = models.TeamKpis.from_payload(team_payload())
+    with pytest.raises(AttributeError):
+        kpis.source = "snapshot"
+
+
+def test_product_names_keep_response_order():
+    data = [{"fields": {"product": "TV"}}, {"fields": {"product": "Casque"}}]
+    assert models.product_names(data) == ["TV", "Casque"]
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import ranking
+from dashboard.aggregations import DISPLAY_COLUMNS
+
+
+@pytest.fixture
+def people():
+    return pd.DataFrame({
+        "revenue": [300.0, 500.0, 500.0, 100.0, np.nan],
+        "sales": [3, 5, 4, 1, 0],
+        "avg_revenue": [100.0, 100.0, 125.0, 100.0, 0.0],
+        "won_ratio": [60.0, 80.0, 70.0, 20.0, 0.0],
+        "lost_ratio": [10.0, 5.0, 5.0, 40.0, 0.0],
+    }, index=pd.Index(["Alice", "Bob", "Chloé", "David", "Émile"], name="agent"))
+
+
+def test_top_k_keeps_ties_and_order():
+    values = np.array([3.0, 5.0, 5.0, 1.0, 4.0])
+    assert ranking.top_k(values, 1).tolist() == [1, 2]
+    assert ranking.top_k(values, 3).tolist() == [1, 2, 4]
+    assert ranking.top_k(values, 2, descending=False).tolist() == [3, 0]
+    assert ranking.top_k(values, 10).tolist() == [1, 2, 4, 0, 3]
+    assert ranking.top_k(values, 0).tolist() == []
+
+
+def test_top_k_puts_missing_values_last():
+    values = np.array([np.nan, 2.0, 1.0])
+    assert ranking.top_k(values, 3).tolist() == [1, 2, 0]
+    assert ranking.top_k(values, 3, descending=False).tolist() == [2, 1, 0]
+
+
+def test_top_k_matches_full_sort():
+    values = np.random.default_rng(0).integers(0, 50, 1000).astype("float64")
+    expected = np.argsort(-values, kind="stable")[:100]
+    assert ranking.top_k(values, 100)[:100].tolist() == expected.tolist()
+
+
+def test_competition_ranks():
+    values = np.array([3.0, 5.0, 5.0, 1.0])
+    assert ranking.competition_ranks(values, [0, 1, 2, 3]).tolist() == [3, 1, 1, 4]
+    assert ranking.competition_ranks(values, [3], descending=False).tolist() == [1]
+
+
+def test_best_returns_all_tied(people):
+    assert ranking.best(people).index.tolist() == ["Bob", "Chloé"]
+    assert ranking.best(people, "lost_ratio").index.tolist() == ["Émile"]
+    assert ranking.best(people.iloc[:0]).empty
+
+
+def test_matching_ignores_case(people):
+    assert ranking.matching(people).tolist() == [0, 1, 2, 3, 4]
+    assert ranking.matching(people, "CHL").tolist() == [2]
+    assert ranking.matching(people, "zzz").tolist() == []
+
+
+def test_leaderboard_page(people):
+    rank = f"{ranking.RANK_PREFIX}{DISPLAY_COLUMNS['revenue']}"
+    positions = ranking.matching(people)
+
+    first = ranking.leaderboard_page(people, positions, "Agent", page=1, page_size=2)
+    second = ranking.leaderboard_page(people, positions, "Agent", page=2, page_size=2)
+
+    assert first["Agent"].tolist() == ["Bob", "Chloé"]
+    assert second["Agent"].tolist() == ["Alice", "David"]
+    assert second[rank].tolist() == [3, 4]
+    assert DISPLAY_COLUMNS["won_ratio"] in first.columns
+
+
+def test_leaderboard_ranks_use_whole_team(people):
+    rank = f"{ranking.RANK_PREFIX}{DISPLAY_COLUMNS['revenue']}"
+    page = ranking.leaderboard_page(people, ranking.matching(people, "david"), "Agent")
+    assert page["Agent"].tolist() == ["David"]
+    assert page[rank].tolist() == [4]
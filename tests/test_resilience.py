@@ -0,0 +1,97 @@
+import types
+
+import pytest
+
+from dashboard import resilience
+from dashboard.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(resilience, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_opens_after_threshold(clock):
+    breaker = CircuitBreaker("getAllProducts", threshold=3, reset_after=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError, match="30 s"):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("getAllProducts", threshold=2, reset_after=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker("getAllProducts", threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 1
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # Appel de test en cours : les autres échouent aussitôt
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_successful_probe_closes(clock):
+    breaker = CircuitBreaker("getAllProducts", threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("getAllProducts", threshold=5, reset_after=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 1
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_breaker_for_is_shared():
+    assert resilience.breaker_for("getAllTeamsKpis") is resilience.breaker_for("getAllTeamsKpis")
+    assert resilience.breaker_states()["getAllTeamsKpis"] == CLOSED
+
+
+def test_render_budget_deadline(clock, monkeypatch):
+    monkeypatch.setattr(resilience, "UPSTREAM_BUDGET_SHARE", 0.5)
+    assert resilience.call_deadline() is None
+    with resilience.render_budget(8):
+        assert resilience.call_deadline() == clock.now + 4
+        # Un budget imbriqué ne prolonge pas celui qui l'englobe
+        with resilience.render_budget(20):
+            assert resilience.call_deadline() == clock.now + 4
+        clock.now += 10
+        assert resilience.call_deadline() == clock.now
+    assert resilience.call_deadline() is None
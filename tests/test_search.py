@@ -0,0 +1,37 @@
+from dashboard import search
+from dashboard.search import ProductIndex
+
+NAMES = ["Télévision OLED 55", "Casque audio", "Écran 4K", "Téléphone Pro", "Câble HDMI", "Support télé"]
+
+
+def test_normalize():
+    assert search.normalize("  Écran   4K ") == "ecran 4k"
+
+
+def test_prefix_before_word_prefix():
+    index = ProductIndex(NAMES)
+    assert index.search("tele") == ["Téléphone Pro", "Télévision OLED 55", "Support télé"]
+
+
+def test_substring_needs_three_characters():
+    index = ProductIndex(NAMES)
+    assert index.search("dmi") == ["Câble HDMI"]
+    assert index.search("dm") == []
+
+
+def test_typos_match_close_names():
+    index = ProductIndex(NAMES)
+    assert index.search("casqeu audio")[0] == "Casque audio"
+
+
+def test_empty_query_and_limit():
+    index = ProductIndex(NAMES)
+    assert index.search("") == NAMES[:search.SEARCH_LIMIT]
+    assert index.search("", limit=2) == NAMES[:2]
+    assert len(ProductIndex([f"Produit {i}" for i in range(100)]).search("produit", limit=5)) == 5
+
+
+def test_index_for_reuses_current_version():
+    first = search.index_for(NAMES, version=1)
+    assert search.index_for(NAMES, version=1) is first
+    assert search.index_for(NAMES + ["Souris"], version=2) is not first
@@ -0,0 +1,76 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks import payloads
+from dashboard import models, sharedframes
+
+pytest.importorskip("pyarrow")
+if sharedframes.fcntl is None:
+    pytest.skip("fcntl absent", allow_module_level=True)
+
+KEY = ("getAllTeamsKpis",)
+
+
+@pytest.fixture(autouse=True)
+def shared_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sharedframes, "SHARED_FRAMES_DIR", str(tmp_path / "shm"))
+    yield tmp_path / "shm"
+    sharedframes.clear()
+
+
+@pytest.fixture(scope="module")
+def team():
+    return models.TeamKpis.from_payload(payloads.all_teams_kpis(payloads.Scale.from_size(50)))
+
+
+def test_publish_returns_read_only_views(team):
+    shared = sharedframes.publish(KEY, team)
+
+    assert shared is not team
+    pd.testing.assert_frame_equal(shared.agents, team.agents)
+    pd.testing.assert_frame_equal(shared.managers, team.managers)
+    assert shared.as_of == team.as_of
+    assert not shared.agents["revenue"].to_numpy().flags.writeable
+    assert sharedframes.version(KEY) == 1
+
+
+def test_new_version_replaces_the_old_one(team, shared_dir):
+    sharedframes.publish(KEY, team)
+    sharedframes.publish(KEY, team)
+    assert sharedframes.version(KEY) == 2
+    assert sorted(path.name for path in (shared_dir / "getAllTeamsKpis").iterdir() if path.is_dir()) == ["2"]
+
+
+def test_fresh_maps_a_version_published_elsewhere(team, shared_dir):
+    shared = sharedframes.publish(KEY, team)
+    # Un autre processus n'a encore rien mappé
+    sharedframes.forget(KEY)
+    assert sharedframes.version(KEY) == 0
+
+    version, value, _ = sharedframes.fresh(KEY, max_age=60)
+    assert version == 1
+    pd.testing.assert_frame_equal(value.agents, shared.agents)
+    # Mappée une seule fois par processus
+    assert sharedframes.fresh(KEY, max_age=60)[1] is value
+
+
+def test_fresh_honours_max_age_and_confirm(team, shared_dir):
+    sharedframes.publish(KEY, team)
+    current = shared_dir / "getAllTeamsKpis" / "current"
+    os.utime(current, (0, 0))
+    assert sharedframes.fresh(KEY, max_age=60) is None
+
+    sharedframes.confirm(KEY)
+    assert sharedframes.fresh(KEY, max_age=60) is not None
+
+
+def test_other_keys_and_lists_are_not_shared(team, monkeypatch):
+    assert sharedframes.publish(("getProductKpis", "TV"), team) is team
+    assert sharedframes.publish(("getAllProductsKpis",), ["a"]) == ["a"]
+    assert sharedframes.fresh(("getProductKpis", "TV"), max_age=60) is None
+
+    monkeypatch.setattr(sharedframes, "SHARED_FRAMES_DIR", "")
+    assert not sharedframes.enabled()
+    assert sharedframes.publish(KEY, team) is team
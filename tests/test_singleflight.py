@@ -0,0 +1,139 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dashboard import resilience
+from dashboard.singleflight import SingleFlight
+
+CALLERS = 8
+
+
+@pytest.fixture
+def waiting(monkeypatch):
+    """Événement levé quand les ``CALLERS`` appelants attendent l'appel en cours."""
+    event = threading.Event()
+    count = [0]
+    lock = threading.Lock()
+    wait = SingleFlight._wait
+
+    def counting(name, future, coalesced):
+        with lock:
+            count[0] += 1
+            if count[0] == CALLERS:
+                event.set()
+        return wait(name, future, coalesced)
+
+    monkeypatch.setattr(SingleFlight, "_wait", staticmethod(counting))
+    return event
+
+
+def test_concurrent_callers_share_one_fetch(waiting):
+    flights = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        assert waiting.wait(5)
+        return {"revenue": 1}
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        results = list(pool.map(lambda _: flights.do(("getAllProductsKpis",), fetch), range(CALLERS)))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flights._calls == {}
+
+
+def test_exception_is_shared(waiting):
+    flights = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        assert waiting.wait(5)
+        raise OSError("API indisponible")
+
+    def call(_):
+        try:
+            flights.do(("getAllProductsKpis",), fetch)
+        except OSError as e:
+            return e
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        errors = list(pool.map(call, range(CALLERS)))
+
+    assert len(calls) == 1
+    assert all(isinstance(error, OSError) for error in errors)
+
+
+def test_later_calls_fetch_again():
+    flights = SingleFlight()
+    assert flights.do(("getAllProducts",), lambda: 1) == 1
+    assert flights.do(("getAllProducts",), lambda: 2) == 2
+
+
+def test_distinct_keys_do_not_wait():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    with ThreadPoolExecutor(1) as pool:
+        pending = pool.submit(flights.do, ("getProductKpis", "A"), lambda: release.wait(5))
+        assert flights.do(("getProductKpis", "B"), lambda: "B") == "B"
+        release.set()
+        assert pending.result() is True
+
+
+def test_waiter_gives_up_at_render_deadline():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "valeur"
+
+    with ThreadPoolExecutor(1) as pool:
+        leader = pool.submit(flights.do, ("getAllTeamsKpis",), slow)
+        assert started.wait(5)
+        with resilience.render_budget(0.05), pytest.raises(resilience.DeadlineExceeded):
+            flights.do(("getAllTeamsKpis",), slow)
+        # L'appel partagé continue pour les autres
+        release.set()
+        assert leader.result() == "valeur"
+
+
+def test_leader_deadline_does_not_fail_followers(monkeypatch):
+    flights = SingleFlight()
+    calls, release, joined = [], threading.Event(), threading.Event()
+    wait = SingleFlight._wait
+
+    def joining(name, future, coalesced):
+        if coalesced:
+            joined.set()
+        return wait(name, future, coalesced)
+
+    monkeypatch.setattr(SingleFlight, "_wait", staticmethod(joining))
+
+    def slow():
+        calls.append(1)
+        assert release.wait(5)
+        return "valeur"
+
+    with resilience.render_budget(0.05), pytest.raises(resilience.DeadlineExceeded):
+        flights.do(("getAllTeamsKpis",), slow)
+
+    # Appelant sans budget (rafraîchissement d'arrière-plan) : il rejoint l'appel toujours en cours
+    with ThreadPoolExecutor(1) as pool:
+        follower = pool.submit(flights.do, ("getAllTeamsKpis",), slow)
+        assert joined.wait(5)
+        release.set()
+        assert follower.result(5) == "valeur"
+    assert calls == [1]
+
+
+def test_shared_call_has_no_render_deadline():
+    flights = SingleFlight()
+    with resilience.render_budget(5):
+        assert resilience.call_deadline() is not None
+        assert flights.do(("getAllProducts",), resilience.call_deadline) is None
@@ -0,0 +1,61 @@
+import dataclasses
+
+import pandas as pd
+import pytest
+
+from benchmarks import payloads
+from dashboard import models, snapshots
+
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    return tmp_path / "snapshots"
+
+
+def test_model_round_trip():
+    scale = payloads.Scale.from_size(50)
+    kpis = models.TeamKpis.from_payload(payloads.all_teams_kpis(scale))
+    snapshots.save(("getAllTeamsKpis",), kpis)
+    copy = snapshots.load(("getAllTeamsKpis",))
+
+    assert isinstance(copy, models.TeamKpis)
+    assert copy.source == "snapshot"
+    assert copy.as_of == kpis.as_of
+    pd.testing.assert_frame_equal(copy.agents, kpis.agents)
+    pd.testing.assert_frame_equal(copy.managers, kpis.managers)
+
+
+def test_scalars_and_missing_months_round_trip():
+    kpis = models.ProductsKpis.from_payload(payloads.all_products_kpis(payloads.Scale.from_size(20)))
+    kpis = dataclasses.replace(kpis, months=None)
+    snapshots.save(("getAllProductsKpis",), kpis)
+    copy = snapshots.load(("getAllProductsKpis",))
+
+    assert copy.total_revenue == kpis.total_revenue
+    assert copy.total_sales_won == kpis.total_sales_won
+    assert copy.months is None
+    pd.testing.assert_frame_equal(copy.sectors, kpis.sectors)
+
+
+def test_list_round_trip_and_key_quoting(snapshot_dir):
+    snapshots.save(("getProductKpis", "Écran 4K/HDR"), ["a", "b"])
+    assert snapshots.load(("getProductKpis", "Écran 4K/HDR")) == ["a", "b"]
+    assert [path.name for path in snapshot_dir.iterdir()] == ["getProductKpis__%C3%89cran%204K%2FHDR"]
+
+
+def test_incomplete_or_missing_copy_is_ignored(snapshot_dir):
+    assert snapshots.load(("getAllProducts",)) is None
+    snapshots.save(("getAllProducts",), ["a"])
+    (snapshot_dir / "getAllProducts" / "meta.json").write_text("{", encoding="utf-8")
+    assert snapshots.load(("getAllProducts",)) is None
+
+
+def test_disabled_store_and_clear(snapshot_dir, monkeypatch):
+    snapshots.save(("getAllProducts",), ["a"])
+    snapshots.clear()
+    assert not snapshot_dir.exists()
+
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", "")
+    assert snapshots.save_later(("getAllProducts",), ["a"]) == ["a"]
+    assert snapshots.load(("getAllProducts",)) is None
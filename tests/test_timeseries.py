@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import timeseries
+
+
+def months(revenue, labels=None):
+    labels = labels or [f"2023-{m:02d}" for m in range(1, len(revenue) + 1)]
+    return pd.DataFrame({"revenue": revenue, "sales": [1] * len(revenue)},
+                        index=pd.CategoricalIndex(labels, name="Mois"))
+
+
+def test_monthly_sorts_and_fills_gaps():
+    frame = timeseries.monthly(months([30.0, 10.0], ["2023-04", "2023-01"]))
+    assert [str(period) for period in frame.index] == ["2023-01", "2023-02", "2023-03", "2023-04"]
+    # Un mois absent de la réponse vaut 0
+    assert frame["revenue"].tolist() == [10.0, 0.0, 0.0, 30.0]
+
+
+def test_monthly_sums_days_of_the_same_month():
+    frame = timeseries.monthly(months([10.0, 5.0, 1.0], ["2023-01-15", "2023-01-20", "2023-02-01"]))
+    assert frame["revenue"].tolist() == [15.0, 1.0]
+
+
+def test_monthly_falls_back_on_any_bad_label():
+    assert timeseries.monthly(months([1.0, 2.0], ["2023-01", "Janvier"])) is None
+    assert timeseries.monthly(None) is None
+    assert timeseries.monthly(months([])) is None
+
+
+def test_enrich_changes_rolling_and_cumulative():
+    revenue = [100.0, 50.0, 0.0, 25.0] + [10.0] * 8 + [200.0]
+    enriched = timeseries.enrich(timeseries.monthly(months(revenue, [f"2023-{m:02d}" for m in range(1, 13)]
+                                                        + ["2024-01"])), window=2)
+    np.testing.assert_allclose(enriched["revenue_mom"][:3], [np.nan, -50.0, -100.0])
+    # Pas de variation depuis un mois à 0
+    assert np.isnan(enriched["revenue_mom"].iloc[3])
+    assert enriched["revenue_yoy"].iloc[-1] == pytest.approx(100.0)
+    assert np.isnan(enriched["revenue_yoy"].iloc[-2])
+    assert enriched["revenue_rolling"].tolist()[:3] == [100.0, 75.0, 25.0]
+    assert enriched["revenue_cumulative"].iloc[-1] == sum(revenue)
+
+
+def test_between_restarts_cumulative_and_keeps_changes():
+    enriched = timeseries.enrich(timeseries.monthly(months([10.0, 20.0, 40.0, 80.0])))
+    sliced = timeseries.between(enriched, "2023-02", "2023-03")
+    assert sliced["revenue_cumulative"].tolist() == [20.0, 60.0]
+    assert sliced["revenue_mom"].tolist() == [100.0, 100.0]
+
+
+def test_period_total_compares_with_previous_period():
+    enriched = timeseries.enrich(timeseries.monthly(months([10.0, 20.0, 40.0, 80.0])))
+    assert timeseries.period_total(enriched, "revenue", "2023-03", "2023-04") == (120.0, 300.0)
+    assert timeseries.period_total(enriched, "revenue", "2023-02", "2023-03") == (60.0, None)